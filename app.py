@@ -2,7 +2,7 @@
 # TUM Master Thesis - Updated for Slide 26 Presentation
 
 from __future__ import annotations
-import os, json
+import os, io, json, hashlib, time
 from pathlib import Path
 from typing import Optional, List
 
@@ -11,10 +11,17 @@ import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 from rdflib import Graph
-from scipy.cluster.hierarchy import linkage, dendrogram
-from scipy.spatial.distance import squareform
+from scipy.cluster.hierarchy import dendrogram
 import plotly.graph_objects as go
 
+from design_graph import (
+    ANN_MIN_MODELS, CondensedMatrix, ContentIndex, FusionEngine, IVFIndex, MatrixStore, NeighborIndex,
+    ReferenceFeatures, batch_compare, build_topn_from_matrix, extract_model_features, extract_uploads_parallel,
+    StageProfiler, current_rss_bytes, load_struct_meta, pair_breakdown, peak_rss_bytes, score_upload,
+    store_neighbor_index,
+    parse_graph, sniff_rdf_format,
+)
+
 # =========================================
 # PAGE CONFIG
 # =========================================
@@ -32,6 +39,7 @@ DATA_DIR = BASE_DIR / "data"
 BUNDLE_DIR = BASE_DIR / "thesis_submission_bundle_ALL_2"
 CHANNEL_DIR = BUNDLE_DIR / "CHANNEL_MATRICES"
 STRUCT_PIPELINE_DIR = BUNDLE_DIR / "STRUCTURAL_PIPELINE"
+MATRIX_STORE_DIR = BUNDLE_DIR / "MATRIX_STORE"
 
 # Authoritative fusion weights (aligned with thesis)
 FUSION_W = {"content": 0.30, "typed": 0.20, "edge": 0.10, "struct": 0.40}
@@ -39,17 +47,57 @@ FUSION_W = {"content": 0.30, "typed": 0.20, "edge": 0.10, "struct": 0.40}
 # DEBUG MODE for deployment troubleshooting (set to False after cloud works)
 DEBUG_MODE = True
 
+# --- Per-stage timing / memory / cache statistics, shared by all sessions of the process
+@st.cache_resource
+def get_profiler() -> StageProfiler:
+    return StageProfiler()
+
+PROFILER = get_profiler()
+RUN_T0 = time.perf_counter()
+
 # =========================================
 # SIDEBAR
 # =========================================
 st.sidebar.header("🔧 Controls")
-uploaded_rdf = st.sidebar.file_uploader(
+uploaded_rdfs = st.sidebar.file_uploader(
     "Upload Current Design Graph (RDF)", 
     type=["rdf", "ttl", "nt"],
-    help="Upload your RDF file for quick comparison"
+    accept_multiple_files=True,
+    help="Upload your RDF file for quick comparison; upload several variants for batch mode"
 )
+uploaded_rdf = uploaded_rdfs[0] if uploaded_rdfs else None
 top_n = st.sidebar.slider("Top-N Results", 3, 10, 5)
 
+# Fusion weights: defaults are the thesis weights; changing them re-fuses S_total on the fly
+STRUCT_META = load_struct_meta(STRUCT_PIPELINE_DIR / "s1s4_meta.json")
+STRUCT_DEFAULTS = STRUCT_META["DEFAULTS"]
+with st.sidebar.expander("⚖️ Fusion Weights"):
+    w_content = st.slider("Content", 0.0, 1.0, FUSION_W["content"], 0.05)
+    w_typed = st.slider("Typed-Edge", 0.0, 1.0, FUSION_W["typed"], 0.05)
+    w_edge = st.slider("Edge-Sets", 0.0, 1.0, FUSION_W["edge"], 0.05)
+    w_struct = st.slider("Structural", 0.0, 1.0, FUSION_W["struct"], 0.05)
+    st.caption("Structural sub-weights (S2 motif / S3 system)")
+    w_motif = st.slider("w_motif", 0.0, 1.0, float(STRUCT_DEFAULTS["w_motif"]), 0.05)
+    w_system = st.slider("w_system", 0.0, 1.0, float(STRUCT_DEFAULTS["w_system"]), 0.05)
+
+if DEBUG_MODE:
+    with st.sidebar.expander("🩺 Profiling"):
+        PROFILER.set_tracing(st.checkbox("Trace allocations (tracemalloc)", value=PROFILER.tracing(),
+                                         help="Record per-stage peak allocations; slows every stage down"))
+
+with st.sidebar.expander("🔎 Quick Compare Search"):
+    ann_nprobe = st.slider("ANN probes (recall ↔ speed)", 1, 64, 8,
+                           help="IVF cells scanned per query once the reference corpus is large; more probes = higher recall")
+
+_w_sum = (w_content + w_typed + w_edge + w_struct) or 1.0
+ACTIVE_W = {"content": w_content / _w_sum, "typed": w_typed / _w_sum, "edge": w_edge / _w_sum, "struct": w_struct / _w_sum}
+ENGINE_W = {"content": ACTIVE_W["content"], "typed_edge": ACTIVE_W["typed"],
+            "edge_sets": ACTIVE_W["edge"], "structural": ACTIVE_W["struct"]}
+CUSTOM_FUSION = (
+    any(abs(ACTIVE_W[k] - FUSION_W[k]) > 1e-9 for k in FUSION_W)
+    or (w_motif, w_system) != (STRUCT_DEFAULTS["w_motif"], STRUCT_DEFAULTS["w_system"])
+)
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📊 Dataset Info")
 st.sidebar.info("**ALL10 Models**\n\n10 architectural design graphs analyzed across 4 channels + 4 structural sub-channels")
@@ -66,22 +114,13 @@ def pick_first_present(cands: List[str], cols: List[str]) -> Optional[str]:
             return cmap[key]
     return None
 
-@st.cache_data
-def short_rdf_info(file) -> tuple[Optional[int], Optional[int]]:
-    """Extract basic RDF statistics"""
-    try:
-        g = Graph()
-        try:
-            g.parse(file=file, format="turtle")
-        except Exception:
-            if hasattr(file, "seek"):
-                file.seek(0)
-            g.parse(file=file, format="xml")
-        return len(g), len(set(g.subjects()))
-    except Exception:
-        return None, None
+def short_rdf_info(g: Graph) -> tuple[int, int]:
+    """Extract basic RDF statistics from a parsed graph"""
+    return len(g), len(set(g.subjects()))
 
+@PROFILER.timed("load_csv_safe", cached=True)
 @st.cache_data
+@PROFILER.cache_miss
 def load_csv_safe(path: Path) -> pd.DataFrame:
     """Load CSV with error handling"""
     if path.exists():
@@ -94,7 +133,9 @@ def load_csv_safe(path: Path) -> pd.DataFrame:
             st.error(f"Error loading {path.name}: {e}")
     return pd.DataFrame()
 
+@PROFILER.timed("load_matrix_safe", cached=True)
 @st.cache_data
+@PROFILER.cache_miss
 def load_matrix_safe(path: Path) -> pd.DataFrame:
     """Load similarity matrix with index column"""
     if path.exists():
@@ -105,7 +146,61 @@ def load_matrix_safe(path: Path) -> pd.DataFrame:
             st.error(f"Error loading {path.name}: {e}")
     return pd.DataFrame()
 
+@st.cache_resource
+def get_matrix_store() -> Optional[MatrixStore]:
+    """Binary matrix store (float32 .npy + shared model index), if one has been packed"""
+    store = MatrixStore(MATRIX_STORE_DIR)
+    return store if store.exists() else None
+
+@st.cache_resource
+def get_neighbor_index(key: str) -> Optional[NeighborIndex]:
+    """Persisted top-K neighbour index of a store matrix (rebuilt only if the matrix changed)"""
+    store = get_matrix_store()
+    if store is None or key not in store:
+        return None
+    try:
+        return store_neighbor_index(store, key)
+    except Exception:
+        return None
+
+@st.cache_resource
+def get_condensed(key: str) -> Optional[CondensedMatrix]:
+    """Memory-mapped condensed store matrix; single-pair lookups read only the entries they touch"""
+    store = get_matrix_store()
+    if store is None or key not in store:
+        return None
+    try:
+        return store.condensed(key)
+    except Exception:
+        return None
+
+def stored_breakdown(model: str, others: List[str]) -> Optional[pd.DataFrame]:
+    """Stored total and channel scores of `model` against `others`, read pair by pair; None without a store"""
+    blocks = {key: get_condensed(key) for key in ["total", "content", "typed_edge", "edge_sets", "structural"]}
+    if any(b is None for b in blocks.values()):
+        return None
+    try:
+        return pd.DataFrame([{"Model": m, **{k: b[(model, m)] for k, b in blocks.items()}} for m in others],
+                            columns=["Model", *blocks])
+    except KeyError:
+        return None
+
+@PROFILER.timed("load_matrix", cached=True)
 @st.cache_data
+@PROFILER.cache_miss
+def load_matrix(key: str, csv_path: Path) -> pd.DataFrame:
+    """Similarity matrix from the binary store, falling back to its CSV export"""
+    store = get_matrix_store()
+    if store is not None and key in store:
+        try:
+            return store.frame(key)
+        except Exception as e:
+            st.error(f"Error loading {key} from matrix store: {e}")
+    return load_matrix_safe(csv_path)
+
+@PROFILER.timed("load_json_safe", cached=True)
+@st.cache_data
+@PROFILER.cache_miss
 def load_json_safe(path: Path) -> dict:
     """Load JSON with error handling"""
     if path.exists():
@@ -116,44 +211,80 @@ def load_json_safe(path: Path) -> dict:
             st.error(f"Error loading {path.name}: {e}")
     return {}
 
-def plot_heatmap_from_matrix(matrix_df: pd.DataFrame, title: str, cmap='viridis') -> None:
-    """Plot heatmap from similarity matrix"""
-    if matrix_df.empty:
-        st.info("Matrix not available.")
-        return
-    
+# Rendered heatmaps/dendrograms and their linkage are shared by all sessions and keyed
+# by matrix content, so a rerun only redraws charts whose matrix actually changed
+FIGURE_CACHE_ENTRIES = 32
+
+def matrix_digest(matrix_df: pd.DataFrame) -> str:
+    """Content hash of a similarity matrix (values + labels)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(matrix_df.to_numpy(dtype=np.float64)).tobytes())
+    h.update("\x1f".join(map(str, matrix_df.index)).encode("utf-8"))
+    h.update("\x1f".join(map(str, matrix_df.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+def _figure_png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+@PROFILER.timed("matrix_linkage", cached=True)
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+@PROFILER.cache_miss
+def matrix_linkage(digest: str, _matrix_df: pd.DataFrame) -> np.ndarray:
+    """Average-linkage Z of a similarity matrix, cached by content digest"""
+    # Linkage runs directly on the condensed upper triangle
+    return CondensedMatrix.from_square(_matrix_df).linkage(method="average")
+
+@PROFILER.timed("render_heatmap_png", cached=True)
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+@PROFILER.cache_miss
+def render_heatmap_png(digest: str, title: str, cmap: str, _matrix_df: pd.DataFrame) -> bytes:
     fig, ax = plt.subplots(figsize=(10, 8))
-    im = ax.imshow(matrix_df.values, aspect="auto", cmap=cmap, vmin=0, vmax=1)
+    im = ax.imshow(_matrix_df.values, aspect="auto", cmap=cmap, vmin=0, vmax=1)
     
-    ax.set_xticks(range(len(matrix_df.columns)))
-    ax.set_xticklabels(matrix_df.columns, rotation=45, ha="right", fontsize=8)
-    ax.set_yticks(range(len(matrix_df.index)))
-    ax.set_yticklabels(matrix_df.index, fontsize=8)
+    ax.set_xticks(range(len(_matrix_df.columns)))
+    ax.set_xticklabels(_matrix_df.columns, rotation=45, ha="right", fontsize=8)
+    ax.set_yticks(range(len(_matrix_df.index)))
+    ax.set_yticklabels(_matrix_df.index, fontsize=8)
     ax.set_title(title, fontsize=12, fontweight='bold')
     
     plt.colorbar(im, ax=ax, label="Similarity [0-1]")
     plt.tight_layout()
-    st.pyplot(fig)
+    return _figure_png(fig)
 
-def plot_dendrogram_from_matrix(matrix_df: pd.DataFrame, title: str) -> None:
-    """Plot hierarchical clustering dendrogram"""
-    if matrix_df.empty:
-        st.info("Matrix not available.")
-        return
-    
-    D = 1.0 - matrix_df.values
-    np.fill_diagonal(D, 0.0)
-    condensed = squareform(D, checks=False)
-    Z = linkage(condensed, method="average")
+@PROFILER.timed("render_dendrogram_png", cached=True)
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+@PROFILER.cache_miss
+def render_dendrogram_png(digest: str, title: str, _matrix_df: pd.DataFrame) -> bytes:
+    Z = matrix_linkage(digest, _matrix_df)
     
     fig, ax = plt.subplots(figsize=(12, 6))
-    dendrogram(Z, labels=matrix_df.index.tolist(), ax=ax, leaf_font_size=9)
+    dendrogram(Z, labels=_matrix_df.index.tolist(), ax=ax, leaf_font_size=9)
     ax.set_title(title, fontsize=12, fontweight='bold')
     ax.set_ylabel("Distance (1 - Similarity)")
     ax.set_xlabel("Model")
     plt.tight_layout()
-    st.pyplot(fig)
+    return _figure_png(fig)
+
+@PROFILER.timed()
+def plot_heatmap_from_matrix(matrix_df: pd.DataFrame, title: str, cmap='viridis') -> None:
+    """Plot heatmap from similarity matrix"""
+    if matrix_df.empty:
+        st.info("Matrix not available.")
+        return
+    st.image(render_heatmap_png(matrix_digest(matrix_df), title, cmap, matrix_df), use_container_width=True)
+
+@PROFILER.timed()
+def plot_dendrogram_from_matrix(matrix_df: pd.DataFrame, title: str) -> None:
+    """Plot hierarchical clustering dendrogram"""
+    if matrix_df.empty:
+        st.info("Matrix not available.")
+        return
+    st.image(render_dendrogram_png(matrix_digest(matrix_df), title, matrix_df), use_container_width=True)
 
+@PROFILER.timed()
 def plot_radar_scores(df_scores: pd.DataFrame, selected: Optional[str] = None, 
                      axes_cols=["Frame", "Wall", "Dual", "Braced"]) -> None:
     """Plot radar chart for system scores"""
@@ -198,16 +329,6 @@ def plot_radar_scores(df_scores: pd.DataFrame, selected: Optional[str] = None,
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def build_topn_from_matrix(matrix_df: pd.DataFrame, model_name: str, n: int = 5) -> pd.DataFrame:
-    """Extract top-N similar models from matrix"""
-    if matrix_df.empty or model_name not in matrix_df.index:
-        return pd.DataFrame()
-    
-    s = matrix_df.loc[model_name].drop(labels=[model_name]).sort_values(ascending=False).head(n)
-    df = s.reset_index()
-    df.columns = ["Model", "Similarity"]
-    return df
-
 def verify_matrix(df: pd.DataFrame) -> dict:
     """Verify similarity matrix properties"""
     if df.empty:
@@ -220,127 +341,214 @@ def verify_matrix(df: pd.DataFrame) -> dict:
     
     return {"ok": sym and diag and rng, "sym": sym, "diag1": diag, "rangeOK": rng}
 
-# --- Quick content features for uploaded RDF
-PRED_KEYS = [
-    "adjacentElement", "adjacentZone", "intersectingElement",
-    "bfo_0000178", "hasFunction", "hasQuality"
-]
+# --- Upload ingestion: parse once, feed every consumer
+@PROFILER.timed("ingest_uploaded_rdf", cached=True)
+@st.cache_resource(max_entries=4)
+@PROFILER.cache_miss
+def ingest_uploaded_rdf(data: bytes, name: str) -> dict:
+    """Parse an uploaded RDF file exactly once and derive all per-upload features.
 
-def _parse_graph_any(file_or_path):
-    g = Graph()
-    try:
-        g.parse(file=file_or_path, format="turtle")
-    except Exception:
-        try:
-            if hasattr(file_or_path, "seek"):
-                file_or_path.seek(0)
-            g.parse(file=file_or_path, format="xml")
-        except Exception:
-            raise
-    return g
-
-def _pred_key_from_uri(uri: str) -> Optional[str]:
-    low = uri.lower()
-    for k in PRED_KEYS:
-        if low.endswith(k.lower()):
-            return k
-    if low.endswith("#type") or low.endswith("/type"):
-        return "rdf_type"
-    return None
+    The returned dict carries everything computed from the graph (triple and
+    subject stats, content histogram, every channel's features); the graph
+    itself is dropped so the cache does not keep rdflib graphs alive.
+    """
+    fmt = sniff_rdf_format(name, data[:512])
+    with PROFILER.stage("parse_graph"):
+        g = parse_graph(data, fmt=fmt)
+    triples, subjects = short_rdf_info(g)
+    with PROFILER.stage("extract_model_features"):
+        features = extract_model_features(g, name=name, meta=STRUCT_META)
+    return {
+        "name": name,
+        "format": fmt,
+        "triples": triples,
+        "subjects": subjects,
+        "pred_counts": features["content"],
+        "features": features,
+    }
 
-def rdf_to_feature_vector(file_or_path) -> dict:
-    g = _parse_graph_any(file_or_path)
-    feats = {k: 0.0 for k in PRED_KEYS + ["rdf_type"]}
-    for _, p, _ in g.triples((None, None, None)):
-        key = _pred_key_from_uri(str(p))
-        if key:
-            feats[key] += 1.0
-    vec = np.array([feats[k] for k in sorted(feats.keys())], dtype=float)
-    norm = np.linalg.norm(vec) or 1.0
-    vec = vec / norm
-    return dict(zip([f"feat__{k}" for k in sorted(feats.keys())], vec))
-
-def cosine(a: np.ndarray, b: np.ndarray) -> float:
-    na = np.linalg.norm(a); nb = np.linalg.norm(b)
-    if na == 0 or nb == 0:
-        return 0.0
-    return float(np.dot(a, b) / (na * nb))
-
-def compare_uploaded_to_refs(uploaded_file, ref_models: List[str], topn: int = 5) -> pd.DataFrame:
-    """Compare uploaded RDF to reference models using content similarity"""
-    if uploaded_file is None or not ref_models:
-        return pd.DataFrame()
-    
-    up_feats = rdf_to_feature_vector(uploaded_file)
-    cols = sorted([c for c in up_feats.keys()])
-    u = np.array([up_feats.get(c, 0.0) for c in cols], dtype=float)
-    
-    sims = []
+@PROFILER.timed("ingest_uploaded_batch", cached=True)
+@st.cache_resource(max_entries=2)
+@PROFILER.cache_miss
+def ingest_uploaded_batch(files: tuple) -> List[dict]:
+    """Channel features of a batch of (name, bytes) uploads, parsed in parallel worker processes"""
+    return extract_uploads_parallel(files, STRUCT_META)
+
+def upload_record(data: bytes, name: str, features: dict) -> dict:
+    """The ingest_uploaded_rdf record of an upload whose features came from the batch parse"""
+    return {
+        "name": name,
+        "format": sniff_rdf_format(name, data[:512]),
+        "triples": features["n_triples"],
+        "subjects": features["n_subjects"],
+        "pred_counts": features["content"],
+        "features": features,
+    }
+
+def _refs_signature(ref_models: List[str]) -> tuple:
+    """(model, size, mtime_ns) per existing reference file; changes when any file does"""
+    sig = []
     for model_path in ref_models:
         try:
-            ref_feats = rdf_to_feature_vector(BASE_DIR / model_path)
-            v = np.array([ref_feats.get(c, 0.0) for c in cols], dtype=float)
-            sims.append((model_path, cosine(u, v)))
-        except Exception:
-            pass
-    
-    if not sims:
+            stat = (BASE_DIR / model_path).stat()
+        except OSError:
+            continue
+        sig.append((model_path, stat.st_size, stat.st_mtime_ns))
+    return tuple(sig)
+
+# --- Persistent all-channel features of the reference models (Quick Compare)
+REF_FEATURES_PATH = BASE_DIR / ".cache" / "model_features.json"
+
+@st.cache_resource
+def get_reference_feature_cache() -> ReferenceFeatures:
+    """Reference feature cache shared by all sessions, loaded once per process"""
+    return ReferenceFeatures(REF_FEATURES_PATH, STRUCT_META)
+
+@PROFILER.timed("get_reference_features", cached=True)
+@st.cache_resource(max_entries=2)
+@PROFILER.cache_miss
+def get_reference_features(signature: tuple) -> List[dict]:
+    """Channel features of the reference files, extracted only for files not cached yet"""
+    return get_reference_feature_cache().features([BASE_DIR / model_path for model_path, _, _ in signature])
+
+@PROFILER.timed("get_content_index", cached=True)
+@st.cache_resource(max_entries=2)
+@PROFILER.cache_miss
+def get_content_index(signature: tuple) -> ContentIndex:
+    """N×K normalized content matrix of the reference models, from their cached channel features"""
+    feats = get_reference_features(signature)
+    index = ContentIndex.from_counts([model_path for model_path, _, _ in signature], [f["content"] for f in feats])
+    if len(index) >= ANN_MIN_MODELS:
+        index.build_ann()
+    return index
+
+@PROFILER.timed()
+def compare_uploaded_to_refs(upload: Optional[dict], ref_models: List[str], topn: int = 5,
+                             nprobe: Optional[int] = None) -> pd.DataFrame:
+    """Compare an ingested upload to reference models using content similarity"""
+    if upload is None or not ref_models:
         return pd.DataFrame()
-    
-    out = pd.DataFrame(sims, columns=["Model", "Content_Cosine"]).sort_values(
-        "Content_Cosine", ascending=False
-    ).head(topn)
-    return out.reset_index(drop=True)
+
+    index = get_content_index(_refs_signature(ref_models))
+    if len(index) == 0:
+        return pd.DataFrame()
+
+    # Large corpora: scan `nprobe` IVF cells; otherwise one mat-vec over all references
+    sims = index.topn(upload["pred_counts"], topn, nprobe=nprobe)
+    return pd.DataFrame(sims, columns=["Model", "Content_Cosine"])
+
+@st.cache_data(max_entries=16)
+def ann_recall_report(name: str, _index: IVFIndex, k: int, nprobes: tuple, n_queries: int = 200) -> pd.DataFrame:
+    """Measured recall@k of an IVF index against exact cosine, on sampled corpus vectors (self-match excluded)"""
+    queries, ids = _index.sample_queries(n_queries)
+    return pd.DataFrame(_index.evaluate(queries, k, nprobes, exclude=ids))
+
+@st.cache_resource
+def get_s4_ann() -> Optional[IVFIndex]:
+    """IVF index over the S4 motif-share vectors"""
+    df = load_csv_safe(STRUCT_PIPELINE_DIR / "s4_motif_share_vectors.csv")
+    if df.empty:
+        return None
+    return IVFIndex.from_frame(df)
+
+@st.cache_resource(max_entries=2)
+def get_content_ann(signature: tuple) -> Optional[IVFIndex]:
+    """IVF index over the reference content vectors (the content index's own one when it has built it)"""
+    index = get_content_index(signature)
+    if not len(index):
+        return None
+    return index.ann or IVFIndex(index.X, index.models)
 
 # =========================================
 # LOAD ALL DATA
 # =========================================
-@st.cache_data
-def load_all_data():
-    """Load all data files for ALL10 dataset"""
-    data = {}
-    
+@st.cache_resource
+def get_fusion_engine() -> Optional[FusionEngine]:
+    """Channel tensor for re-fusing S_total under the sidebar weights"""
+    store = get_matrix_store()
+    try:
+        if store is not None:
+            return FusionEngine.from_store(store)
+        return FusionEngine.from_matrices({
+            "content": DATA['content_matrix'], "typed_edge": DATA['typed_edge_matrix'],
+            "edge_sets": DATA['edge_sets_matrix'], "S2_motif": DATA['S2_motif'], "S3_system": DATA['S3_system'],
+        })
+    except Exception:
+        return None
+
+# Each artifact is read on first access only (and memoized by the cached loaders);
+# views that are not selected (structural sub-channels, verification) never touch theirs
+DATASET_SOURCES = {
     # From /data folder (new results)
-    data['adjacency_evidence'] = load_csv_safe(DATA_DIR / "adjacency_evidence.csv")
-    data['functional_roles'] = load_csv_safe(DATA_DIR / "functional_roles_evidence.csv")
-    data['motif_evidence'] = load_json_safe(DATA_DIR / "motif_evidence.json")
+    'adjacency_evidence': lambda: load_csv_safe(DATA_DIR / "adjacency_evidence.csv"),
+    'functional_roles': lambda: load_csv_safe(DATA_DIR / "functional_roles_evidence.csv"),
+    'motif_evidence': lambda: load_json_safe(DATA_DIR / "motif_evidence.json"),
     
-    data['S1_adjacency'] = load_matrix_safe(DATA_DIR / "S1_adjacency_similarity.csv")
-    data['S2_motif'] = load_matrix_safe(DATA_DIR / "S2_motif_similarity.csv")
-    data['S3_system'] = load_matrix_safe(DATA_DIR / "S3_system_similarity.csv")
-    data['S4_functional'] = load_matrix_safe(DATA_DIR / "S4_functional_similarity.csv")
-    data['S_struct_fused'] = load_matrix_safe(DATA_DIR / "S_struct_fused_similarity.csv")
+    'S1_adjacency': lambda: load_matrix("S1_adjacency", DATA_DIR / "S1_adjacency_similarity.csv"),
+    'S2_motif': lambda: load_matrix("S2_motif", DATA_DIR / "S2_motif_similarity.csv"),
+    'S3_system': lambda: load_matrix("S3_system", DATA_DIR / "S3_system_similarity.csv"),
+    'S4_functional': lambda: load_matrix("S4_functional", DATA_DIR / "S4_functional_similarity.csv"),
+    'S_struct_fused': lambda: load_matrix("S_struct_fused", DATA_DIR / "S_struct_fused_similarity.csv"),
     
     # From thesis bundle
-    data['total_matrix'] = load_matrix_safe(CHANNEL_DIR / "total_similarity_matrix.csv")
-    data['content_matrix'] = load_matrix_safe(CHANNEL_DIR / "content_similarity_matrix.csv")
-    data['typed_edge_matrix'] = load_matrix_safe(CHANNEL_DIR / "typed_edge_similarity_matrix.csv")
-    data['edge_sets_matrix'] = load_matrix_safe(CHANNEL_DIR / "edge_sets_similarity_matrix.csv")
-    data['structural_matrix'] = load_matrix_safe(CHANNEL_DIR / "structural_similarity_matrix.csv")
-    
-    data['pairwise_total'] = load_csv_safe(CHANNEL_DIR / "pairwise_total_summary.csv")
-    data['pairwise_content'] = load_csv_safe(CHANNEL_DIR / "pairwise_content_summary.csv")
-    data['pairwise_typed'] = load_csv_safe(CHANNEL_DIR / "pairwise_typed_edge_summary.csv")
-    data['pairwise_edge'] = load_csv_safe(CHANNEL_DIR / "pairwise_edge_sets_summary.csv")
-    data['pairwise_struct'] = load_csv_safe(CHANNEL_DIR / "pairwise_structural_summary.csv")
+    'total_matrix': lambda: load_matrix("total", CHANNEL_DIR / "total_similarity_matrix.csv"),
+    'content_matrix': lambda: load_matrix("content", CHANNEL_DIR / "content_similarity_matrix.csv"),
+    'typed_edge_matrix': lambda: load_matrix("typed_edge", CHANNEL_DIR / "typed_edge_similarity_matrix.csv"),
+    'edge_sets_matrix': lambda: load_matrix("edge_sets", CHANNEL_DIR / "edge_sets_similarity_matrix.csv"),
+    'structural_matrix': lambda: load_matrix("structural", CHANNEL_DIR / "structural_similarity_matrix.csv"),
     
-    # Structural pipeline
-    data['s1_inventory'] = load_csv_safe(STRUCT_PIPELINE_DIR / "s1_inventory.csv")
-    data['s2_motifs'] = load_csv_safe(STRUCT_PIPELINE_DIR / "s2_motifs.csv")
-    data['s3_system_scores'] = load_csv_safe(STRUCT_PIPELINE_DIR / "s3_system_scores.csv")
-    data['s4_motif_share'] = load_csv_safe(STRUCT_PIPELINE_DIR / "s4_motif_share_vectors.csv")
-    
-    # Get model list
-    if not data['total_matrix'].empty:
-        data['models'] = data['total_matrix'].index.tolist()
-    else:
-        data['models'] = []
+    'pairwise_total': lambda: load_csv_safe(CHANNEL_DIR / "pairwise_total_summary.csv"),
+    'pairwise_content': lambda: load_csv_safe(CHANNEL_DIR / "pairwise_content_summary.csv"),
+    'pairwise_typed': lambda: load_csv_safe(CHANNEL_DIR / "pairwise_typed_edge_summary.csv"),
+    'pairwise_edge': lambda: load_csv_safe(CHANNEL_DIR / "pairwise_edge_sets_summary.csv"),
+    'pairwise_struct': lambda: load_csv_safe(CHANNEL_DIR / "pairwise_structural_summary.csv"),
     
-    return data
+    # Structural pipeline
+    's1_inventory': lambda: load_csv_safe(STRUCT_PIPELINE_DIR / "s1_inventory.csv"),
+    's2_motifs': lambda: load_csv_safe(STRUCT_PIPELINE_DIR / "s2_motifs.csv"),
+    's3_system_scores': lambda: load_csv_safe(STRUCT_PIPELINE_DIR / "s3_system_scores.csv"),
+    's4_motif_share': lambda: load_csv_safe(STRUCT_PIPELINE_DIR / "s4_motif_share_vectors.csv"),
+}
+
+def load_model_list() -> List[str]:
+    """Model order from the store index, else from the total matrix"""
+    store = get_matrix_store()
+    if store is not None:
+        try:
+            return list(store.models)
+        except Exception:
+            pass
+    return DATA['total_matrix'].index.tolist()
+
+class LazyDataset:
+    """ALL10 artifacts by name, each loaded on first access and memoized"""
+
+    def __init__(self, sources: dict):
+        self._sources = dict(sources, models=load_model_list)
+        self._loaded: dict = {}
+
+    def __getitem__(self, key: str):
+        if key not in self._loaded:
+            with PROFILER.stage(f"dataset:{key}"):
+                self._loaded[key] = self._sources[key]()
+        return self._loaded[key]
 
-# Load all data
-with st.spinner("Loading ALL10 dataset..."):
-    DATA = load_all_data()
+    def __contains__(self, key: str) -> bool:
+        return key in self._sources
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self._sources else default
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+
+DATA = LazyDataset(DATASET_SOURCES)
+
+# The channel tensor is built only when the sidebar weights differ from the thesis ones
+TOTAL_MATRIX = DATA['total_matrix']
+if CUSTOM_FUSION and get_fusion_engine() is not None:
+    TOTAL_MATRIX = get_fusion_engine().fuse(ENGINE_W, w_motif, w_system).to_frame()
 
 # =========================================
 # MAIN LAYOUT
@@ -354,10 +562,20 @@ The framework combines **content**, **typed-edge**, **edge-set**, and **structur
 comprehensive design similarity.
 """)
 
-# Display uploaded RDF info
+# Display uploaded RDF info; with several uploads one parallel batch parse serves every consumer
+UPLOAD = None
+UPLOADS: List[dict] = []
 if uploaded_rdf is not None:
-    triples, nodes = short_rdf_info(uploaded_rdf)
-    st.info(f"📄 **Uploaded:** {uploaded_rdf.name}  |  Triples: {triples}  |  Unique subjects: {nodes}")
+    try:
+        if len(uploaded_rdfs) > 1:
+            batch_features = ingest_uploaded_batch(tuple((f.name, f.getvalue()) for f in uploaded_rdfs))
+            UPLOADS = [upload_record(f.getvalue(), f.name, feats) for f, feats in zip(uploaded_rdfs, batch_features)]
+        else:
+            UPLOADS = [ingest_uploaded_rdf(uploaded_rdf.getvalue(), uploaded_rdf.name)]
+        UPLOAD = UPLOADS[0]
+        st.info(f"📄 **Uploaded:** {uploaded_rdf.name}  |  Triples: {UPLOAD['triples']}  |  Unique subjects: {UPLOAD['subjects']}")
+    except Exception as e:
+        st.error(f"Could not parse the upload{'s' if len(uploaded_rdfs) > 1 else ''}: {e}")
 
 # DEBUG section for deployment troubleshooting
 if DEBUG_MODE:
@@ -393,11 +611,7 @@ if DEBUG_MODE:
             st.write("**Models:**", DATA['models'][:3], "..." if len(DATA['models']) > 3 else "")
         
         st.write(f"**total_matrix loaded?** {not DATA['total_matrix'].empty} (shape: {DATA['total_matrix'].shape if not DATA['total_matrix'].empty else 'empty'})")
-        st.write(f"**S1_adjacency loaded?** {not DATA['S1_adjacency'].empty} (shape: {DATA['S1_adjacency'].shape if not DATA['S1_adjacency'].empty else 'empty'})")
-        st.write(f"**S2_motif loaded?** {not DATA['S2_motif'].empty}")
-        st.write(f"**S3_system loaded?** {not DATA['S3_system'].empty}")
-        st.write(f"**S4_functional loaded?** {not DATA['S4_functional'].empty}")
-        st.write(f"**s3_system_scores loaded?** {not DATA['s3_system_scores'].empty}")
+        st.write("**Artifacts loaded so far (the rest load on first use):**", DATA.loaded)
         
         st.markdown("---")
         st.markdown("### 🔬 Direct Load Test (total_similarity_matrix.csv)")
@@ -428,10 +642,14 @@ The **structural channel** (weight: 0.40) is decomposed into four sub-channels:
 - **S4**: Functional role similarity
 """)
 
-struct_tabs = st.tabs(["S1: Adjacency", "S2: Motifs", "S3: System Families", "S4: Functional Roles", "S_struct Fused"])
+# A radio instead of st.tabs: Streamlit runs every tab's body on each rerun, so only the
+# selected view's artifacts are loaded and its plots rendered
+STRUCT_VIEWS = ["S1: Adjacency", "S2: Motifs", "S3: System Families", "S4: Functional Roles", "S_struct Fused"]
+struct_view = st.radio("Structural view", STRUCT_VIEWS, horizontal=True, key="struct_view",
+                       label_visibility="collapsed")
 
-# TAB 1: S1 - Adjacency
-with struct_tabs[0]:
+# VIEW 1: S1 - Adjacency
+if struct_view == STRUCT_VIEWS[0]:
     st.subheader("S1: Adjacency Evidence")
     st.markdown("Topological relationships between elements (adjacentElement, adjacentZone, etc.)")
     
@@ -450,8 +668,8 @@ with struct_tabs[0]:
     else:
         st.warning("S1 matrix not available")
 
-# TAB 2: S2 - Motifs
-with struct_tabs[1]:
+# VIEW 2: S2 - Motifs
+if struct_view == STRUCT_VIEWS[1]:
     st.subheader("S2: Motif Detection")
     st.markdown("Structural motifs: M2 (frame node), M3 (wall-slab), M4 (core), M2b (brace node)")
     
@@ -470,8 +688,8 @@ with struct_tabs[1]:
     else:
         st.warning("S2 matrix not available")
 
-# TAB 3: S3 - System Families
-with struct_tabs[2]:
+# VIEW 3: S3 - System Families
+if struct_view == STRUCT_VIEWS[2]:
     st.subheader("S3: System Family Scores")
     st.markdown("Normalized scores for Frame, Wall, Dual, and Braced systems")
     
@@ -502,8 +720,8 @@ with struct_tabs[2]:
     else:
         st.warning("S3 matrix not available")
 
-# TAB 4: S4 - Functional Roles
-with struct_tabs[3]:
+# VIEW 4: S4 - Functional Roles
+if struct_view == STRUCT_VIEWS[3]:
     st.subheader("S4: Functional Role Evidence")
     st.markdown("Structural roles: LoadBearing, Shear, Moment, Bracing")
     
@@ -525,8 +743,8 @@ with struct_tabs[3]:
     else:
         st.warning("S4 matrix not available")
 
-# TAB 5: S_struct Fused
-with struct_tabs[4]:
+# VIEW 5: S_struct Fused
+if struct_view == STRUCT_VIEWS[4]:
     st.subheader("S_struct: Fused Structural Similarity")
     st.markdown("Combined structural channel (S1 + S2 + S3 + S4)")
     
@@ -545,18 +763,45 @@ st.markdown("---")
 # SECTION 2: TOTAL SIMILARITY (FINAL FUSION)
 # =========================================
 st.header("🎯 Total Similarity (Final Fusion)")
+# The channel tensor is only built for custom weights; thesis weights read the stored total
+FUSION = get_fusion_engine() if CUSTOM_FUSION else None
 st.markdown(f"""
 **Fusion formula:**  
-`S_total = {FUSION_W['content']}·S_content + {FUSION_W['typed']}·S_typed + {FUSION_W['edge']}·S_edge + {FUSION_W['struct']}·S_struct`
+`S_total = {ACTIVE_W['content']:.2f}·S_content + {ACTIVE_W['typed']:.2f}·S_typed + {ACTIVE_W['edge']:.2f}·S_edge + {ACTIVE_W['struct']:.2f}·S_struct`
 
 This combines all four channels into a single comprehensive similarity score.
 """)
+if CUSTOM_FUSION:
+    if FUSION is not None:
+        st.info(f"Custom weights from the sidebar (S_struct = {w_motif:.2f}·S2 + {w_system:.2f}·S3, normalized); "
+                "thesis weights: " + ", ".join(f"{k} {v}" for k, v in FUSION_W.items()))
+    else:
+        st.warning("Channel matrices unavailable — showing the precomputed total with thesis weights")
 
 if DATA['models']:
     target_model = st.selectbox("Select a model to view its top-N similar models", options=DATA['models'])
     
-    if target_model and not DATA['total_matrix'].empty:
-        topn_df = build_topn_from_matrix(DATA['total_matrix'], target_model, top_n)
+    fused_top = None
+    if target_model and FUSION is not None and target_model in FUSION.models:
+        # Re-ranked from the channel tensor under the active weights
+        fused_top = FUSION.topn(target_model, top_n, ENGINE_W, w_motif, w_system)
+    elif target_model and not CUSTOM_FUSION and get_matrix_store() is not None:
+        # Precomputed neighbours (else the stored total row); channel scores read pair by pair from the store
+        total_nn = get_neighbor_index("total")
+        if total_nn is not None and target_model in total_nn and top_n <= total_nn.k:
+            top_models = [m for m, _ in total_nn.topn(target_model, top_n)]
+        else:
+            topn_df = build_topn_from_matrix(TOTAL_MATRIX, target_model, top_n)
+            top_models = topn_df["Model"].tolist() if not topn_df.empty else []
+        fused_top = stored_breakdown(target_model, top_models) if top_models else None
+
+    if fused_top is not None:
+        st.markdown(f"#### Top {top_n} Similar Models to **{target_model}**")
+        st.dataframe(fused_top[["Model", "total"]].rename(columns={"total": "Similarity"}), use_container_width=True)
+        st.markdown("##### Channel Breakdown")
+        st.dataframe(fused_top, use_container_width=True)
+    elif target_model and not TOTAL_MATRIX.empty:
+        topn_df = build_topn_from_matrix(TOTAL_MATRIX, target_model, top_n)
         
         if not topn_df.empty:
             st.markdown(f"#### Top {top_n} Similar Models to **{target_model}**")
@@ -603,17 +848,17 @@ with col1:
     st.markdown("**Heatmap**")
     # Try to show pre-rendered highlighted version
     total_heatmap = DATA_DIR / "total_similarity_heatmap_highlighted.png"
-    if total_heatmap.exists():
+    if total_heatmap.exists() and not CUSTOM_FUSION:
         st.image(str(total_heatmap), use_container_width=True)
-    elif not DATA['total_matrix'].empty:
-        plot_heatmap_from_matrix(DATA['total_matrix'], "Total Similarity", cmap='RdYlGn')
+    elif not TOTAL_MATRIX.empty:
+        plot_heatmap_from_matrix(TOTAL_MATRIX, "Total Similarity", cmap='RdYlGn')
     else:
         st.info("Total similarity heatmap not available")
 
 with col2:
     st.markdown("**Dendrogram**")
-    if not DATA['total_matrix'].empty:
-        plot_dendrogram_from_matrix(DATA['total_matrix'], "Hierarchical Clustering (Total)")
+    if not TOTAL_MATRIX.empty:
+        plot_dendrogram_from_matrix(TOTAL_MATRIX, "Hierarchical Clustering (Total)")
     else:
         st.info("Total similarity matrix not available")
 
@@ -635,40 +880,29 @@ if DATA['models']:
     if model_a and model_b:
         st.markdown(f"### Comparing: **{model_a}** ↔ **{model_b}**")
         
-        # Extract similarities from matrices
-        comparison = {}
+        # Single entries from the store (the CSV matrices without one); B's rank among A's nearest neighbours
+        pair_sources = {
+            "total": "total_matrix", "content": "content_matrix", "typed_edge": "typed_edge_matrix",
+            "edge_sets": "edge_sets_matrix", "structural": "structural_matrix", "S1_adjacency": "S1_adjacency",
+            "S2_motif": "S2_motif", "S3_system": "S3_system", "S4_functional": "S4_functional",
+        }
         
-        if not DATA['total_matrix'].empty and model_a in DATA['total_matrix'].index and model_b in DATA['total_matrix'].columns:
-            comparison['Total'] = DATA['total_matrix'].loc[model_a, model_b]
+        def pair_value(key: str) -> Optional[float]:
+            block = None if (key == "total" and CUSTOM_FUSION) else get_condensed(key)
+            if block is not None:
+                try:
+                    return block[(model_a, model_b)]
+                except KeyError:
+                    return None
+            m = TOTAL_MATRIX if key == "total" else DATA[pair_sources[key]]
+            if m.empty or model_a not in m.index or model_b not in m.columns:
+                return None
+            return m.loc[model_a, model_b]
         
-        if not DATA['content_matrix'].empty and model_a in DATA['content_matrix'].index:
-            comparison['Content'] = DATA['content_matrix'].loc[model_a, model_b]
+        comp_df = pair_breakdown(pair_value, model_a, model_b,
+                                 lambda key: None if (key == "total" and CUSTOM_FUSION) else get_neighbor_index(key))
         
-        if not DATA['typed_edge_matrix'].empty and model_a in DATA['typed_edge_matrix'].index:
-            comparison['Typed-Edge'] = DATA['typed_edge_matrix'].loc[model_a, model_b]
-        
-        if not DATA['edge_sets_matrix'].empty and model_a in DATA['edge_sets_matrix'].index:
-            comparison['Edge-Sets'] = DATA['edge_sets_matrix'].loc[model_a, model_b]
-        
-        if not DATA['structural_matrix'].empty and model_a in DATA['structural_matrix'].index:
-            comparison['Structural'] = DATA['structural_matrix'].loc[model_a, model_b]
-        
-        if not DATA['S1_adjacency'].empty and model_a in DATA['S1_adjacency'].index:
-            comparison['S1_Adjacency'] = DATA['S1_adjacency'].loc[model_a, model_b]
-        
-        if not DATA['S2_motif'].empty and model_a in DATA['S2_motif'].index:
-            comparison['S2_Motif'] = DATA['S2_motif'].loc[model_a, model_b]
-        
-        if not DATA['S3_system'].empty and model_a in DATA['S3_system'].index:
-            comparison['S3_System'] = DATA['S3_system'].loc[model_a, model_b]
-        
-        if not DATA['S4_functional'].empty and model_a in DATA['S4_functional'].index:
-            comparison['S4_Functional'] = DATA['S4_functional'].loc[model_a, model_b]
-        
-        if comparison:
-            comp_df = pd.DataFrame(list(comparison.items()), columns=["Channel", "Similarity"])
-            comp_df["Similarity"] = comp_df["Similarity"].round(4)
-            
+        if not comp_df.empty:
             col1, col2 = st.columns([2, 3])
             with col1:
                 st.dataframe(comp_df, use_container_width=True)
@@ -689,28 +923,84 @@ else:
 st.markdown("---")
 
 # =========================================
-# SECTION 4: QUICK COMPARE (CONTENT-ONLY)
+# SECTION 4: QUICK COMPARE (ALL CHANNELS)
 # =========================================
-with st.expander("🚀 Quick Compare (Content-Only)", expanded=False):
+with st.expander("🚀 Quick Compare (All Channels)", expanded=False):
     st.markdown("""
-    Upload a new RDF file to quickly compare it against the ALL10 reference set using 
-    **content similarity only** (predicate histogram + cosine). This is a fast approximation 
-    that does not require full graph analysis.
+    Upload a new RDF file to compare it against the ALL10 reference models on **every channel** —
+    content, typed-edge, edge-sets and structural (S1–S4) — fused with the sidebar weights
+    (the thesis `FUSION_W` by default). The upload is parsed once; reference features are cached.
     """)
     
-    if uploaded_rdf is None:
+    if UPLOAD is None:
         st.info("Upload a design graph in the sidebar to use Quick Compare")
     elif not DATA['models']:
         st.warning("Reference model list not available")
     else:
-        qc_result = compare_uploaded_to_refs(uploaded_rdf, DATA['models'], top_n)
+        t0 = time.perf_counter()
+        qc_refs = DATA['models']
+        if len(qc_refs) >= ANN_MIN_MODELS:
+            # Large corpora: the content ANN preselects candidates; only those are scored on every channel
+            qc_refs = compare_uploaded_to_refs(UPLOAD, qc_refs, 10 * top_n, nprobe=ann_nprobe)["Model"].tolist()
+        ref_features = get_reference_features(_refs_signature(qc_refs))
+        with PROFILER.stage("score_upload"):
+            qc_scores = score_upload(UPLOAD["features"], ref_features, ENGINE_W, STRUCT_META, w_motif, w_system)
+        qc_ms = (time.perf_counter() - t0) * 1e3
         
-        if not qc_result.empty:
-            st.markdown(f"#### Top {top_n} Similar Models (Content-Only)")
-            st.dataframe(qc_result, use_container_width=True)
-            st.caption("⚠️ This is a content-only approximation. For full similarity, run the complete pipeline.")
+        if not qc_scores.empty:
+            st.markdown(f"#### Top {top_n} Similar Models (All Channels)")
+            st.dataframe(qc_scores.head(top_n)[["Model", "total", "content", "typed_edge", "edge_sets", "structural"]],
+                         use_container_width=True)
+            st.caption(f"Scored against {len(ref_features)} reference models in {qc_ms:.0f} ms "
+                       f"(the upload itself was parsed and featurized once on arrival)")
+            if len(DATA['models']) >= ANN_MIN_MODELS:
+                st.caption(f"Candidates from the content ANN ({ann_nprobe} probes) out of {len(DATA['models'])} references")
+            
+            qc_ref = st.selectbox("Channel breakdown against", options=qc_scores["Model"].tolist(), key="qc_ref")
+            qc_row = qc_scores.set_index("Model").loc[qc_ref]
+            st.dataframe(pair_breakdown(lambda key: qc_row[key], UPLOAD["name"], qc_ref), use_container_width=True)
         else:
-            st.info("Could not compute comparison (empty feature vectors)")
+            st.info("Could not compute comparison (no reference RDF files found)")
+
+with st.expander("📦 Batch Compare (Multiple Uploads)", expanded=False):
+    st.markdown("""
+    Upload several RDF variants at once: they are parsed in parallel and scored on every channel as one
+    batch — a **Q×N** block against the reference models and a **Q×Q** block among the variants.
+    """)
+    
+    if len(uploaded_rdfs or []) < 2:
+        st.info("Upload two or more design graphs in the sidebar to use batch mode")
+    elif not DATA['models']:
+        st.warning("Reference model list not available")
+    elif UPLOADS:
+        t0 = time.perf_counter()
+        batch_refs = DATA['models']
+        if len(batch_refs) >= ANN_MIN_MODELS:
+            # Large corpora: score the union of every variant's content-ANN candidates
+            cand = set()
+            for upload in UPLOADS:
+                cand.update(compare_uploaded_to_refs(upload, batch_refs, 10 * top_n, nprobe=ann_nprobe)["Model"])
+            batch_refs = [m for m in batch_refs if m in cand]
+        batch_features = [upload["features"] for upload in UPLOADS]
+        batch_ref_features = get_reference_features(_refs_signature(batch_refs))
+        with PROFILER.stage("batch_compare"):
+            batch = batch_compare(batch_features, batch_ref_features, top_n, ENGINE_W, STRUCT_META, w_motif, w_system)
+        batch_ms = (time.perf_counter() - t0) * 1e3
+        
+        st.markdown(f"#### Q×N: {len(batch['QxN'])} uploads × {batch['QxN'].shape[1]} reference models")
+        st.dataframe(batch['QxN'].round(4), use_container_width=True)
+        st.markdown("#### Q×Q: uploads among themselves")
+        st.dataframe(batch['QxQ'].round(4), use_container_width=True)
+        st.markdown(f"#### Top {top_n} Reference Models per Upload")
+        st.dataframe(batch['topn'], use_container_width=True)
+        st.caption(f"Batch of {len(batch_features)} uploads scored in {batch_ms:.0f} ms")
+        
+        dl1, dl2 = st.columns(2)
+        dl1.download_button("⬇️ Q×N | Q×Q matrix (CSV)",
+                            pd.concat([batch['QxN'], batch['QxQ']], axis=1).to_csv().encode("utf-8"),
+                            file_name="batch_S_total.csv", mime="text/csv")
+        dl2.download_button("⬇️ Top-N table (CSV)", batch['topn'].to_csv(index=False).encode("utf-8"),
+                            file_name="batch_topn.csv", mime="text/csv")
 
 st.markdown("---")
 
@@ -721,41 +1011,62 @@ with st.expander("✅ Verification & Diagnostics", expanded=False):
     st.markdown("### Matrix Verification")
     st.markdown("Checking symmetry, unit diagonal, and [0,1] range for all similarity matrices")
     
-    matrices_to_verify = {
-        "Total": DATA['total_matrix'],
-        "Content": DATA['content_matrix'],
-        "Typed-Edge": DATA['typed_edge_matrix'],
-        "Edge-Sets": DATA['edge_sets_matrix'],
-        "Structural": DATA['structural_matrix'],
-        "S1_Adjacency": DATA['S1_adjacency'],
-        "S2_Motif": DATA['S2_motif'],
-        "S3_System": DATA['S3_system'],
-        "S4_Functional": DATA['S4_functional'],
-        "S_struct_Fused": DATA['S_struct_fused']
-    }
+    # Every matrix is read and checked only on request (the expander body runs on each rerun)
+    if st.toggle("Run matrix verification", key="verify_run"):
+        matrices_to_verify = {
+            "Total": DATA['total_matrix'],
+            "Content": DATA['content_matrix'],
+            "Typed-Edge": DATA['typed_edge_matrix'],
+            "Edge-Sets": DATA['edge_sets_matrix'],
+            "Structural": DATA['structural_matrix'],
+            "S1_Adjacency": DATA['S1_adjacency'],
+            "S2_Motif": DATA['S2_motif'],
+            "S3_System": DATA['S3_system'],
+            "S4_Functional": DATA['S4_functional'],
+            "S_struct_Fused": DATA['S_struct_fused']
+        }
     
-    verification_results = []
-    for name, matrix in matrices_to_verify.items():
-        if not matrix.empty:
-            v = verify_matrix(matrix)
-            verification_results.append({
-                "Matrix": name,
-                "Symmetric": "✅" if v["sym"] else "❌",
-                "Unit Diagonal": "✅" if v["diag1"] else "❌",
-                "Range [0,1]": "✅" if v["rangeOK"] else "❌",
-                "Overall": "✅" if v["ok"] else "❌"
-            })
-        else:
-            verification_results.append({
-                "Matrix": name,
-                "Symmetric": "N/A",
-                "Unit Diagonal": "N/A",
-                "Range [0,1]": "N/A",
-                "Overall": "Missing"
-            })
+        verification_results = []
+        for name, matrix in matrices_to_verify.items():
+            if not matrix.empty:
+                v = verify_matrix(matrix)
+                verification_results.append({
+                    "Matrix": name,
+                    "Symmetric": "✅" if v["sym"] else "❌",
+                    "Unit Diagonal": "✅" if v["diag1"] else "❌",
+                    "Range [0,1]": "✅" if v["rangeOK"] else "❌",
+                    "Overall": "✅" if v["ok"] else "❌"
+                })
+            else:
+                verification_results.append({
+                    "Matrix": name,
+                    "Symmetric": "N/A",
+                    "Unit Diagonal": "N/A",
+                    "Range [0,1]": "N/A",
+                    "Overall": "Missing"
+                })
     
-    verify_df = pd.DataFrame(verification_results)
-    st.dataframe(verify_df, use_container_width=True)
+        verify_df = pd.DataFrame(verification_results)
+        st.dataframe(verify_df, use_container_width=True)
+    
+    st.markdown("### ANN Recall")
+    st.markdown("IVF approximate search vs exact cosine, per number of probed cells; "
+                "each sampled query's own vector is excluded from both result lists")
+    if st.button("Measure ANN recall", key="ann_recall_run"):
+        st.session_state["ann_recall_shown"] = True
+    if st.session_state.get("ann_recall_shown"):
+        # The content vectors need every reference model featurized, so nothing here runs until asked for
+        ann_indexes = {}
+        if not DATA['s4_motif_share'].empty:
+            ann_indexes["S4 motif-share vectors"] = get_s4_ann()
+        ann_indexes["Content vectors"] = get_content_ann(_refs_signature(DATA['models']))
+        for label, ann in ann_indexes.items():
+            if ann is None or len(ann) < 2:
+                continue
+            probes = (1, 2, 4, ann_nprobe, ann.nlist)
+            rep = ann_recall_report(f"{label}:{len(ann)}", ann, min(top_n, len(ann) - 1), probes)
+            st.markdown(f"**{label}** ({len(ann)} vectors, {ann.nlist} cells)")
+            st.dataframe(rep, use_container_width=True)
 
 st.markdown("---")
 
@@ -882,6 +1193,44 @@ with st.expander("🔬 Methods & Technical Details", expanded=False):
     - Varying complexity (2-8 floors)
     """)
 
+# =========================================
+# PERFORMANCE PROFILE (DEBUG)
+# =========================================
+if DEBUG_MODE:
+    with st.expander("⏱️ Performance Profile", expanded=False):
+        st.markdown("""
+        Wall time, memory and cache hits of every instrumented stage (data loading, parsing, comparison,
+        figure rendering), accumulated over all reruns of this server process.
+        """)
+        prof = PROFILER.snapshot()
+        if prof.empty:
+            st.info("No stage has run yet")
+        else:
+            mib = float(1 << 20)
+            st.dataframe(pd.DataFrame({
+                "Stage": prof["stage"],
+                "Calls": prof["calls"],
+                "Cache hits": prof["hits"],
+                "Cache misses": prof["misses"],
+                "Total (s)": prof["total_s"].round(3),
+                "Mean (ms)": (prof["mean_s"] * 1e3).round(1),
+                "Max (ms)": (prof["max_s"] * 1e3).round(1),
+                "Last (ms)": (prof["last_s"] * 1e3).round(1),
+                "Peak alloc (MiB)": (prof["alloc_peak_bytes"] / mib).round(2),
+                "Peak RSS rise (MiB)": (prof["rss_peak_delta_bytes"] / mib).round(2),
+            }).drop(columns=[] if prof["alloc_peak_bytes"].any() else ["Peak alloc (MiB)"]),
+                use_container_width=True)
+        rss, peak = current_rss_bytes(), peak_rss_bytes()
+        st.caption(f"This rerun so far: {(time.perf_counter() - RUN_T0) * 1e3:.0f} ms"
+                   + (f"  |  RSS {rss / (1 << 20):.0f} MiB" if rss is not None else "")
+                   + (f"  |  peak RSS {peak / (1 << 20):.0f} MiB" if peak is not None else "")
+                   + ("" if PROFILER.tracing() else "  |  enable tracemalloc in the sidebar for allocation peaks"))
+        pc1, pc2 = st.columns(2)
+        pc1.download_button("⬇️ Metrics (Prometheus text)", PROFILER.prometheus_text().encode("utf-8"),
+                            file_name="design_graph_metrics.prom", mime="text/plain")
+        if pc2.button("Reset statistics"):
+            PROFILER.reset()
+
 # =========================================
 # FOOTER
 # =========================================
@@ -0,0 +1,71 @@
+# design_graph — compute engine behind the Design Graph Similarity app
+
+from .predicates import (
+    PRED_KEYS, CONTENT_KEYS, PredicateClassifier, DEFAULT_CLASSIFIER,
+    pred_key_from_uri, predicate_histogram, graph_predicate_counts,
+)
+from .rdfio import sniff_rdf_format, detect_format, parse_graph
+from .stream import stream_predicate_counts, stream_predicate_histogram, PredicateCountingSink
+from .structural import ElementClassifier, load_struct_meta, structural_tables
+from .minhash import (
+    MINHASH_PERM, MINHASH_BANDS, MINHASH_MIN_MODELS, minhash_signature, feature_signatures,
+    estimate_jaccard, lsh_candidates, minhash_jaccard_matrix, minhash_jaccard_row, minhash_error_report,
+)
+from .motifs import MOTIF_CLASSES, detect_motifs
+from .features import extract_model_features
+from .channels import (
+    CHANNELS, CHANNEL_FILES, STRUCT_FILES, SUMMARY_FILES, TYPED_EDGE_DIM, load_weights, cosine_matrix,
+    jaccard_matrix, hashed_count_matrix, top_k_indices, build_channel_matrices, channel_rows, channel_block, pairwise_summary, pairwise_total_summary,
+)
+from .ann import IVFIndex, spherical_kmeans
+from .content import ANN_MIN_MODELS, ContentIndex
+from .parallel import extract_features_parallel, extract_uploads_parallel, predicate_counts_parallel, resolve_workers
+from .engine import (
+    extract_corpus, build_from_directory, write_matrices, save_features, load_features, save_build_info, load_build_info,
+)
+from .condensed import CondensedMatrix, condensed_index
+from .store import MatrixStore, pack_csv_matrices, read_csv_matrices
+from .neighbors import NeighborIndex, build_store_neighbors, store_neighbor_index, topk_neighbors
+from .fusion import FUSION_CHANNELS, FusionEngine, fusion_coefficients
+from .incremental import update_models, splice_matrix, splice_summary, splice_total_summary
+from .online import ReferenceFeatures, batch_compare, score_upload
+from .query import PAIR_CHANNELS, QueryService, UnknownModel, build_topn_from_matrix, pair_breakdown
+from .server import SimilarityAPI, SimilarityServer, run_server
+from .bench import (
+    BENCH_VERSION, REGRESSION_THRESHOLD, time_call, scale_graph, replicate_features, run_benchmarks,
+    save_results, load_results, results_frame, compare_results,
+)
+from .profiling import METRIC_PREFIX, StageProfiler, current_rss_bytes, peak_rss_bytes
+from .synth import (
+    SYNTH_PROFILE_VERSION, SYNTH_NS, SYNTH_FORMATS, learn_profile, overlay_struct_tables, save_profile,
+    load_profile, write_synthetic_graph, generate_corpus,
+)
+
+__all__ = [
+    "PRED_KEYS", "CONTENT_KEYS", "PredicateClassifier", "DEFAULT_CLASSIFIER",
+    "pred_key_from_uri", "predicate_histogram", "graph_predicate_counts",
+    "sniff_rdf_format", "detect_format", "parse_graph",
+    "stream_predicate_counts", "stream_predicate_histogram", "PredicateCountingSink",
+    "ElementClassifier", "load_struct_meta", "structural_tables",
+    "MINHASH_PERM", "MINHASH_BANDS", "MINHASH_MIN_MODELS", "minhash_signature", "feature_signatures",
+    "estimate_jaccard", "lsh_candidates", "minhash_jaccard_matrix", "minhash_jaccard_row", "minhash_error_report",
+    "MOTIF_CLASSES", "detect_motifs",
+    "extract_model_features",
+    "CHANNELS", "CHANNEL_FILES", "STRUCT_FILES", "SUMMARY_FILES", "TYPED_EDGE_DIM", "load_weights", "cosine_matrix",
+    "jaccard_matrix", "hashed_count_matrix", "top_k_indices", "build_channel_matrices", "channel_rows", "channel_block", "pairwise_summary", "pairwise_total_summary",
+    "IVFIndex", "spherical_kmeans", "ANN_MIN_MODELS", "ContentIndex",
+    "extract_features_parallel", "extract_uploads_parallel", "predicate_counts_parallel", "resolve_workers",
+    "extract_corpus", "build_from_directory", "write_matrices", "save_features", "load_features",
+    "save_build_info", "load_build_info",
+    "CondensedMatrix", "condensed_index", "MatrixStore", "pack_csv_matrices", "read_csv_matrices",
+    "NeighborIndex", "build_store_neighbors", "store_neighbor_index", "topk_neighbors",
+    "FUSION_CHANNELS", "FusionEngine", "fusion_coefficients",
+    "update_models", "splice_matrix", "splice_summary", "splice_total_summary",
+    "ReferenceFeatures", "batch_compare", "score_upload", "PAIR_CHANNELS", "QueryService", "UnknownModel", "build_topn_from_matrix", "pair_breakdown",
+    "SimilarityAPI", "SimilarityServer", "run_server",
+    "BENCH_VERSION", "REGRESSION_THRESHOLD", "time_call", "scale_graph", "replicate_features", "run_benchmarks",
+    "save_results", "load_results", "results_frame", "compare_results",
+    "METRIC_PREFIX", "StageProfiler", "current_rss_bytes", "peak_rss_bytes",
+    "SYNTH_PROFILE_VERSION", "SYNTH_NS", "SYNTH_FORMATS", "learn_profile", "overlay_struct_tables", "save_profile",
+    "load_profile", "write_synthetic_graph", "generate_corpus",
+]
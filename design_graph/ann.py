@@ -0,0 +1,126 @@
+# design_graph/ann.py — approximate nearest-neighbour search (IVF, NumPy only)
+#
+# Inverted-file index over L2-normalized vectors: spherical k-means splits the
+# corpus into `nlist` cells, a query scores only the vectors in its `nprobe`
+# best cells. nprobe is the recall/latency knob — nprobe = nlist is an exact
+# scan. `evaluate` measures recall@k against the exact cosine baseline
+# (excluding each query's own vector when the queries come from the index).
+
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .channels import l2_normalize_rows, top_k_indices
+
+def _assign(X: np.ndarray, C: np.ndarray, block: int = 8192) -> np.ndarray:
+    out = np.empty(len(X), dtype=np.int32)
+    for start in range(0, len(X), block):
+        out[start:start + block] = np.argmax(X[start:start + block] @ C.T, axis=1)
+    return out
+
+def spherical_kmeans(X: np.ndarray, k: int, n_iter: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Unit-norm centroids (k×D) and assignments of the rows of normalized X"""
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, len(X)))
+    C = X[rng.choice(len(X), size=k, replace=False)].copy()
+    assign = _assign(X, C)
+    for _ in range(n_iter):
+        sums = np.zeros_like(C)
+        np.add.at(sums, assign, X)
+        empty = np.flatnonzero(~sums.any(axis=1))
+        if len(empty):
+            sums[empty] = X[rng.choice(len(X), size=len(empty), replace=False)]
+        C = l2_normalize_rows(sums).astype(X.dtype)
+        new = _assign(X, C)
+        if np.array_equal(new, assign):
+            break
+        assign = new
+    return C, assign
+
+class IVFIndex:
+    """Inverted-file cosine index; vectors are stored contiguously per cell"""
+
+    def __init__(self, vectors: np.ndarray, models: Optional[Sequence[str]] = None,
+                 nlist: Optional[int] = None, n_iter: int = 10, seed: int = 0):
+        X = l2_normalize_rows(np.asarray(vectors, dtype=float)).astype(np.float32)
+        self.n, self.dim = X.shape
+        self.models = list(models) if models is not None else [str(i) for i in range(self.n)]
+        self.nlist = max(1, min(nlist or int(np.sqrt(self.n)), self.n))
+        self.centroids, assign = spherical_kmeans(X, self.nlist, n_iter, seed)
+        self.nlist = len(self.centroids)
+        order = np.argsort(assign, kind="stable")
+        self.ids = order.astype(np.int64)
+        self.vectors = X[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=self.nlist))])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, id_col: Optional[str] = "model", **kwargs) -> "IVFIndex":
+        """Index the numeric columns of a table such as s4_motif_share_vectors.csv"""
+        models = df[id_col].astype(str).tolist() if id_col in df.columns else [str(i) for i in df.index]
+        return cls(df.select_dtypes("number").to_numpy(dtype=float), models, **kwargs)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _normalize(self, q: np.ndarray) -> np.ndarray:
+        return l2_normalize_rows(np.asarray(q, dtype=float).reshape(1, -1))[0].astype(np.float32)
+
+    def search(self, q: np.ndarray, k: int = 5, nprobe: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, cosines) of the approximate top-k, scanning `nprobe` cells"""
+        q = self._normalize(q)
+        cells = top_k_indices(self.centroids @ q, max(1, min(nprobe, self.nlist)))
+        spans = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in cells]
+        cand = np.concatenate(spans) if spans else np.empty(0, dtype=int)
+        scores = self.vectors[cand] @ q
+        top = top_k_indices(scores, k)
+        return self.ids[cand[top]], scores[top].astype(float)
+
+    def exact(self, q: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact cosine top-k by a full scan (the recall baseline)"""
+        scores = self.vectors @ self._normalize(q)
+        top = top_k_indices(scores, k)
+        return self.ids[top], scores[top].astype(float)
+
+    def topn(self, q: np.ndarray, n: int = 5, nprobe: int = 1) -> List[Tuple[str, float]]:
+        ids, scores = self.search(q, n, nprobe)
+        return [(self.models[i], float(s)) for i, s in zip(ids, scores)]
+
+    def sample_queries(self, n: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """(vectors, row ids) of up to n indexed vectors, for evaluate(..., exclude=ids)"""
+        rows = np.random.default_rng(seed).choice(self.n, size=min(n, self.n), replace=False)
+        return self.vectors[rows], self.ids[rows]
+
+    def evaluate(self, queries: np.ndarray, k: int = 10, nprobes: Sequence[int] = (1, 2, 4, 8),
+                 exclude: Optional[Sequence[int]] = None) -> List[Dict[str, float]]:
+        """Recall@k against exact cosine and mean per-query latency for each nprobe.
+
+        A returned neighbour counts as a hit when its cosine reaches the exact
+        k-th best, so ties among identical vectors are not penalised. Queries
+        drawn from the index itself pass their row ids as `exclude`: the
+        self-match is dropped from both result lists, which would otherwise be
+        a free hit per query.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        skip = [None] * len(queries) if exclude is None else [int(i) for i in exclude]
+        extra = 0 if exclude is None else 1
+
+        def drop(result, own):
+            ids, scores = result
+            return scores[ids != own][:k] if own is not None else scores[:k]
+
+        k = min(k, self.n - extra)
+        t0 = time.perf_counter()
+        kth = [drop(self.exact(q, k + extra), own).min(initial=np.inf) for q, own in zip(queries, skip)]
+        exact_ms = (time.perf_counter() - t0) * 1e3 / len(queries)
+        report = []
+        for nprobe in sorted({max(1, min(p, self.nlist)) for p in nprobes}):
+            t0 = time.perf_counter()
+            found = [drop(self.search(q, k + extra, nprobe), own) for q, own in zip(queries, skip)]
+            ms = (time.perf_counter() - t0) * 1e3 / len(queries)
+            recall = np.mean([np.count_nonzero(f >= t - 1e-6) / max(k, 1) for f, t in zip(found, kth)])
+            report.append({"nprobe": nprobe, "recall": float(recall),
+                           "ms_per_query": ms, "exact_ms_per_query": exact_ms})
+        return report
@@ -0,0 +1,222 @@
+# design_graph/bench.py — benchmark harness for the load / parse / build / fusion path
+#
+# Times the stages the app and the CLI run on every start or upload, on the
+# bundled .rdf models:
+#   parse           parse_graph (the app's graph parse of an upload)
+#   content_vector  stream_predicate_counts (content histogram streamed without a Graph)
+#   features        extract_model_features (all four channels from one parse)
+#   compare_upload  ContentIndex top-n + score_upload (Quick Compare, content and all channels)
+#   load_store      MatrixStore blocks → square frames (the app's dataset load)
+#   load_csv        read_csv_matrices (the CSV fallback of the dataset load)
+#   build_matrices  build_channel_matrices on the corpus features
+#   fusion          FusionEngine.fuse for the thesis weights
+#   linkage         average linkage + dendrogram layout of S_total
+# Graph-size scaling replicates a model's instance nodes k times (class IRIs,
+# predicates and literals are shared), corpus-size scaling replicates the
+# feature list under new model names. Results are JSON so two runs (e.g. two
+# commits) can be compared with compare_results.
+
+from __future__ import annotations
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from rdflib import BNode, Graph, RDF, URIRef
+from scipy.cluster.hierarchy import dendrogram
+
+from .channels import build_channel_matrices, load_weights
+from .condensed import CondensedMatrix
+from .content import ContentIndex
+from .features import extract_model_features
+from .fusion import FusionEngine
+from .online import score_upload
+from .rdfio import parse_graph, sniff_rdf_format
+from .store import MatrixStore, read_csv_matrices
+from .stream import stream_predicate_counts
+from .structural import load_struct_meta
+
+BENCH_VERSION = 1
+# Relative slowdown of a case's median time above which compare_results flags a regression
+REGRESSION_THRESHOLD = 0.25
+
+def time_call(fn: Callable[[], object], repeat: int = 3, warmup: int = 0) -> Dict[str, float]:
+    """min / median / mean wall time (seconds) of `repeat` calls of fn"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"min_s": min(times), "median_s": statistics.median(times),
+            "mean_s": statistics.fmean(times), "repeat": len(times)}
+
+def scale_graph(g: Graph, factor: int) -> Graph:
+    """`factor` disjoint copies of a graph's instance nodes (classes, predicates and literals shared)"""
+    classes = set(g.objects(None, RDF.type))
+    out = Graph()
+    for k in range(factor):
+        suffix = f"_x{k}" if k else ""
+
+        def node(t):
+            if not suffix or t in classes:
+                return t
+            if isinstance(t, BNode):
+                return BNode(f"{t}{suffix}")
+            if isinstance(t, URIRef):
+                return URIRef(f"{t}{suffix}")
+            return t
+
+        for s, p, o in g:
+            out.add((node(s), p, node(o)))
+    return out
+
+def scaled_rdf_bytes(path: Path, factor: int) -> bytes:
+    """RDF/XML (or the source's own format) serialization of scale_graph of a model file"""
+    fmt = sniff_rdf_format(path.name, path.read_bytes()[:512])
+    g = parse_graph(path, fmt=fmt)
+    return scale_graph(g, factor).serialize(format=fmt if fmt in ("xml", "turtle", "nt") else "xml", encoding="utf-8")
+
+def replicate_features(features: List[dict], n: int) -> List[dict]:
+    """A corpus of n models cycling through `features`, each copy under its own model name"""
+    return [dict(features[i % len(features)], model=f"{features[i % len(features)]['model']}#{i // len(features)}")
+            for i in range(n)]
+
+def _record(out: List[dict], stage: str, case: str, size: int, timing: Dict[str, float]) -> None:
+    out.append({"stage": stage, "case": case, "size": size, **timing})
+
+def _git_commit(root: Path) -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                              text=True, timeout=10, check=True).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmarks(rdf_files: Sequence[Path], store_dir: Optional[Path] = None,
+                   csv_dirs: Sequence[Path] = (), scales: Sequence[int] = (1, 2, 4),
+                   corpus_sizes: Sequence[int] = (10, 50, 200), repeat: int = 3,
+                   weights: Optional[Dict[str, float]] = None, meta: Optional[dict] = None,
+                   log: Optional[Callable[[str], None]] = None) -> dict:
+    """Time every stage on the given models; returns the JSON-ready result document"""
+    log = log or (lambda msg: None)
+    weights = weights or load_weights()
+    meta = meta or load_struct_meta()
+    rdf_files = [Path(p) for p in rdf_files]
+    results: List[dict] = []
+
+    # Per-model parse, histogram and feature extraction
+    features = []
+    for path in rdf_files:
+        fmt = sniff_rdf_format(path.name, path.read_bytes()[:512])
+        size = path.stat().st_size
+        log(f"model {path.name}")
+        _record(results, "parse", path.name, size, time_call(lambda: parse_graph(path, fmt=fmt), repeat))
+        _record(results, "content_vector", path.name, size,
+                time_call(lambda: stream_predicate_counts(path, fmt=fmt), repeat))
+        g = parse_graph(path, fmt=fmt)
+        _record(results, "features", path.name, size,
+                time_call(lambda: extract_model_features(g, name=path.name, meta=meta), repeat))
+        features.append(extract_model_features(g, name=path.name, meta=meta))
+
+    # Quick Compare: every model in turn is the upload, the others the references
+    if len(features) > 1:
+        index = ContentIndex.from_counts([f["model"] for f in features], [f["content"] for f in features])
+
+        def compare_all():
+            for i, f in enumerate(features):
+                index.topn(f["content"], 5, exclude=f["model"])
+                score_upload(f, features[:i] + features[i + 1:], weights, meta)
+
+        _record(results, "compare_upload", "all_refs", len(features), time_call(compare_all, repeat))
+
+    # Dataset load from the binary store and from CSV
+    if store_dir is not None and MatrixStore(store_dir).exists():
+        def load_store():
+            store = MatrixStore(store_dir)
+            return {k: store.frame(k) for k in store.keys()}
+
+        _record(results, "load_store", Path(store_dir).name, len(MatrixStore(store_dir).models),
+                time_call(load_store, repeat))
+    if csv_dirs:
+        csv_dirs = [Path(d) for d in csv_dirs]
+
+        def load_csv():
+            return read_csv_matrices(csv_dirs[0], csv_dirs[1] if len(csv_dirs) > 1 else None)
+
+        loaded = load_csv()
+        if loaded:
+            _record(results, "load_csv", csv_dirs[0].name, len(next(iter(loaded.values()))),
+                    time_call(load_csv, repeat))
+
+    # Graph-size scaling on the smallest model
+    if rdf_files and scales:
+        base = min(rdf_files, key=lambda p: p.stat().st_size)
+        for k in scales:
+            data = scaled_rdf_bytes(base, k)
+            fmt = sniff_rdf_format(base.name, data[:512])
+            case = f"{base.name} x{k}"
+            log(f"scale ×{k} of {base.name} ({len(data) >> 10} KiB)")
+            _record(results, "parse_scaled", case, len(data), time_call(lambda: parse_graph(data, fmt=fmt), repeat))
+            _record(results, "content_vector_scaled", case, len(data),
+                    time_call(lambda: stream_predicate_counts(data, fmt=fmt), repeat))
+            g = parse_graph(data, fmt=fmt)
+            _record(results, "features_scaled", case, len(data),
+                    time_call(lambda: extract_model_features(g, name=base.name, meta=meta), repeat))
+
+    # Corpus-size scaling of the matrix builders, fusion and linkage
+    for n in corpus_sizes if features else ():
+        corpus = replicate_features(features, n)
+        log(f"corpus of {n} models")
+        _record(results, "build_matrices", "corpus", n,
+                time_call(lambda: build_channel_matrices(corpus, weights, meta, minhash=False), repeat))
+        mats = build_channel_matrices(corpus, weights, meta, minhash=False)
+        engine = FusionEngine.from_matrices(mats)
+        _record(results, "fusion", "corpus", n,
+                time_call(lambda: engine.fuse(weights, meta["DEFAULTS"]["w_motif"], meta["DEFAULTS"]["w_system"]), repeat))
+        total = CondensedMatrix.from_square(mats["total"])
+        _record(results, "linkage", "corpus", n,
+                time_call(lambda: dendrogram(total.linkage(method="average"), no_plot=True), repeat))
+
+    root = Path(__file__).resolve().parent.parent
+    return {
+        "version": BENCH_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(root),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+def save_results(doc: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+def load_results(path: Path) -> dict:
+    with open(path, "r") as f:
+        doc = json.load(f)
+    if doc.get("version") != BENCH_VERSION:
+        raise ValueError(f"Unsupported benchmark result version in {path}")
+    return doc
+
+def results_frame(doc: dict) -> pd.DataFrame:
+    """One row per (stage, case, size) with its timings"""
+    return pd.DataFrame(doc["results"], columns=["stage", "case", "size", "min_s", "median_s", "mean_s", "repeat"])
+
+def compare_results(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> pd.DataFrame:
+    """Median time of every case present in both runs, with the ratio and a regression flag"""
+    key = ["stage", "case", "size"]
+    merged = results_frame(baseline)[key + ["median_s"]].merge(
+        results_frame(current)[key + ["median_s"]], on=key, suffixes=("_baseline", "_current"))
+    merged["ratio"] = merged["median_s_current"] / merged["median_s_baseline"].replace(0.0, np.nan)
+    merged["regression"] = merged["ratio"] > 1.0 + threshold
+    return merged
@@ -0,0 +1,259 @@
+# design_graph/channels.py — vectorized all-pairs channel matrices
+#
+# Every channel is built from one stacked feature matrix per corpus, so an
+# N-model corpus costs a handful of matrix products instead of N² Python
+# comparisons.
+
+from __future__ import annotations
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .minhash import MINHASH_MIN_MODELS, feature_signatures, minhash_jaccard_matrix, minhash_jaccard_row
+from .predicates import CONTENT_KEYS
+from .structural import load_struct_meta, structural_vectors
+
+CHANNELS = ["content", "typed_edge", "edge_sets", "structural"]
+CHANNEL_FILES = {
+    "content": "content_similarity_matrix.csv",
+    "typed_edge": "typed_edge_similarity_matrix.csv",
+    "edge_sets": "edge_sets_similarity_matrix.csv",
+    "structural": "structural_similarity_matrix.csv",
+    "total": "total_similarity_matrix.csv",
+}
+STRUCT_FILES = {
+    "S1_adjacency": "S1_adjacency_similarity.csv",
+    "S2_motif": "S2_motif_similarity.csv",
+    "S3_system": "S3_system_similarity.csv",
+    "S4_functional": "S4_functional_similarity.csv",
+    "S_struct_fused": "S_struct_fused_similarity.csv",
+}
+SUMMARY_FILES = {
+    "content": "pairwise_content_summary.csv",
+    "typed_edge": "pairwise_typed_edge_summary.csv",
+    "edge_sets": "pairwise_edge_sets_summary.csv",
+    "structural": "pairwise_structural_summary.csv",
+    "total": "pairwise_total_summary.csv",
+}
+STRUCT_PARTS = ["S1_adjacency", "S2_motif", "S3_system", "S4_functional"]
+DEFAULT_WEIGHTS = {"content": 0.30, "typed_edge": 0.20, "edge_sets": 0.10, "structural": 0.40}
+# typed-edge keys ("subjectType|predicate|objectType") are hashed into this many
+# columns, so the matrix width does not grow with the corpus vocabulary
+TYPED_EDGE_DIM = 1 << 20
+
+def load_weights(path: Optional[Path] = None) -> Dict[str, float]:
+    """Channel weights from a weights_used.json (flat or w_* layout), normalized to sum 1"""
+    w = dict(DEFAULT_WEIGHTS)
+    if path is not None and Path(path).exists():
+        with open(path, "r") as f:
+            raw = json.load(f)
+        raw = raw.get("weights_normalized", raw)
+        aliases = {"w_content": "content", "w_typed": "typed_edge", "w_edge": "edge_sets", "w_struct": "structural"}
+        for k, v in raw.items():
+            k = aliases.get(k, k)
+            if k in w:
+                w[k] = float(v)
+    total = sum(w.values()) or 1.0
+    return {k: v / total for k, v in w.items()}
+
+def _finish(S: np.ndarray) -> np.ndarray:
+    np.clip(S, 0.0, 1.0, out=S)
+    np.fill_diagonal(S, 1.0)
+    return S
+
+def l2_normalize_rows(X):
+    """Row-wise L2 normalization of a dense or sparse matrix; zero rows stay zero"""
+    if sparse.issparse(X):
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        return sparse.diags(inv) @ X
+    X = np.asarray(X, dtype=float)
+    norms = np.linalg.norm(X, axis=1)
+    inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return X * inv[:, None]
+
+def cosine_matrix(X) -> np.ndarray:
+    """All-pairs cosine similarity of the rows of X (dense or sparse)"""
+    Y = l2_normalize_rows(X)
+    S = Y @ Y.T
+    S = S.toarray() if sparse.issparse(S) else np.array(S)
+    return _finish(S)
+
+def top_k_indices(scores: np.ndarray, k: int, exclude: Optional[int] = None) -> np.ndarray:
+    """Indices of the k largest scores, best first, via argpartition (O(N + k log k))"""
+    scores = np.asarray(scores, dtype=float)
+    if exclude is not None:
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+    k = min(k, len(scores) - (exclude is not None))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+def jaccard_matrix(sets: Sequence[np.ndarray]) -> np.ndarray:
+    """All-pairs Jaccard of integer sets via one sparse incidence product"""
+    sizes = np.array([len(s) for s in sets], dtype=float)
+    if len(sets) == 0:
+        return np.zeros((0, 0))
+    flat = np.concatenate([np.asarray(s, dtype=np.uint64) for s in sets])
+    _, cols = np.unique(flat, return_inverse=True)
+    rows = np.repeat(np.arange(len(sets)), sizes.astype(int))
+    A = sparse.csr_matrix((np.ones(len(flat), dtype=np.float32), (rows, cols.ravel())),
+                          shape=(len(sets), int(cols.max()) + 1 if len(flat) else 0))
+    inter = (A @ A.T).toarray().astype(float)
+    union = sizes[:, None] + sizes[None, :] - inter
+    J = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+    return _finish(J)
+
+@lru_cache(maxsize=1 << 16)
+def _hash_bucket(key: str, dim: int) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") % dim
+
+def hashed_count_matrix(dicts: List[dict], dim: int = TYPED_EDGE_DIM) -> sparse.csr_matrix:
+    """N×dim sparse count matrix with each key hashed to a fixed column (colliding keys add up)"""
+    rows, cols, vals = [], [], []
+    for i, d in enumerate(dicts):
+        rows.extend([i] * len(d))
+        cols.extend(_hash_bucket(k, dim) for k in d)
+        vals.extend(float(v) for v in d.values())
+    X = sparse.csr_matrix((vals, (rows, cols)), shape=(len(dicts), dim))
+    X.sum_duplicates()
+    return X
+
+def _feature_matrices(features: List[dict], meta: dict) -> dict:
+    """Stacked per-channel inputs: dense/sparse row matrices, edge sets for Jaccard"""
+    vecs = [structural_vectors(f, meta) for f in features]
+    return {
+        "content": np.array([[f["content"].get(k, 0) for k in CONTENT_KEYS] for f in features], dtype=float),
+        "typed_edge": hashed_count_matrix([f["typed_edges"] for f in features]),
+        "edge_sets": [np.asarray(f["edges"], dtype=np.uint64) for f in features],
+        "S1_adjacency": np.array([v["adjacency"] for v in vecs]),
+        "S2_motif": np.array([v["motif_share"] for v in vecs]),
+        "S3_system": np.array([v["system"] for v in vecs]),
+        "S4_functional": np.array([v["functional"] for v in vecs]),
+    }
+
+def _fuse(mats: dict, weights: Dict[str, float], meta: dict) -> dict:
+    d = meta["DEFAULTS"]
+    w_motif, w_system = d["w_motif"], d["w_system"]
+    mats["structural"] = (w_motif * mats["S2_motif"] + w_system * mats["S3_system"]) / ((w_motif + w_system) or 1.0)
+    mats["S_struct_fused"] = mats["structural"]
+    mats["total"] = sum(weights[c] * mats[c] for c in CHANNELS)
+    return mats
+
+def build_channel_matrices(features: List[dict], weights: Optional[Dict[str, float]] = None,
+                           meta: Optional[dict] = None, minhash: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
+    """Content, typed-edge, edge-sets, structural (+ S1–S4 parts) and total matrices.
+
+    Edge-sets is exact Jaccard, or MinHash/LSH (exact for LSH candidate pairs)
+    when `minhash` is set — by default from MINHASH_MIN_MODELS models on.
+    """
+    weights = weights or load_weights()
+    meta = meta or load_struct_meta()
+    models = [f["model"] for f in features]
+    X = _feature_matrices(features, meta)
+
+    mats = {k: cosine_matrix(X[k]) for k in ["content", "typed_edge"] + STRUCT_PARTS}
+    if minhash if minhash is not None else len(features) >= MINHASH_MIN_MODELS:
+        mats["edge_sets"], _ = minhash_jaccard_matrix(X["edge_sets"], feature_signatures(features))
+        np.fill_diagonal(mats["edge_sets"], 1.0)
+    else:
+        mats["edge_sets"] = jaccard_matrix(X["edge_sets"])
+    mats = _fuse(mats, weights, meta)
+    _finish(mats["total"])
+    return {k: pd.DataFrame(v, index=models, columns=models) for k, v in mats.items()}
+
+def _cosine_row(X, i: int) -> np.ndarray:
+    Y = l2_normalize_rows(X)
+    r = Y @ Y[i].T
+    return np.asarray(r.toarray() if sparse.issparse(r) else r, dtype=float).ravel()
+
+def _cosine_block(Xq, X) -> np.ndarray:
+    B = l2_normalize_rows(Xq) @ l2_normalize_rows(X).T
+    return np.asarray(B.toarray() if sparse.issparse(B) else B, dtype=float)
+
+def _jaccard_row(q: np.ndarray, sets: Sequence[np.ndarray]) -> np.ndarray:
+    inter = np.array([len(np.intersect1d(q, e, assume_unique=True)) for e in sets], dtype=float)
+    union = len(q) + np.array([len(e) for e in sets], dtype=float) - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+def channel_rows(features: List[dict], i: int, weights: Optional[Dict[str, float]] = None,
+                 meta: Optional[dict] = None, minhash: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """Row i of every channel matrix, in O(N) instead of the full O(N²) build.
+
+    `minhash` picks the edge-sets estimator exactly as in `build_channel_matrices`;
+    pass the one the stored matrix was built with so spliced rows match it.
+    """
+    weights = weights or load_weights()
+    meta = meta or load_struct_meta()
+    X = _feature_matrices(features, meta)
+
+    rows = {k: _cosine_row(X[k], i) for k in ["content", "typed_edge"] + STRUCT_PARTS}
+    if minhash if minhash is not None else len(features) >= MINHASH_MIN_MODELS:
+        rows["edge_sets"] = minhash_jaccard_row(X["edge_sets"], feature_signatures(features), i)
+    else:
+        rows["edge_sets"] = _jaccard_row(X["edge_sets"][i], X["edge_sets"])
+    for k in ["content", "typed_edge", "edge_sets"] + STRUCT_PARTS:
+        np.clip(rows[k], 0.0, 1.0, out=rows[k])
+        rows[k][i] = 1.0
+    rows = _fuse(rows, weights, meta)
+    np.clip(rows["total"], 0.0, 1.0, out=rows["total"])
+    rows["total"][i] = 1.0
+    return rows
+
+def channel_block(queries: List[dict], features: List[dict], weights: Optional[Dict[str, float]] = None,
+                  meta: Optional[dict] = None, minhash: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """Q×N block of every channel matrix (queries against `features`), without the N×N part.
+
+    Each entry equals the one the corpus build of queries + features would
+    give; `minhash` picks the edge-sets estimator as in `build_channel_matrices`.
+    """
+    weights = weights or load_weights()
+    meta = meta or load_struct_meta()
+    Xq, X = _feature_matrices(queries, meta), _feature_matrices(features, meta)
+
+    block = {k: _cosine_block(Xq[k], X[k]) for k in ["content", "typed_edge"] + STRUCT_PARTS}
+    if minhash if minhash is not None else len(queries) + len(features) >= MINHASH_MIN_MODELS:
+        sigq, sig = feature_signatures(queries), feature_signatures(features)
+        block["edge_sets"] = np.array(
+            [minhash_jaccard_row([q, *X["edge_sets"]], np.vstack([sigq[a:a + 1], sig]), 0)[1:]
+             for a, q in enumerate(Xq["edge_sets"])]).reshape(len(queries), len(features))
+    else:
+        block["edge_sets"] = np.array([_jaccard_row(q, X["edge_sets"]) for q in Xq["edge_sets"]]
+                                      ).reshape(len(queries), len(features))
+    for k in ["content", "typed_edge", "edge_sets"] + STRUCT_PARTS:
+        np.clip(block[k], 0.0, 1.0, out=block[k])
+    block = _fuse(block, weights, meta)
+    np.clip(block["total"], 0.0, 1.0, out=block["total"])
+    return block
+
+def pairwise_summary(matrix: pd.DataFrame, channel: str) -> pd.DataFrame:
+    """Upper-triangle (i, j, similarity, channel) table of one channel matrix"""
+    models = list(matrix.index)
+    iu, ju = np.triu_indices(len(models), k=1)
+    return pd.DataFrame({
+        "i": np.array(models, dtype=object)[iu],
+        "j": np.array(models, dtype=object)[ju],
+        "similarity": matrix.to_numpy()[iu, ju],
+        "channel": channel,
+    })
+
+def pairwise_total_summary(matrices: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """All model pairs with the total and per-channel scores, best first"""
+    models = list(matrices["total"].index)
+    iu, ju = np.triu_indices(len(models), k=1)
+    cols = {"total": "total", "content_cos": "content", "typed_edge_cos": "typed_edge",
+            "edge_sets_jaccard": "edge_sets", "struct_sim": "structural"}
+    out = pd.DataFrame({
+        "model_A": np.array(models, dtype=object)[iu],
+        "model_B": np.array(models, dtype=object)[ju],
+        **{col: matrices[c].loc[models, models].to_numpy()[iu, ju] for col, c in cols.items()},
+    })
+    return out.sort_values("total", ascending=False, kind="stable").reset_index(drop=True)
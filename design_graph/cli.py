@@ -0,0 +1,322 @@
+# design_graph/cli.py — command-line entry point
+#
+#   python -m design_graph build <rdf_dir> --out <dir> [--struct-out data/] [--weights weights_used.json]
+#                                [--meta s1s4_meta.json] [--features model_features.json] [--force]
+#   python -m design_graph update <model.rdf ...> --out <dir> [--remove NAME ...] [--struct-out data/] [--force]
+#   python -m design_graph pack --out <dir> --store <store_dir> [--struct-out data/] [--force]   CSV → binary store
+#   python -m design_graph export --store <store_dir> --out <dir> [--struct-out data/] [--force] binary store → CSV
+#   python -m design_graph ann-eval (--features model_features.json | --vectors s4_motif_share_vectors.csv)
+#                                   [--nlist N] [--nprobe 1 2 4 8] [--k 10]          ANN recall vs exact cosine
+#   python -m design_graph inventory --features model_features.json --out <dir>     S1 inventory + role counts
+#   python -m design_graph minhash-eval --features model_features.json [--num-perm 128] [--bands 32]
+#   python -m design_graph serve --store <store_dir> [--refs <rdf_dir>] [--features-cache .cache/model_features.json]
+#                                [--host 127.0.0.1] [--port 8765]
+#   python -m design_graph bench [model.rdf ...] [--scale 1 2 4] [--corpus 10 50 200] [--repeat 3]
+#                                [--out bench.json] [--baseline old_bench.json] [--threshold 0.25]
+#   python -m design_graph synth --out <dir> --models 1000 [--triples 20000] [--families 10] [--mutation 0.1]
+#                                [--format nt|xml] [--profile synth_profile.json] [--refs <rdf_dir>]
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from .bench import REGRESSION_THRESHOLD, compare_results, load_results, results_frame, run_benchmarks, save_results
+from .channels import CHANNEL_FILES, load_weights
+from .engine import build_from_directory, list_rdf_files, load_features
+from .ann import IVFIndex
+from .incremental import update_models
+from .minhash import MINHASH_BANDS, MINHASH_PERM, minhash_error_report
+from .predicates import CONTENT_KEYS
+from .neighbors import build_store_neighbors
+from .query import REF_FEATURES_PATH, QueryService
+from .server import run_server
+from .store import MatrixStore, pack_csv_matrices
+from .structural import load_struct_meta, structural_tables
+from .synth import SYNTH_FORMATS, generate_corpus, learn_profile, load_profile, overlay_struct_tables, save_profile
+
+BUNDLE_DIR = Path(__file__).resolve().parent.parent / "thesis_submission_bundle_ALL_2"
+DEFAULT_WEIGHTS_PATH = BUNDLE_DIR / "weights_used.json"
+DEFAULT_META_PATH = BUNDLE_DIR / "STRUCTURAL_PIPELINE" / "s1s4_meta.json"
+DEFAULT_RDF_DIR = BUNDLE_DIR.parent
+# The thesis results: build/update/pack/export only write here with --force
+PROTECTED_DIRS = (BUNDLE_DIR, BUNDLE_DIR.parent / "data")
+FEATURES_FILE = "model_features.json"
+
+def _features_path(args: argparse.Namespace) -> Path:
+    return Path(args.features) if args.features else Path(args.out) / FEATURES_FILE
+
+def _protected_target(args: argparse.Namespace, *paths: Optional[str]) -> Optional[Path]:
+    """First output path inside a protected directory, unless --force was given"""
+    if args.force:
+        return None
+    for p in paths:
+        if p is None:
+            continue
+        target = Path(p).resolve()
+        if any(target == d.resolve() or d.resolve() in target.parents for d in PROTECTED_DIRS):
+            return target
+    return None
+
+def _refuse(target: Path) -> int:
+    print(f"Refusing to overwrite the thesis results in {target}; pass --force to replace them", file=sys.stderr)
+    return 2
+
+def _cmd_build(args: argparse.Namespace) -> int:
+    target = _protected_target(args, args.out, args.struct_out, args.store, str(_features_path(args)))
+    if target is not None:
+        return _refuse(target)
+    t0 = time.perf_counter()
+    matrices = build_from_directory(
+        Path(args.rdf_dir), Path(args.out),
+        weights_path=Path(args.weights) if args.weights else None,
+        meta_path=Path(args.meta) if args.meta else None,
+        features_path=_features_path(args),
+        struct_dir=Path(args.struct_out) if args.struct_out else None,
+        store_dir=Path(args.store) if args.store else None,
+        workers=args.workers, chunksize=args.chunksize,
+        minhash={"auto": None, "exact": False, "minhash": True}[args.edge_sets],
+    )
+    n = len(matrices["total"])
+    print(f"Built {len(CHANNEL_FILES)} matrices for {n} models in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    return 0
+
+def _cmd_update(args: argparse.Namespace) -> int:
+    target = _protected_target(args, args.out, args.struct_out, args.store, str(_features_path(args)))
+    if target is not None:
+        return _refuse(target)
+    t0 = time.perf_counter()
+    changed = update_models(
+        Path(args.out), _features_path(args), add=[Path(p) for p in args.models], remove=args.remove,
+        struct_dir=Path(args.struct_out) if args.struct_out else None,
+        weights_path=Path(args.weights) if args.weights else None,
+        meta_path=Path(args.meta) if args.meta else None,
+        store_dir=Path(args.store) if args.store else None,
+        workers=args.workers, chunksize=args.chunksize,
+    )
+    print(f"Updated {len(changed)} model(s), removed {len(args.remove)} in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    return 0
+
+def _cmd_pack(args: argparse.Namespace) -> int:
+    target = _protected_target(args, args.store)
+    if target is not None:
+        return _refuse(target)
+    store = pack_csv_matrices(Path(args.out), Path(args.store), Path(args.struct_out) if args.struct_out else None)
+    build_store_neighbors(store)
+    print(f"Packed {len(store.keys())} matrices for {len(store.models)} models -> {args.store}")
+    return 0
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    target = _protected_target(args, args.out, args.struct_out)
+    if target is not None:
+        return _refuse(target)
+    written = MatrixStore(Path(args.store)).export_csv(Path(args.out), Path(args.struct_out) if args.struct_out else None)
+    print(f"Exported {len(written)} CSV matrices -> {args.out}")
+    return 0
+
+def _cmd_ann_eval(args: argparse.Namespace) -> int:
+    if args.features:
+        feats = load_features(Path(args.features))
+        index = IVFIndex([[f["content"].get(k, 0) for k in CONTENT_KEYS] for f in feats],
+                         [f["model"] for f in feats], nlist=args.nlist)
+    else:
+        index = IVFIndex.from_frame(pd.read_csv(args.vectors), nlist=args.nlist)
+    queries, ids = index.sample_queries(args.queries)
+    print(f"{len(index)} vectors, {index.nlist} cells, recall@{args.k} over {len(ids)} queries (self-match excluded)")
+    print(f"{'nprobe':>7} {'recall':>8} {'ms/query':>10} {'exact ms':>10}")
+    for r in index.evaluate(queries, args.k, args.nprobe, exclude=ids):
+        print(f"{r['nprobe']:>7} {r['recall']:>8.3f} {r['ms_per_query']:>10.3f} {r['exact_ms_per_query']:>10.3f}")
+    return 0
+
+def _cmd_inventory(args: argparse.Namespace) -> int:
+    inventory, functional = structural_tables(load_features(Path(args.features)))
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    inventory.to_csv(out / "s1_inventory.csv")
+    functional.to_csv(out / "s1_functional_counts.csv")
+    print(f"Wrote inventory and functional counts for {len(inventory)} models -> {args.out}")
+    return 0
+
+def _cmd_minhash_eval(args: argparse.Namespace) -> int:
+    r = minhash_error_report(load_features(Path(args.features)), args.num_perm, args.bands)
+    print(f"{r['models']} models, {r['pairs']} pairs, {r['num_perm']} permutations in {r['bands']} bands")
+    print(f"LSH candidates recomputed exactly: {r['exact_pairs']}")
+    print(f"MinHash estimate  max |err| {r['estimate_max_abs_err']:.4f}  mean {r['estimate_mean_abs_err']:.4f}"
+          f"  (1-sigma bound {r['bound']:.4f})")
+    print(f"Edge-sets channel max |err| {r['channel_max_abs_err']:.4f}  mean {r['channel_mean_abs_err']:.4f}")
+    return 0
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    refs = list_rdf_files(Path(args.refs)) if args.refs else []
+    service = QueryService.from_dir(Path(args.store), refs, features_cache=Path(args.features_cache))
+    if refs:
+        service.content_index()  # featurize the references before the first upload arrives
+    print(f"Serving {len(service.models)} models ({len(refs)} reference files) on http://{args.host}:{args.port}")
+    run_server(service, args.host, args.port, args.threads)
+    return 0
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    models = [Path(p) for p in args.models] or list_rdf_files(DEFAULT_RDF_DIR)
+    csv_dirs = [Path(args.csv)] + ([Path(args.struct_csv)] if args.struct_csv else []) if args.csv else []
+    doc = run_benchmarks(
+        models, store_dir=Path(args.store) if args.store else None, csv_dirs=csv_dirs,
+        scales=args.scale, corpus_sizes=args.corpus, repeat=args.repeat,
+        weights=load_weights(Path(args.weights)), meta=load_struct_meta(Path(args.meta)),
+        log=lambda msg: print(f"  {msg}", file=sys.stderr),
+    )
+    frame = results_frame(doc)
+    print(frame.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if args.out:
+        save_results(doc, Path(args.out))
+        print(f"Wrote {len(frame)} timings -> {args.out}")
+    if not args.baseline:
+        return 0
+    cmp = compare_results(load_results(Path(args.baseline)), doc, args.threshold)
+    print(cmp.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    slower = cmp[cmp["regression"]]
+    print(f"{len(slower)} of {len(cmp)} cases slower than the baseline by more than {args.threshold:.0%}")
+    return 1 if len(slower) else 0
+
+def _cmd_synth(args: argparse.Namespace) -> int:
+    t0 = time.perf_counter()
+    if args.profile and Path(args.profile).exists():
+        profile = load_profile(Path(args.profile))
+    else:
+        refs = list_rdf_files(Path(args.refs))
+        profile = overlay_struct_tables(learn_profile(refs, load_struct_meta(Path(args.meta))),
+                                        Path(args.inventory) if args.inventory else None,
+                                        Path(args.motifs) if args.motifs else None)
+        print(f"Learned a profile from {len(refs)} models")
+        if args.profile:
+            save_profile(profile, Path(args.profile))
+    paths = generate_corpus(profile, Path(args.out), args.models, args.triples, args.families,
+                            args.mutation, args.format, args.seed, args.workers)
+    print(f"Wrote {len(paths)} synthetic models in {min(args.families, args.models)} families "
+          f"in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="design_graph", description="Design graph similarity engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="recompute all channel matrices from a directory of RDF models")
+    b.add_argument("rdf_dir", help="directory containing .rdf/.ttl/.nt models")
+    b.add_argument("--out", required=True, help="output directory for the *_similarity_matrix.csv files")
+    b.add_argument("--struct-out", default=None, help="also write S1–S4 / S_struct_fused matrices to this directory")
+    b.add_argument("--weights", default=str(DEFAULT_WEIGHTS_PATH), help="fusion weights (weights_used.json)")
+    b.add_argument("--meta", default=str(DEFAULT_META_PATH), help="structural settings (s1s4_meta.json)")
+    b.add_argument("--features", default=None, help=f"per-model features JSON (default: <out>/{FEATURES_FILE})")
+    b.add_argument("--store", default=None, help="also write the binary matrix store to this directory")
+    b.add_argument("--workers", type=int, default=0, help="parser processes (0 = one per CPU, 1 = serial)")
+    b.add_argument("--chunksize", type=int, default=1, help="files handed to a worker at a time")
+    b.add_argument("--edge-sets", choices=["auto", "exact", "minhash"], default="auto",
+                   help="edge-sets Jaccard: exact, MinHash/LSH, or MinHash from 2000 models on (auto)")
+    b.add_argument("--force", action="store_true", help="allow writing into the thesis bundle or data/")
+    b.set_defaults(func=_cmd_build)
+
+    u = sub.add_parser("update", help="add, re-extract or remove single models without a full rebuild")
+    u.add_argument("models", nargs="*", help="new or changed .rdf/.ttl/.nt models")
+    u.add_argument("--out", required=True, help="directory holding the matrices written by `build`")
+    u.add_argument("--remove", nargs="*", default=[], help="model names to drop from the matrices")
+    u.add_argument("--struct-out", default=None, help="directory holding the S1–S4 / S_struct_fused matrices")
+    u.add_argument("--weights", default=str(DEFAULT_WEIGHTS_PATH), help="fusion weights (weights_used.json)")
+    u.add_argument("--meta", default=str(DEFAULT_META_PATH), help="structural settings (s1s4_meta.json)")
+    u.add_argument("--features", default=None, help=f"per-model features JSON (default: <out>/{FEATURES_FILE})")
+    u.add_argument("--store", default=None, help="binary matrix store to read and update")
+    u.add_argument("--workers", type=int, default=0, help="parser processes (0 = one per CPU, 1 = serial)")
+    u.add_argument("--chunksize", type=int, default=1, help="files handed to a worker at a time")
+    u.add_argument("--force", action="store_true", help="allow writing into the thesis bundle or data/")
+    u.set_defaults(func=_cmd_update)
+
+    p = sub.add_parser("pack", help="convert CSV similarity matrices into a binary matrix store")
+    p.add_argument("--out", required=True, help="directory holding the *_similarity_matrix.csv files")
+    p.add_argument("--struct-out", default=None, help="directory holding the S1–S4 / S_struct_fused matrices")
+    p.add_argument("--store", required=True, help="store directory to write")
+    p.add_argument("--force", action="store_true", help="allow writing into the thesis bundle or data/")
+    p.set_defaults(func=_cmd_pack)
+
+    e = sub.add_parser("export", help="write a binary matrix store back out as CSV matrices")
+    e.add_argument("--store", required=True, help="store directory to read")
+    e.add_argument("--out", required=True, help="directory for the *_similarity_matrix.csv files")
+    e.add_argument("--struct-out", default=None, help="directory for the S1–S4 / S_struct_fused matrices")
+    e.add_argument("--force", action="store_true", help="allow writing into the thesis bundle or data/")
+    e.set_defaults(func=_cmd_export)
+
+    a = sub.add_parser("ann-eval", help="measure IVF recall/latency against exact cosine")
+    src = a.add_mutually_exclusive_group(required=True)
+    src.add_argument("--features", help="per-model features JSON (content vectors)")
+    src.add_argument("--vectors", help="CSV with a model column and numeric vector columns (e.g. S4 motif shares)")
+    a.add_argument("--nlist", type=int, default=None, help="number of IVF cells (default: sqrt(N))")
+    a.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="cells scanned per query")
+    a.add_argument("--k", type=int, default=10, help="neighbours per query")
+    a.add_argument("--queries", type=int, default=200, help="corpus vectors sampled as queries")
+    a.set_defaults(func=_cmd_ann_eval)
+
+    i = sub.add_parser("inventory", help="write the S1 element inventory and functional-role counts")
+    i.add_argument("--features", required=True, help="per-model features JSON written by `build`")
+    i.add_argument("--out", required=True, help="directory for s1_inventory.csv / s1_functional_counts.csv")
+    i.set_defaults(func=_cmd_inventory)
+
+    m = sub.add_parser("minhash-eval", help="measure MinHash/LSH edge-sets error against exact Jaccard")
+    m.add_argument("--features", required=True, help="per-model features JSON written by `build`")
+    m.add_argument("--num-perm", type=int, default=MINHASH_PERM, help="MinHash permutations per signature")
+    m.add_argument("--bands", type=int, default=MINHASH_BANDS, help="LSH bands (num-perm / bands rows each)")
+    m.set_defaults(func=_cmd_minhash_eval)
+
+    s = sub.add_parser("serve", help="headless HTTP API for top-N, pair and upload queries")
+    s.add_argument("--store", default=str(BUNDLE_DIR / "MATRIX_STORE"), help="binary matrix store to serve")
+    s.add_argument("--refs", default=None, help="directory of reference RDF models for upload comparison")
+    s.add_argument("--features-cache", default=str(REF_FEATURES_PATH),
+                   help="JSON cache of the references' channel features")
+    s.add_argument("--host", default="127.0.0.1", help="interface to bind")
+    s.add_argument("--port", type=int, default=8765, help="port to listen on")
+    s.add_argument("--threads", type=int, default=8, help="query worker threads")
+    s.set_defaults(func=_cmd_serve)
+
+    r = sub.add_parser("bench", help="time parsing, feature extraction, matrix builds, fusion and linkage")
+    r.add_argument("models", nargs="*", help="RDF models to time (default: the bundled .rdf files)")
+    r.add_argument("--store", default=str(BUNDLE_DIR / "MATRIX_STORE"), help="binary matrix store to time loading")
+    r.add_argument("--csv", default=str(BUNDLE_DIR / "CHANNEL_MATRICES"), help="CSV matrices to time loading")
+    r.add_argument("--struct-csv", default=None, help="directory holding the S1–S4 / S_struct_fused matrices")
+    r.add_argument("--scale", type=int, nargs="*", default=[1, 2, 4],
+                   help="graph-size factors applied to the smallest model")
+    r.add_argument("--corpus", type=int, nargs="*", default=[10, 50, 200],
+                   help="corpus sizes for the matrix build, fusion and linkage")
+    r.add_argument("--repeat", type=int, default=3, help="timed runs per case (the median is compared)")
+    r.add_argument("--weights", default=str(DEFAULT_WEIGHTS_PATH), help="fusion weights (weights_used.json)")
+    r.add_argument("--meta", default=str(DEFAULT_META_PATH), help="structural settings (s1s4_meta.json)")
+    r.add_argument("--out", default=None, help="write the results JSON here")
+    r.add_argument("--baseline", default=None, help="results JSON of an earlier run to compare against")
+    r.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                   help="relative median slowdown reported as a regression (exit status 1)")
+    r.set_defaults(func=_cmd_bench)
+
+    y = sub.add_parser("synth", help="generate synthetic design graphs with a controllable similarity structure")
+    y.add_argument("--out", required=True, help="directory for the synthetic models and synthetic_manifest.csv")
+    y.add_argument("--models", type=int, required=True, help="number of models to write")
+    y.add_argument("--triples", type=int, default=None, help="triples per model (default: the reference mean)")
+    y.add_argument("--families", type=int, default=10, help="prototypes; models of one family are near-duplicates")
+    y.add_argument("--mutation", type=float, default=0.1, help="share of each model's triples redrawn from its own seed")
+    y.add_argument("--format", choices=sorted(SYNTH_FORMATS), default="nt", help="N-Triples or RDF/XML")
+    y.add_argument("--seed", type=int, default=0, help="corpus seed")
+    y.add_argument("--profile", default=None, help="profile JSON to reuse (learned and written here if missing)")
+    y.add_argument("--refs", default=str(DEFAULT_RDF_DIR), help="reference RDF models to learn the profile from")
+    y.add_argument("--inventory", default=str(BUNDLE_DIR / "STRUCTURAL_PIPELINE" / "s1_inventory.csv"),
+                   help="S1 inventory table overriding the learned element counts")
+    y.add_argument("--motifs", default=str(BUNDLE_DIR / "STRUCTURAL_PIPELINE" / "s2_motifs.csv"),
+                   help="S2 motif table overriding the learned motif densities")
+    y.add_argument("--meta", default=str(DEFAULT_META_PATH), help="structural settings (s1s4_meta.json)")
+    y.add_argument("--workers", type=int, default=0, help="writer processes (0 = one per CPU, 1 = serial)")
+    y.set_defaults(func=_cmd_synth)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
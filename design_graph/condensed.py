@@ -0,0 +1,96 @@
+# design_graph/condensed.py — condensed upper-triangle similarity matrices
+#
+# Every channel matrix is symmetric with a unit diagonal, so only the
+# N(N-1)/2 entries above the diagonal are kept, in scipy's `squareform`
+# order: (0,1), (0,2), …, (0,N-1), (1,2), …, (N-2,N-1).
+
+from __future__ import annotations
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import linkage as _linkage
+
+Key = Union[int, str]
+
+def condensed_size(n: int) -> int:
+    return n * (n - 1) // 2
+
+def order_from_size(m: int) -> int:
+    """N of an N×N matrix whose condensed form has m entries"""
+    n = int(round((1 + np.sqrt(1 + 8 * m)) / 2))
+    if condensed_size(n) != m:
+        raise ValueError(f"{m} is not a triangular number of pairs")
+    return n
+
+def condensed_index(n: int, i, j):
+    """Position of (i, j), i != j, in the condensed vector (works on arrays)"""
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+class CondensedMatrix:
+    """Symmetric unit-diagonal similarity matrix stored as its upper triangle"""
+
+    def __init__(self, data: np.ndarray, models: Optional[Sequence[str]] = None):
+        self.data = data
+        self.n = order_from_size(len(data))
+        self.models: List[str] = list(models) if models is not None else [str(i) for i in range(self.n)]
+        if len(self.models) != self.n:
+            raise ValueError(f"{len(self.models)} labels for a {self.n}×{self.n} matrix")
+        self._pos = {m: i for i, m in enumerate(self.models)}
+
+    @classmethod
+    def from_square(cls, A, models: Optional[Sequence[str]] = None, dtype=None) -> "CondensedMatrix":
+        """Upper triangle of a square array or DataFrame (labels taken from its index)"""
+        if isinstance(A, pd.DataFrame):
+            models = list(A.index) if models is None else models
+            A = A.to_numpy()
+        A = np.asarray(A)
+        iu = np.triu_indices(A.shape[0], k=1)
+        return cls(A[iu].astype(dtype or A.dtype, copy=False), models)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def _index(self, key: Key) -> int:
+        return self._pos[key] if isinstance(key, str) else int(key)
+
+    def __getitem__(self, ij) -> float:
+        """O(1) lookup by position or model label; the diagonal is 1"""
+        i, j = (self._index(k) for k in ij)
+        if i == j:
+            return 1.0
+        return float(self.data[condensed_index(self.n, i, j)])
+
+    def row(self, key: Key) -> np.ndarray:
+        """All similarities of one model (diagonal included) without expanding the matrix"""
+        i = self._index(key)
+        others = np.arange(self.n)
+        out = np.ones(self.n, dtype=self.data.dtype)
+        mask = others != i
+        out[mask] = self.data[condensed_index(self.n, i, others[mask])]
+        return out
+
+    def row_series(self, key: Key) -> pd.Series:
+        return pd.Series(self.row(key), index=self.models, name=self.models[self._index(key)])
+
+    def to_square(self) -> np.ndarray:
+        A = np.ones((self.n, self.n), dtype=self.data.dtype)
+        iu = np.triu_indices(self.n, k=1)
+        A[iu] = self.data
+        A.T[iu] = self.data
+        return A
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.to_square(), index=self.models, columns=self.models)
+
+    def distances(self) -> np.ndarray:
+        """Condensed 1 - similarity, the input scipy's linkage expects"""
+        return 1.0 - np.asarray(self.data, dtype=float)
+
+    def linkage(self, method: str = "average") -> np.ndarray:
+        return _linkage(self.distances(), method=method)
@@ -0,0 +1,67 @@
+# design_graph/content.py — corpus-resident content channel
+
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ann import IVFIndex
+from .channels import _finish, l2_normalize_rows, top_k_indices
+from .predicates import CONTENT_KEYS
+
+# Corpus size from which Quick Compare switches from the exact scan to the IVF index
+ANN_MIN_MODELS = 5000
+
+class ContentIndex:
+    """Dense N×K matrix of L2-normalized predicate histograms for a corpus.
+
+    Scoring a query is one matrix–vector product and the full content
+    similarity matrix is one X @ X.T.
+    """
+
+    def __init__(self, models: Sequence[str], counts: np.ndarray, keys: Sequence[str] = CONTENT_KEYS):
+        self.models = list(models)
+        self.keys = list(keys)
+        self.X = l2_normalize_rows(np.asarray(counts, dtype=float).reshape(len(self.models), len(self.keys)))
+        self._pos = {m: i for i, m in enumerate(self.models)}
+        self.ann: Optional[IVFIndex] = None
+
+    @classmethod
+    def from_counts(cls, models: Sequence[str], counts: Sequence[dict],
+                    keys: Sequence[str] = CONTENT_KEYS) -> "ContentIndex":
+        X = np.array([[c.get(k, 0) for k in keys] for c in counts], dtype=float)
+        return cls(models, X, keys)
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def vectorize(self, counts: dict) -> np.ndarray:
+        """L2-normalized query vector in the index's key order"""
+        return l2_normalize_rows(np.array([[counts.get(k, 0) for k in self.keys]], dtype=float))[0]
+
+    def scores(self, counts: dict) -> np.ndarray:
+        """Content cosine of a query histogram against every indexed model"""
+        return self.X @ self.vectorize(counts)
+
+    def build_ann(self, nlist: Optional[int] = None) -> IVFIndex:
+        """Attach an IVF index over the content vectors for approximate top-n"""
+        self.ann = IVFIndex(self.X, self.models, nlist=nlist)
+        return self.ann
+
+    def topn(self, counts: dict, n: int = 5, exclude: Optional[str] = None,
+             nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top-n (model, cosine) pairs for a query histogram, best first.
+
+        With an attached ANN index and `nprobe` given, only that many IVF cells
+        are scanned instead of the whole corpus.
+        """
+        if self.ann is not None and nprobe:
+            hits = self.ann.topn(self.vectorize(counts), n + (exclude is not None), nprobe)
+            return [(m, v) for m, v in hits if m != exclude][:n]
+        s = self.scores(counts)
+        idx = top_k_indices(s, n, exclude=self._pos.get(exclude) if exclude is not None else None)
+        return [(self.models[i], float(s[i])) for i in idx]
+
+    def similarity_matrix(self) -> np.ndarray:
+        """All-pairs content cosine of the indexed corpus"""
+        return _finish(self.X @ self.X.T)
@@ -0,0 +1,124 @@
+# design_graph/engine.py — corpus-level pipeline: RDF directory → channel matrices
+
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .channels import (
+    CHANNEL_FILES, CHANNELS, STRUCT_FILES, SUMMARY_FILES, build_channel_matrices, load_weights,
+    pairwise_summary, pairwise_total_summary,
+)
+from .features import extract_model_features
+from .minhash import MINHASH_MIN_MODELS
+from .neighbors import build_store_neighbors
+from .parallel import extract_features_parallel
+from .store import MatrixStore
+from .structural import ElementClassifier, load_struct_meta
+
+RDF_SUFFIXES = (".rdf", ".owl", ".ttl", ".nt")
+BUILD_INFO_FILE = "build_info.json"
+
+def list_rdf_files(rdf_dir: Path) -> List[Path]:
+    """RDF models of a directory (non-recursive), sorted by file name"""
+    return sorted(p for p in Path(rdf_dir).iterdir() if p.is_file() and p.suffix.lower() in RDF_SUFFIXES)
+
+def extract_corpus(paths: Iterable[Path], meta: Optional[dict] = None,
+                   workers: int = 1, chunksize: int = 1) -> List[dict]:
+    """Parse each model exactly once and return its channel features.
+
+    With workers != 1 the files are parsed in a process pool (0 = one per CPU);
+    the result is identical to the serial run.
+    """
+    meta = meta or load_struct_meta()
+    paths = [Path(p) for p in paths]
+    if workers != 1:
+        return extract_features_parallel(paths, meta, workers, chunksize)
+    ecls = ElementClassifier(meta)
+    return [extract_model_features(p, name=p.name, meta=meta, element_classifier=ecls) for p in paths]
+
+def write_matrices(matrices: Dict[str, pd.DataFrame], out_dir: Path,
+                   weights: Optional[Dict[str, float]] = None,
+                   struct_dir: Optional[Path] = None) -> List[Path]:
+    """Write the channel CSVs, pairwise summaries (and the weights used) in the bundle layout.
+
+    S1–S4 and S_struct_fused go to `struct_dir` (the app's data/ folder) when given.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for channel, fname in CHANNEL_FILES.items():
+        path = out_dir / fname
+        matrices[channel].to_csv(path)
+        written.append(path)
+    for channel in CHANNELS:
+        path = out_dir / SUMMARY_FILES[channel]
+        pairwise_summary(matrices[channel], channel).to_csv(path, index=False)
+        written.append(path)
+    path = out_dir / SUMMARY_FILES["total"]
+    pairwise_total_summary(matrices).to_csv(path, index=False)
+    written.append(path)
+    if struct_dir is not None:
+        Path(struct_dir).mkdir(parents=True, exist_ok=True)
+        for key, fname in STRUCT_FILES.items():
+            path = Path(struct_dir) / fname
+            matrices[key].to_csv(path)
+            written.append(path)
+    if weights is not None:
+        path = out_dir / "weights_used.json"
+        with open(path, "w") as f:
+            json.dump(weights, f, indent=2)
+        written.append(path)
+    return written
+
+def save_features(features: List[dict], path: Path) -> None:
+    """Per-model features keyed by model name; the input of incremental updates"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({feats["model"]: feats for feats in features}, f)
+
+def load_features(path: Path) -> List[dict]:
+    with open(path, "r") as f:
+        return list(json.load(f).values())
+
+def save_build_info(out_dir: Path, minhash: bool) -> Path:
+    """Record how the matrices in `out_dir` were built, for incremental updates to follow"""
+    path = Path(out_dir) / BUILD_INFO_FILE
+    with open(path, "w") as f:
+        json.dump({"edge_sets": "minhash" if minhash else "exact"}, f, indent=2)
+    return path
+
+def load_build_info(out_dir: Path) -> dict:
+    """The recorded build settings, or {} for bundles built before they were recorded"""
+    path = Path(out_dir) / BUILD_INFO_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def build_from_directory(rdf_dir: Path, out_dir: Path, weights_path: Optional[Path] = None,
+                         meta_path: Optional[Path] = None,
+                         features_path: Optional[Path] = None,
+                         struct_dir: Optional[Path] = None,
+                         store_dir: Optional[Path] = None, workers: int = 1,
+                         chunksize: int = 1, minhash: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
+    """Regenerate all channel matrices for the models in `rdf_dir`"""
+    meta = load_struct_meta(meta_path)
+    weights = load_weights(weights_path)
+    features = extract_corpus(list_rdf_files(rdf_dir), meta, workers, chunksize)
+    if not features:
+        raise FileNotFoundError(f"No RDF models found in {rdf_dir}")
+    minhash = len(features) >= MINHASH_MIN_MODELS if minhash is None else minhash
+    matrices = build_channel_matrices(features, weights, meta, minhash)
+    write_matrices(matrices, out_dir, weights, struct_dir)
+    save_build_info(out_dir, minhash)
+    if store_dir is not None:
+        store = MatrixStore(store_dir)
+        store.write({k: matrices[k] for k in ["total", *CHANNELS, *STRUCT_FILES]})
+        build_store_neighbors(store)
+    if features_path is not None:
+        save_features(features, features_path)
+    return matrices
@@ -0,0 +1,201 @@
+# design_graph/features.py — per-model features for all four channels, from one parse
+
+from __future__ import annotations
+import hashlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from rdflib import BNode, Graph, Literal, RDF, RDFS
+
+from .minhash import minhash_signature
+from .motifs import detect_motifs
+from .predicates import DEFAULT_CLASSIFIER
+from .rdfio import parse_graph
+from .structural import (
+    ADJACENCY_KEYS, ELEMENT_CLASSES, FUNC_ROLES, ElementClassifier, load_struct_meta,
+)
+
+SCHEMA_NAMESPACES = (
+    "http://www.w3.org/2002/07/owl#",
+    "http://www.w3.org/2000/01/rdf-schema#",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+)
+IGNORED_TYPES = {"NamedIndividual", "Thing"}
+
+def local_name(uri: str) -> str:
+    return uri.rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+def edge_hash(s: str, p: str, o: str) -> int:
+    """Stable 64-bit hash of an edge (independent of PYTHONHASHSEED)"""
+    return int.from_bytes(hashlib.blake2b(f"{s}\x1f{p}\x1f{o}".encode("utf-8"), digest_size=8).digest(), "little")
+
+def _edge_term(t, bnode_labels: Optional[dict] = None) -> str:
+    if isinstance(t, BNode):
+        return bnode_labels[t] if bnode_labels is not None else "_:"
+    if isinstance(t, Literal):
+        return f'"{t}"'
+    return str(t)
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+def blank_node_labels(triples: list, salt: str) -> dict:
+    """Parse-independent label of every blank node, unique to the model identified by `salt`.
+
+    rdflib gives blank nodes fresh ids on each parse. Colour refinement (1-WL)
+    over each blank node's incident edges makes them comparable across parses;
+    nodes left with equal colours are numbered within their colour, so none
+    are merged. The salt keeps blank-node edges from matching another model,
+    as in the thesis edge sets.
+    """
+    incident = defaultdict(list)
+    for s, p, o in triples:
+        if isinstance(s, BNode):
+            incident[s].append((">", str(p), o))
+        if isinstance(o, BNode):
+            incident[o].append(("<", str(p), s))
+    if not incident:
+        return {}
+    colour = dict.fromkeys(incident, "")
+    n_colours = 1
+    for _ in range(len(incident)):
+        colour = {b: _digest(colour[b] + "|".join(sorted(
+            f"{d}{p}\x1f{colour[x] if isinstance(x, BNode) else _edge_term(x)}" for d, p, x in edges)))
+            for b, edges in incident.items()}
+        n = len(set(colour.values()))
+        if n == n_colours:
+            break
+        n_colours = n
+    rank = Counter()
+    labels = {}
+    for b in sorted(incident, key=colour.__getitem__):
+        c = colour[b]
+        labels[b] = f"_:{salt}:{c}:{rank[c]}"
+        rank[c] += 1
+    return labels
+
+def extract_model_features(source, name: Optional[str] = None, meta: Optional[dict] = None,
+                           element_classifier: Optional[ElementClassifier] = None) -> dict:
+    """Features of every channel for one model.
+
+    `source` is a parsed Graph or anything parse_graph accepts; the graph is
+    parsed at most once. The result is a plain JSON-serializable dict:
+      content      predicate-key histogram (content channel)
+      typed_edges  counts per "subjectType|predicate|objectType" (typed-edge channel)
+      edges        sorted 64-bit hashes of the (s, p, o) edge set (edge-sets channel;
+                   blank-node edges are unique to the model, see blank_node_labels)
+      minhash      MinHash signature of `edges` (approximate edge-sets channel)
+      adjacency / inventory / functional / motifs   structural channel inputs
+    """
+    meta = meta or load_struct_meta()
+    ecls = element_classifier or ElementClassifier(meta)
+    g = source if isinstance(source, Graph) else parse_graph(source)
+    if name is None:
+        name = Path(str(source)).name if isinstance(source, (str, Path)) else "graph"
+
+    strong = {k.lower() for k in meta["STRONG_TOPO"]}
+    weak = {k.lower() for k in meta["WEAK_TOPO"]}
+    adj_keys = {k.lower(): k for k in ADJACENCY_KEYS}
+    type_uri, label_uri = str(RDF.type), str(RDFS.label)
+
+    pred_hist: Counter = Counter()
+    types = defaultdict(list)
+    labels = defaultdict(list)
+    functions = defaultdict(list)
+    adjacency = {k: 0 for k in ADJACENCY_KEYS + ["strong", "weak"]}
+    topo = {"strong": [], "weak": []}
+    triples = list(g)
+    for s, p, o in triples:
+        p = str(p)
+        pred_hist[p] += 1
+        if p == type_uri:
+            types[s].append(str(o))
+            continue
+        if p == label_uri:
+            labels[s].append(str(o))
+        pl = local_name(p).lower()
+        if pl == "hasfunction":
+            functions[s].append(o)
+        if pl in adj_keys:
+            adjacency[adj_keys[pl]] += 1
+        if pl in strong:
+            adjacency["strong"] += 1
+            if not isinstance(o, Literal):
+                topo["strong"].append((s, o))
+        elif pl in weak:
+            adjacency["weak"] += 1
+            if not isinstance(o, Literal):
+                topo["weak"].append((s, o))
+
+    type_memo = {}
+
+    def node_type(n) -> str:
+        if isinstance(n, Literal):
+            return "Literal"
+        if n not in type_memo:
+            names = sorted(local_name(t) for t in types.get(n, ()) if local_name(t) not in IGNORED_TYPES)
+            type_memo[n] = names[0] if names else "Untyped"
+        return type_memo[n]
+
+    typed_edges: Counter = Counter()
+    plain, blank = [], []
+    for s, p, o in triples:
+        ps = str(p)
+        if isinstance(s, BNode) or isinstance(o, BNode):
+            blank.append((s, p, o))
+        else:
+            plain.append(edge_hash(_edge_term(s), ps, _edge_term(o)))
+        if ps != type_uri:
+            typed_edges[f"{node_type(s)}|{local_name(ps)}|{node_type(o)}"] += 1
+    # Blank-node edges are salted with the model's other edges: stable across parses, unique to the model
+    plain = np.unique(np.asarray(plain, dtype=np.uint64))
+    bnode_labels = blank_node_labels(blank, hashlib.blake2b(plain.tobytes(), digest_size=8).hexdigest())
+    edges = np.concatenate([plain, np.array([edge_hash(_edge_term(s, bnode_labels), str(p), _edge_term(o, bnode_labels))
+                                             for s, p, o in blank], dtype=np.uint64)])
+
+    inventory = {k: 0 for k in ELEMENT_CLASSES}
+    functional = {k: 0 for k in FUNC_ROLES}
+    element_of = {}
+    for s, ts in types.items():
+        if any(t.startswith(SCHEMA_NAMESPACES) for t in ts):
+            continue
+        names = [local_name(t) for t in ts] + labels.get(s, [])
+        cls = next((c for c in map(ecls.element_class, names) if c), None)
+        if cls is None:
+            continue
+        inventory[cls] += 1
+        element_of[s] = cls
+        roles = set()
+        for f in functions.get(s, ()):
+            for text in [local_name(str(f))] + [local_name(t) for t in types.get(f, ())] + labels.get(f, []):
+                roles.update(ecls.func_roles(text))
+        for r in roles:
+            functional[r] += 1
+
+    node_id = {n: i for i, n in enumerate(element_of)}
+    for pairs in topo.values():
+        for s, o in pairs:
+            node_id.setdefault(s, len(node_id))
+            node_id.setdefault(o, len(node_id))
+    classes = np.full(len(node_id), -1, dtype=np.int64)
+    classes[:len(element_of)] = [ELEMENT_CLASSES.index(c) for c in element_of.values()]
+    edge_arrays = {k: (np.array([node_id[s] for s, _ in pairs], dtype=np.int64),
+                       np.array([node_id[o] for _, o in pairs], dtype=np.int64)) for k, pairs in topo.items()}
+    edges = np.unique(edges)
+    motifs, motif_source = detect_motifs(classes, edge_arrays["strong"], edge_arrays["weak"], inventory)
+    return {
+        "model": name,
+        "n_triples": len(triples),
+        "n_subjects": len({t[0] for t in triples}),
+        "content": DEFAULT_CLASSIFIER.aggregate(pred_hist),
+        "typed_edges": dict(sorted(typed_edges.items())),
+        "edges": edges.tolist(),
+        "minhash": minhash_signature(edges).tolist(),
+        "adjacency": adjacency,
+        "inventory": inventory,
+        "functional": functional,
+        "motifs": motifs,
+        "motif_source": motif_source,
+    }
@@ -0,0 +1,87 @@
+# design_graph/fusion.py — on-the-fly channel fusion with arbitrary weights
+#
+#   S_struct = (w_motif·S2 + w_system·S3) / (w_motif + w_system)
+#   S_total  = w_content·S_content + w_typed·S_typed + w_edge·S_edge + w_struct·S_struct
+#
+# Both are linear in the stored matrices, so S_total for any weighting is a
+# single tensordot of a coefficient vector with the stacked C×N(N-1)/2
+# condensed channel tensor.
+
+from __future__ import annotations
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .channels import CHANNELS, top_k_indices
+from .condensed import CondensedMatrix, condensed_index
+
+FUSION_CHANNELS = ["content", "typed_edge", "edge_sets", "S2_motif", "S3_system"]
+
+def fusion_coefficients(weights: Dict[str, float], w_motif: float = 0.5, w_system: float = 0.5) -> np.ndarray:
+    """Per-tensor-slice coefficients of S_total, with channel weights normalized to sum 1"""
+    total = sum(weights.get(c, 0.0) for c in CHANNELS) or 1.0
+    w = {c: weights.get(c, 0.0) / total for c in CHANNELS}
+    sub = (w_motif + w_system) or 1.0
+    return np.array([
+        w["content"], w["typed_edge"], w["edge_sets"],
+        w["structural"] * w_motif / sub, w["structural"] * w_system / sub,
+    ])
+
+class FusionEngine:
+    """Stacked condensed channel tensor that fuses S_total for any weights"""
+
+    def __init__(self, models: Sequence[str], tensor: np.ndarray):
+        self.models = list(models)
+        self.tensor = tensor
+        self.n = len(self.models)
+        self._pos = {m: i for i, m in enumerate(self.models)}
+
+    @classmethod
+    def from_matrices(cls, matrices: Dict[str, pd.DataFrame]) -> "FusionEngine":
+        """Build from square channel DataFrames (content, typed_edge, edge_sets, S2_motif, S3_system)"""
+        models = list(matrices[FUSION_CHANNELS[0]].index)
+        tensor = np.stack([CondensedMatrix.from_square(matrices[k].loc[models, models]).data.astype(np.float32)
+                           for k in FUSION_CHANNELS])
+        return cls(models, tensor)
+
+    @classmethod
+    def from_store(cls, store) -> "FusionEngine":
+        """Build from a MatrixStore's condensed blocks"""
+        return cls(store.models, np.stack([store.array(k, mmap=False) for k in FUSION_CHANNELS]))
+
+    def fuse(self, weights: Dict[str, float], w_motif: float = 0.5, w_system: float = 0.5) -> CondensedMatrix:
+        """S_total for the given weights: one tensordot over the channel axis"""
+        coef = fusion_coefficients(weights, w_motif, w_system).astype(self.tensor.dtype)
+        fused = np.tensordot(coef, self.tensor, axes=1)
+        np.clip(fused, 0.0, 1.0, out=fused)
+        return CondensedMatrix(fused, self.models)
+
+    def channel_rows(self, model: str) -> np.ndarray:
+        """C×N slice of every fusion channel for one model (diagonal = 1)"""
+        i = self._pos[model]
+        others = np.arange(self.n)
+        mask = others != i
+        rows = np.ones((len(FUSION_CHANNELS), self.n), dtype=self.tensor.dtype)
+        rows[:, mask] = self.tensor[:, condensed_index(self.n, i, others[mask])]
+        return rows
+
+    def breakdown(self, model: str, weights: Dict[str, float], w_motif: float = 0.5,
+                  w_system: float = 0.5) -> pd.DataFrame:
+        """Per-model total and channel scores against `model`, O(C·N) without fusing the matrix"""
+        rows = self.channel_rows(model).astype(float)
+        sub = (w_motif + w_system) or 1.0
+        out = pd.DataFrame({
+            "total": np.clip(fusion_coefficients(weights, w_motif, w_system) @ rows, 0.0, 1.0),
+            "content": rows[0], "typed_edge": rows[1], "edge_sets": rows[2],
+            "structural": (w_motif * rows[3] + w_system * rows[4]) / sub,
+        }, index=self.models)
+        out.index.name = "Model"
+        return out
+
+    def topn(self, model: str, n: int, weights: Dict[str, float], w_motif: float = 0.5,
+             w_system: float = 0.5) -> pd.DataFrame:
+        """Top-n neighbours of `model` under the given weights, with the channel breakdown"""
+        table = self.breakdown(model, weights, w_motif, w_system)
+        idx = top_k_indices(table["total"].to_numpy(), n, exclude=self._pos[model])
+        return table.iloc[idx].reset_index()
@@ -0,0 +1,134 @@
+# design_graph/incremental.py — add / change / remove single models in stored matrices
+#
+# Only the affected row/column of each matrix is recomputed (against the saved
+# per-model features) and spliced into the CSVs, so onboarding a model costs
+# O(N) comparisons instead of a full O(N²) rebuild.
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .channels import (
+    CHANNEL_FILES, STRUCT_FILES, SUMMARY_FILES, channel_rows, load_weights,
+)
+from .engine import extract_corpus, load_build_info, load_features, save_features
+from .neighbors import build_store_neighbors
+from .store import MatrixStore, read_csv_matrices
+from .structural import load_struct_meta
+
+def splice_matrix(df: pd.DataFrame, model: str, row: pd.Series) -> pd.DataFrame:
+    """Set row and column `model` of a symmetric matrix, appending it if new"""
+    if model not in df.index:
+        models = list(df.index) + [model]
+        df = df.reindex(index=models, columns=models)
+    row = row.reindex(df.index)
+    df.loc[model, :] = row.to_numpy()
+    df.loc[:, model] = row.to_numpy()
+    return df
+
+def drop_from_matrix(df: pd.DataFrame, model: str) -> pd.DataFrame:
+    return df.drop(index=model, columns=model, errors="ignore")
+
+def _drop_pairs(summary: pd.DataFrame, model: str, a: str, b: str) -> pd.DataFrame:
+    return summary[(summary[a] != model) & (summary[b] != model)]
+
+def splice_summary(summary: pd.DataFrame, model: str, models: List[str],
+                   row: pd.Series, channel: str) -> pd.DataFrame:
+    """Replace the (i, j, similarity, channel) pairs involving `model`, keeping upper-triangle order"""
+    pos = {m: k for k, m in enumerate(models)}
+    others = [m for m in models if m != model]
+    new = pd.DataFrame({
+        "i": [m if pos[m] < pos[model] else model for m in others],
+        "j": [model if pos[m] < pos[model] else m for m in others],
+        "similarity": row.reindex(others).to_numpy(),
+        "channel": channel,
+    })
+    out = pd.concat([_drop_pairs(summary, model, "i", "j"), new], ignore_index=True)
+    order = np.lexsort((out["j"].map(pos).to_numpy(), out["i"].map(pos).to_numpy()))
+    return out.iloc[order].reset_index(drop=True)
+
+def splice_total_summary(summary: pd.DataFrame, model: str, models: List[str],
+                         rows: Dict[str, pd.Series]) -> pd.DataFrame:
+    """Replace the pairs involving `model` in the total summary, best first"""
+    pos = {m: k for k, m in enumerate(models)}
+    others = [m for m in models if m != model]
+    new = pd.DataFrame({
+        "model_A": [m if pos[m] < pos[model] else model for m in others],
+        "model_B": [model if pos[m] < pos[model] else m for m in others],
+        "total": rows["total"].reindex(others).to_numpy(),
+        "content_cos": rows["content"].reindex(others).to_numpy(),
+        "typed_edge_cos": rows["typed_edge"].reindex(others).to_numpy(),
+        "edge_sets_jaccard": rows["edge_sets"].reindex(others).to_numpy(),
+        "struct_sim": rows["structural"].reindex(others).to_numpy(),
+    })
+    out = pd.concat([_drop_pairs(summary, model, "model_A", "model_B"), new], ignore_index=True)
+    return out.sort_values("total", ascending=False, kind="stable").reset_index(drop=True)
+
+def _read_summaries(out_dir: Path) -> Dict[str, pd.DataFrame]:
+    return {k: pd.read_csv(Path(out_dir) / f) for k, f in SUMMARY_FILES.items() if (Path(out_dir) / f).exists()}
+
+def update_models(out_dir: Path, features_path: Path, add: Iterable[Path] = (),
+                  remove: Iterable[str] = (), struct_dir: Optional[Path] = None,
+                  weights_path: Optional[Path] = None, meta_path: Optional[Path] = None,
+                  store_dir: Optional[Path] = None, workers: int = 1, chunksize: int = 1) -> List[str]:
+    """Apply added/changed RDF models and removals to the stored matrices in place.
+
+    Matrices are read from the binary store when `store_dir` holds one, else
+    from the CSVs; both are written back. Every model already in the matrices
+    must have saved features (written by `build`). Edge-sets rows use the
+    estimator recorded by `build` (by corpus size for older bundles). Returns
+    the names of the models whose rows were recomputed.
+    """
+    meta = load_struct_meta(meta_path)
+    minhash = {"minhash": True, "exact": False}.get(load_build_info(out_dir).get("edge_sets"))
+    weights = load_weights(weights_path)
+    features = {f["model"]: f for f in load_features(features_path)}
+    store = MatrixStore(store_dir) if store_dir is not None else None
+    if store is not None and store.exists():
+        mats = {k: store.frame(k).astype(float) for k in store.keys()}
+    else:
+        mats = read_csv_matrices(out_dir, struct_dir)
+    summaries = _read_summaries(out_dir)
+
+    for name in remove:
+        features.pop(name, None)
+        mats = {k: drop_from_matrix(df, name) for k, df in mats.items()}
+        summaries = {k: _drop_pairs(df, name, *(("model_A", "model_B") if k == "total" else ("i", "j")))
+                     for k, df in summaries.items()}
+
+    changed = []
+    for feats in extract_corpus(add, meta, workers, chunksize):
+        if features.get(feats["model"]) == feats and feats["model"] in mats["total"].index:
+            continue
+        features[feats["model"]] = feats
+        changed.append(feats["model"])
+
+    models = list(mats["total"].index) + [m for m in changed if m not in mats["total"].index]
+    missing = [m for m in models if m not in features]
+    if missing:
+        raise KeyError(f"No saved features for {missing}; rebuild with `python -m design_graph build` first")
+
+    corpus = [features[m] for m in models]
+    for name in changed:
+        rows = channel_rows(corpus, models.index(name), weights, meta, minhash)
+        rows = {k: pd.Series(v, index=models) for k, v in rows.items()}
+        mats = {k: splice_matrix(df, name, rows[k]) for k, df in mats.items()}
+        for k, df in summaries.items():
+            summaries[k] = (splice_total_summary(df, name, models, rows) if k == "total"
+                            else splice_summary(df, name, models, rows[k], k))
+
+    if store is not None:
+        store.write(mats)
+        build_store_neighbors(store)
+    for k, df in mats.items():
+        if k in CHANNEL_FILES:
+            df.to_csv(Path(out_dir) / CHANNEL_FILES[k])
+        elif struct_dir is not None:
+            df.to_csv(Path(struct_dir) / STRUCT_FILES[k])
+    for k, df in summaries.items():
+        df.to_csv(Path(out_dir) / SUMMARY_FILES[k], index=False)
+    save_features(list(features.values()), features_path)
+    return changed
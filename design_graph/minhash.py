@@ -0,0 +1,140 @@
+# design_graph/minhash.py — MinHash / LSH sketches for the edge-sets channel
+#
+# Each model's edge set (64-bit edge hashes) is reduced to a signature of
+# `num_perm` minima under independent 64-bit mixing permutations; the fraction
+# of equal signature slots estimates Jaccard with standard error
+# sqrt(J(1-J)/num_perm) ≤ 1/(2·sqrt(num_perm)). LSH banding (`bands` bands of
+# num_perm/bands rows) surfaces the likely-similar pairs, which are then
+# recomputed exactly; every other pair keeps its estimate.
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MINHASH_PERM = 128
+MINHASH_BANDS = 32
+MINHASH_MIN_MODELS = 2000
+_EMPTY = np.iinfo(np.uint64).max
+
+def _permutation_keys(num_perm: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer (wrapping uint64 arithmetic)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def minhash_signature(edges: Sequence[int], num_perm: int = MINHASH_PERM, seed: int = 0,
+                      block: int = 16) -> np.ndarray:
+    """uint64 MinHash signature of a set of 64-bit edge hashes (all slots max for an empty set)"""
+    x = np.asarray(edges, dtype=np.uint64)
+    sig = np.full(num_perm, _EMPTY, dtype=np.uint64)
+    if not len(x):
+        return sig
+    keys = _permutation_keys(num_perm, seed)
+    with np.errstate(over="ignore"):
+        for start in range(0, num_perm, block):
+            k = keys[start:start + block, None]
+            sig[start:start + block] = _mix(x[None, :] * k + k).min(axis=1)
+    return sig
+
+def feature_signatures(features: List[dict], num_perm: int = MINHASH_PERM) -> np.ndarray:
+    """N×num_perm signatures, reusing a model's cached "minhash" when it has the right length"""
+    sigs = np.empty((len(features), num_perm), dtype=np.uint64)
+    for i, f in enumerate(features):
+        cached = f.get("minhash")
+        sigs[i] = cached if cached is not None and len(cached) == num_perm \
+            else minhash_signature(f["edges"], num_perm)
+    return sigs
+
+def estimate_jaccard(sigs: np.ndarray, block: int = 256) -> np.ndarray:
+    """All-pairs MinHash Jaccard estimates (N×N, diagonal 1; two empty sets give 0)"""
+    n = len(sigs)
+    empty = (sigs == _EMPTY).all(axis=1)
+    S = np.empty((n, n))
+    for start in range(0, n, block):
+        S[start:start + block] = (sigs[start:start + block, None, :] == sigs[None, :, :]).mean(axis=2)
+    S[empty] = 0.0
+    S[:, empty] = 0.0
+    np.fill_diagonal(S, 1.0)
+    return S
+
+def _band_rows(num_perm: int, bands: int) -> int:
+    """Rows per LSH band; the bands must split the signature exactly"""
+    if not 0 < bands <= num_perm or num_perm % bands:
+        raise ValueError(f"bands must divide num_perm={num_perm} (got bands={bands})")
+    return num_perm // bands
+
+def lsh_candidates(sigs: np.ndarray, bands: int = MINHASH_BANDS) -> np.ndarray:
+    """K×2 array of pairs (i < j) sharing at least one band bucket"""
+    n, num_perm = sigs.shape
+    rows = _band_rows(num_perm, bands)
+    pairs = []
+    for b in range(bands):
+        band = np.ascontiguousarray(sigs[:, b * rows:(b + 1) * rows])
+        _, bucket = np.unique(band.view(np.dtype((np.void, band.dtype.itemsize * rows))).ravel(),
+                              return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        starts = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+        for group in np.split(order, starts[1:]):
+            if len(group) > 1:
+                i, j = np.triu_indices(len(group), k=1)
+                pairs.append(np.stack([group[i], group[j]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+def _exact_pair(a: np.ndarray, b: np.ndarray) -> float:
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    union = len(a) + len(b) - inter
+    return inter / union if union else 0.0
+
+def minhash_jaccard_matrix(sets: Sequence[np.ndarray], sigs: np.ndarray,
+                           bands: int = MINHASH_BANDS) -> Tuple[np.ndarray, int]:
+    """(Jaccard matrix, number of exact pairs): exact for LSH candidates, MinHash estimate elsewhere"""
+    _band_rows(sigs.shape[1], bands)
+    S = estimate_jaccard(sigs)
+    cand = lsh_candidates(sigs, bands)
+    for i, j in cand:
+        S[i, j] = S[j, i] = _exact_pair(sets[i], sets[j])
+    np.clip(S, 0.0, 1.0, out=S)
+    return S, len(cand)
+
+def minhash_jaccard_row(sets: Sequence[np.ndarray], sigs: np.ndarray, i: int,
+                        bands: int = MINHASH_BANDS) -> np.ndarray:
+    """Row i of `minhash_jaccard_matrix`: exact where model i shares an LSH band, estimated elsewhere"""
+    rows = _band_rows(sigs.shape[1], bands)
+    row = (sigs == sigs[i]).mean(axis=1)
+    empty = (sigs == _EMPTY).all(axis=1)
+    row[empty] = 0.0
+    if empty[i]:
+        row[:] = 0.0
+    shared = (sigs == sigs[i]).reshape(len(sigs), bands, rows).all(axis=2).any(axis=1)
+    for j in np.flatnonzero(shared):
+        row[j] = _exact_pair(sets[i], sets[j])
+    row[i] = 1.0
+    return np.clip(row, 0.0, 1.0, out=row)
+
+def minhash_error_report(features: List[dict], num_perm: int = MINHASH_PERM,
+                         bands: int = MINHASH_BANDS, exact: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """Error of the estimated and the LSH-refined channel against exact Jaccard"""
+    from .channels import jaccard_matrix
+
+    _band_rows(num_perm, bands)
+    sets = [np.asarray(f["edges"], dtype=np.uint64) for f in features]
+    sigs = feature_signatures(features, num_perm)
+    exact = jaccard_matrix(sets) if exact is None else exact
+    est = estimate_jaccard(sigs)
+    refined, n_exact = minhash_jaccard_matrix(sets, sigs, bands)
+    iu = np.triu_indices(len(features), k=1)
+    return {
+        "models": len(features), "pairs": len(iu[0]), "num_perm": num_perm, "bands": bands,
+        "exact_pairs": n_exact, "bound": 1.0 / (2.0 * np.sqrt(num_perm)),
+        "estimate_max_abs_err": float(np.abs(est - exact)[iu].max(initial=0.0)),
+        "estimate_mean_abs_err": float(np.abs(est - exact)[iu].mean()) if len(iu[0]) else 0.0,
+        "channel_max_abs_err": float(np.abs(refined - exact)[iu].max(initial=0.0)),
+        "channel_mean_abs_err": float(np.abs(refined - exact)[iu].mean()) if len(iu[0]) else 0.0,
+    }
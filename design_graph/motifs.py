@@ -0,0 +1,100 @@
+# design_graph/motifs.py — graph-native motif counts from STRONG_TOPO / WEAK_TOPO adjacency
+#
+# Nodes are the model's resources, edges the triples whose predicate local name
+# is in STRONG_TOPO (or WEAK_TOPO). Two elements are neighbours when an edge
+# joins them directly or through one shared non-element node (an
+# IfcRelConnectsElements-style relation). Per-node neighbour counts by element
+# class are two sparse × dense(N×6) products over a CSR adjacency, so the cost
+# is linear in the number of edges even with hub nodes:
+#   M2   min(beams touching a column, columns touching a beam)        frame nodes
+#   M3   min(walls touching a slab, slabs touching a wall)             wall–slab pairs
+#   M4   cores touching a slab
+#   M2b  min(braces touching a beam/column, beams/columns touching a brace)
+# i.e. proxy_motifs with every count restricted to connected elements. Each
+# motif comes from the strong graph when it links any element of the motif's
+# classes, else from the weak graph, else from the inventory proxy; the weak
+# and proxy fallbacks are the only ones penalised downstream.
+
+from __future__ import annotations
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .structural import ELEMENT_CLASSES, proxy_motifs
+
+_CLS = {k: i for i, k in enumerate(ELEMENT_CLASSES)}
+
+def adjacency_csr(src: np.ndarray, dst: np.ndarray, n: int) -> sparse.csr_matrix:
+    """Symmetric 0/1 adjacency without self-loops of an edge list over n nodes"""
+    src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+    keep = src != dst
+    rows = np.concatenate([src[keep], dst[keep]])
+    cols = np.concatenate([dst[keep], src[keep]])
+    A = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, n))
+    A.sum_duplicates()
+    A.data[:] = 1.0
+    return A
+
+def class_neighbour_counts(A: sparse.csr_matrix, classes: np.ndarray) -> np.ndarray:
+    """N×C count of each node's element neighbours per class, directly or via one non-element node.
+
+    `classes` holds the ELEMENT_CLASSES index of every node, -1 for non-elements.
+    Counts are walk counts, so only their positivity is meaningful.
+    """
+    classes = np.asarray(classes)
+    elements = np.flatnonzero(classes >= 0)
+    H = np.zeros((len(classes), len(ELEMENT_CLASSES)), dtype=np.float32)
+    H[elements, classes[elements]] = 1.0
+    connector = (classes < 0).astype(np.float32)
+    direct = A @ H
+    via = A @ (connector[:, None] * (A @ H))
+    # drop the element → connector → itself walks
+    via[elements, classes[elements]] -= (A @ connector)[elements]
+    return direct + via
+
+MOTIF_CLASSES = {
+    "M2": ("Beam", "Column"),
+    "M3": ("Wall", "Slab"),
+    "M4": ("Core", "Slab"),
+    "M2b": ("Brace", "Beam", "Column"),
+}
+
+def graph_motifs(classes: np.ndarray, counts: np.ndarray) -> Dict[str, int]:
+    """Motif counts from the class-neighbour counts of class_neighbour_counts"""
+    classes = np.asarray(classes)
+    touch = counts > 0.5
+
+    def n(cls: str, *neighbour: str) -> int:
+        cols = [_CLS[c] for c in neighbour]
+        return int(np.count_nonzero((classes == _CLS[cls]) & touch[:, cols].any(axis=1)))
+
+    return {
+        "M2": min(n("Beam", "Column"), n("Column", "Beam")),
+        "M3": min(n("Wall", "Slab"), n("Slab", "Wall")),
+        "M4": n("Core", "Slab"),
+        "M2b": min(n("Brace", "Beam", "Column"), n("Beam", "Brace") + n("Column", "Brace")),
+    }
+
+def detect_motifs(classes: Sequence[int], strong: Tuple[np.ndarray, np.ndarray],
+                  weak: Tuple[np.ndarray, np.ndarray],
+                  inventory: Dict[str, int]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """(motif counts, per-motif source) from the strong graph, else the weak graph, else the proxies.
+
+    A graph is used for a motif when it links at least one element of the
+    motif's classes to another element; otherwise the motif falls back.
+    """
+    classes = np.asarray(classes, dtype=np.int64)
+    motifs, sources = proxy_motifs(inventory), {m: "proxy" for m in MOTIF_CLASSES}
+    pending = set(MOTIF_CLASSES)
+    for source, (src, dst) in (("strong", strong), ("weak", weak)):
+        if not pending or not len(src):
+            continue
+        counts = class_neighbour_counts(adjacency_csr(src, dst, len(classes)), classes)
+        linked = (counts > 0.5).any(axis=1) & (classes >= 0)
+        found = graph_motifs(classes, counts)
+        for m in sorted(pending):
+            if np.isin(classes[linked], [_CLS[c] for c in MOTIF_CLASSES[m]]).any():
+                motifs[m], sources[m] = found[m], source
+                pending.discard(m)
+    return motifs, sources
@@ -0,0 +1,128 @@
+# design_graph/neighbors.py — precomputed top-K nearest-neighbour index
+#
+# For every model the K most similar other models of one matrix, found with a
+# row-blocked argpartition (no full sort) and persisted next to the matrix
+# store as neighbors/<key>.npz. The file records the size, mtime and content
+# digest of the block it was built from, so it is rebuilt only when that
+# matrix changes (a fresh checkout that only touched mtimes is recognised by
+# the digest).
+
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .condensed import CondensedMatrix, condensed_index
+
+DEFAULT_K = 20
+NEIGHBORS_DIR = "neighbors"
+
+def topk_neighbors(cm: CondensedMatrix, k: int = DEFAULT_K, block: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, similarities), each N×k and best first, of every model's k nearest others"""
+    n = cm.n
+    k = max(0, min(k, n - 1))
+    idx = np.empty((n, k), dtype=np.int32)
+    sims = np.empty((n, k), dtype=np.float32)
+    if k == 0:
+        return idx, sims
+    cols = np.arange(n)
+    for start in range(0, n, block):
+        rows = np.arange(start, min(start + block, n))
+        off = rows[:, None] != cols[None, :]
+        S = np.full((len(rows), n), -np.inf, dtype=np.float32)
+        S[off] = cm.data[condensed_index(n, np.broadcast_to(rows[:, None], off.shape)[off],
+                                         np.broadcast_to(cols[None, :], off.shape)[off])]
+        part = np.argpartition(-S, k - 1, axis=1)[:, :k]
+        part_sims = np.take_along_axis(S, part, axis=1)
+        order = np.argsort(-part_sims, axis=1, kind="stable")
+        idx[rows] = np.take_along_axis(part, order, axis=1)
+        sims[rows] = np.take_along_axis(part_sims, order, axis=1)
+    return idx, sims
+
+class NeighborIndex:
+    """Top-K neighbours per model of one similarity matrix"""
+
+    def __init__(self, models: Sequence[str], idx: np.ndarray, sims: np.ndarray):
+        self.models = list(models)
+        self.idx = idx
+        self.sims = sims
+        self.k = idx.shape[1] if idx.ndim == 2 else 0
+        self._pos = {m: i for i, m in enumerate(self.models)}
+
+    @classmethod
+    def build(cls, cm: CondensedMatrix, k: int = DEFAULT_K) -> "NeighborIndex":
+        return cls(cm.models, *topk_neighbors(cm, k))
+
+    def __contains__(self, model: str) -> bool:
+        return model in self._pos
+
+    def topn(self, model: str, n: int) -> List[Tuple[str, float]]:
+        """Up to min(n, K) (model, similarity) pairs, best first"""
+        i = self._pos[model]
+        n = min(n, self.k)
+        return [(self.models[j], float(s)) for j, s in zip(self.idx[i, :n], self.sims[i, :n])]
+
+    def rank(self, model: str, other: str) -> Optional[int]:
+        """1-based rank of `other` among `model`'s neighbours, None if beyond K"""
+        hits = np.flatnonzero(self.idx[self._pos[model]] == self._pos[other])
+        return int(hits[0]) + 1 if len(hits) else None
+
+    def save(self, path: Path, source: dict) -> None:
+        """Persist with the `source` fingerprint (size, mtime_ns, digest) of the matrix block"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, idx=self.idx, sims=self.sims, models=np.array(self.models, dtype=str),
+                 size=source["size"], mtime_ns=source["mtime_ns"], digest=source["digest"])
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["NeighborIndex", dict]:
+        with np.load(path) as z:
+            source = {"size": int(z["size"]), "mtime_ns": int(z["mtime_ns"]), "digest": str(z["digest"])}
+            return cls(z["models"].tolist(), z["idx"], z["sims"]), source
+
+def _file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _save_quietly(index: NeighborIndex, path: Path, source: dict) -> None:
+    try:
+        index.save(path, source)
+    except OSError:
+        pass  # read-only deployment: keep the in-memory index
+
+def store_neighbor_index(store, key: str, k: int = DEFAULT_K) -> NeighborIndex:
+    """Neighbour index of a MatrixStore block: loaded if current, else rebuilt and persisted"""
+    block = store.root / f"{key}.npy"
+    path = store.root / NEIGHBORS_DIR / f"{key}.npz"
+    stat = block.stat()
+    if path.exists():
+        try:
+            index, source = NeighborIndex.load(path)
+            if index.models == store.models and index.k == min(k, len(index.models) - 1) \
+                    and source["size"] == stat.st_size:
+                if source["mtime_ns"] == stat.st_mtime_ns:
+                    return index
+                digest = _file_digest(block)
+                if source["digest"] == digest:
+                    _save_quietly(index, path, {**source, "mtime_ns": stat.st_mtime_ns})
+                    return index
+        except Exception:
+            pass
+    index = NeighborIndex.build(store.condensed(key), k)
+    _save_quietly(index, path, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": _file_digest(block)})
+    return index
+
+def build_store_neighbors(store, k: int = DEFAULT_K) -> List[str]:
+    """Refresh the neighbour index of every block in the store"""
+    keys = store.keys()
+    for key in keys:
+        store_neighbor_index(store, key, k)
+    return keys
@@ -0,0 +1,164 @@
+# design_graph/online.py — full-channel scoring of an uploaded model
+#
+# The upload's features for every channel come from one pass over its graph
+# (extract_model_features); the references' features are cached on disk and
+# re-extracted only when a file changes. Scoring is channel_rows on the
+# references plus the upload — one O(N) row per channel, fused with the given
+# weights exactly as the corpus build fuses S_total. A batch of Q uploads gets
+# its Q×N block from one product per channel against the references and its
+# Q×Q block from a build of the queries alone; the N×N part is never formed.
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .channels import CHANNELS, STRUCT_PARTS, build_channel_matrices, channel_block, channel_rows, load_weights
+from .minhash import MINHASH_MIN_MODELS
+from .parallel import extract_features_parallel
+from .structural import load_struct_meta
+
+REF_FEATURES_VERSION = 3
+SCORE_COLUMNS = ["total", *CHANNELS, *STRUCT_PARTS]
+
+def _file_sha1(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ReferenceFeatures:
+    """Channel features of reference RDF files, persisted as JSON.
+
+    Entries are keyed by resolved path and validated against size and mtime
+    (content hash when only the mtime moved); only changed files are parsed.
+    """
+
+    def __init__(self, path: Path, meta: Optional[dict] = None):
+        self.path = Path(path)
+        self.meta = meta or load_struct_meta()
+        self.entries: dict = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        if payload.get("version") == REF_FEATURES_VERSION:
+            self.entries = payload.get("entries", {})
+
+    def _lookup(self, path: Path) -> Optional[dict]:
+        entry = self.entries.get(str(path.resolve()))
+        stat = path.stat()
+        if entry is None or entry["size"] != stat.st_size:
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns:
+            if entry["sha1"] != _file_sha1(path):
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._dirty = True
+        return entry["features"]
+
+    def features(self, paths: Sequence[Path], workers: int = 0) -> List[dict]:
+        """Features of every existing file of `paths`, in order; misses are extracted in parallel"""
+        paths = [Path(p) for p in paths if Path(p).exists()]
+        with self._lock:
+            found = [self._lookup(p) for p in paths]
+        missing = [i for i, f in enumerate(found) if f is None]
+        if missing:
+            extracted = extract_features_parallel([paths[i] for i in missing], self.meta, workers)
+            with self._lock:
+                for i, feats in zip(missing, extracted):
+                    stat = paths[i].stat()
+                    self.entries[str(paths[i].resolve())] = {
+                        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                        "sha1": _file_sha1(paths[i]), "features": feats,
+                    }
+                    found[i] = feats
+                self._dirty = True
+        self.save()
+        return found
+
+    def save(self) -> None:
+        """Write the cache back to disk if any entry changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w") as f:
+                    json.dump({"version": REF_FEATURES_VERSION, "entries": self.entries}, f)
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except OSError:
+                pass
+
+def _struct_meta(meta: Optional[dict], w_motif: Optional[float], w_system: Optional[float]) -> dict:
+    meta = meta or load_struct_meta()
+    overrides = {k: v for k, v in (("w_motif", w_motif), ("w_system", w_system)) if v is not None}
+    return {**meta, "DEFAULTS": {**meta["DEFAULTS"], **overrides}} if overrides else meta
+
+def score_upload(upload: dict, refs: List[dict], weights: Optional[Dict[str, float]] = None,
+                 meta: Optional[dict] = None, w_motif: Optional[float] = None,
+                 w_system: Optional[float] = None) -> pd.DataFrame:
+    """Total and per-channel similarity of an upload's features to every reference, best first"""
+    if not refs:
+        return pd.DataFrame(columns=["Model", *SCORE_COLUMNS])
+    rows = channel_rows(refs + [upload], len(refs), weights or load_weights(), _struct_meta(meta, w_motif, w_system))
+    out = pd.DataFrame({"Model": [f["model"] for f in refs],
+                        **{c: rows[c][:len(refs)] for c in SCORE_COLUMNS}})
+    return out.sort_values("total", ascending=False, kind="stable").reset_index(drop=True)
+
+def _query_labels(queries: List[dict], refs: List[dict]) -> List[str]:
+    taken = {f["model"] for f in refs}
+    labels = []
+    for f in queries:
+        label, k = f["model"], 1
+        while label in taken:
+            k += 1
+            label = f"{f['model']} [upload {k}]" if k > 2 else f"{f['model']} [upload]"
+        taken.add(label)
+        labels.append(label)
+    return labels
+
+def batch_compare(queries: List[dict], refs: List[dict], n: int = 5,
+                  weights: Optional[Dict[str, float]] = None, meta: Optional[dict] = None,
+                  w_motif: Optional[float] = None, w_system: Optional[float] = None,
+                  minhash: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
+    """Q×N (queries vs references) and Q×Q (among queries) similarity blocks of a batch of uploads.
+
+    Both blocks equal the corresponding parts of the (Q+N)-model corpus build
+    (edge-sets estimator chosen by its size unless `minhash` is given) at
+    O(Q·N + Q²) cost. Returns the total blocks and the per-query top-n
+    references with their channel breakdown.
+    """
+    weights = weights or load_weights()
+    meta = _struct_meta(meta, w_motif, w_system)
+    minhash = len(queries) + len(refs) >= MINHASH_MIN_MODELS if minhash is None else minhash
+    labels = _query_labels(queries, refs)
+    queries = [dict(f, model=m) for f, m in zip(queries, labels)]
+    ref_names = [f["model"] for f in refs]
+    block = channel_block(queries, refs, weights, meta, minhash)
+    qxq = build_channel_matrices(queries, weights, meta, minhash)["total"] if queries else pd.DataFrame()
+    rows = []
+    for a, q in enumerate(labels if ref_names else []):
+        for rank, j in enumerate(np.argsort(-block["total"][a], kind="stable")[:n], 1):
+            rows.append({"Query": q, "Rank": rank, "Model": ref_names[j],
+                         **{c: block[c][a, j] for c in SCORE_COLUMNS}})
+    return {
+        "QxN": pd.DataFrame(block["total"], index=labels, columns=ref_names),
+        "QxQ": qxq,
+        "topn": pd.DataFrame(rows, columns=["Query", "Rank", "Model", *SCORE_COLUMNS]),
+    }
@@ -0,0 +1,88 @@
+# design_graph/parallel.py — multi-process batch extraction
+#
+# rdflib parsing is CPU-bound and holds the GIL, so corpus rebuilds farm files
+# out to a ProcessPoolExecutor. Workers receive file paths (or upload bytes) and send back only
+# compact payloads (histograms, inventories, motif counts, the edge-hash set as
+# a uint64 array) — never Graphs. Results come back in input order and are
+# identical to the serial run.
+
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import extract_model_features
+from .rdfio import parse_graph, sniff_rdf_format
+from .stream import stream_predicate_counts
+from .structural import ElementClassifier, load_struct_meta
+
+_WORKER: dict = {}
+
+def resolve_workers(workers: Optional[int], n_items: int) -> int:
+    """Worker count to use: 0/None means one per CPU, never more than there are items"""
+    if not workers:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_items))
+
+def _init_extractor(meta: dict) -> None:
+    _WORKER["meta"] = meta
+    _WORKER["ecls"] = ElementClassifier(meta)
+
+def _extract_payload(path: str) -> dict:
+    feats = extract_model_features(Path(path), name=Path(path).name, meta=_WORKER["meta"],
+                                   element_classifier=_WORKER["ecls"])
+    feats["edges"] = np.asarray(feats["edges"], dtype=np.uint64)
+    return feats
+
+def _upload_payload(item: Tuple[str, bytes]) -> dict:
+    name, data = item
+    g = parse_graph(data, fmt=sniff_rdf_format(name, data[:512]))
+    feats = extract_model_features(g, name=name, meta=_WORKER["meta"], element_classifier=_WORKER["ecls"])
+    feats["edges"] = np.asarray(feats["edges"], dtype=np.uint64)
+    return feats
+
+def _counts_payload(path: str) -> Optional[dict]:
+    try:
+        return stream_predicate_counts(Path(path))
+    except Exception:
+        return None
+
+def _pool_map(fn: Callable, items: Sequence, workers: int, chunksize: int,
+              initializer: Optional[Callable] = None, initargs: tuple = ()) -> list:
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        return list(pool.map(fn, items, chunksize=max(1, chunksize)))
+
+def extract_features_parallel(paths: Iterable[Path], meta: Optional[dict] = None,
+                              workers: Optional[int] = None, chunksize: int = 1) -> List[dict]:
+    """extract_model_features for many files across processes, in input order"""
+    meta = meta or load_struct_meta()
+    items = [str(p) for p in paths]
+    payloads = _pool_map(_extract_payload, items, resolve_workers(workers, len(items)), chunksize,
+                         _init_extractor, (meta,))
+    for feats in payloads:
+        feats["edges"] = feats["edges"].tolist()
+    return payloads
+
+def extract_uploads_parallel(uploads: Sequence[Tuple[str, bytes]], meta: Optional[dict] = None,
+                             workers: Optional[int] = None) -> List[dict]:
+    """extract_model_features for in-memory (name, RDF bytes) uploads across processes, in input order"""
+    meta = meta or load_struct_meta()
+    items = list(uploads)
+    payloads = _pool_map(_upload_payload, items, resolve_workers(workers, len(items)), 1,
+                         _init_extractor, (meta,))
+    for feats in payloads:
+        feats["edges"] = feats["edges"].tolist()
+    return payloads
+
+def predicate_counts_parallel(paths: Iterable[Path], workers: Optional[int] = None,
+                              chunksize: int = 1) -> List[Optional[dict]]:
+    """Streamed predicate-key histograms for many files; None where a file failed to parse"""
+    items = [str(p) for p in paths]
+    return _pool_map(_counts_payload, items, resolve_workers(workers, len(items)), chunksize)
@@ -0,0 +1,80 @@
+# design_graph/predicates.py — predicate keys of the content channel
+
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from rdflib import Graph
+
+PRED_KEYS = [
+    "adjacentElement", "adjacentZone", "intersectingElement",
+    "bfo_0000178", "hasFunction", "hasQuality"
+]
+CONTENT_KEYS = PRED_KEYS + ["rdf_type"]
+TYPE_SUFFIXES = (("#type", "rdf_type"), ("/type", "rdf_type"))
+
+_END = ""  # trie slot holding the priority of a rule ending at this node
+
+class PredicateClassifier:
+    """Map predicate URIs to content keys by case-insensitive suffix.
+
+    Rules are matched through a trie over the reversed suffixes, so a first
+    lookup costs O(len(uri)) whatever the vocabulary size, and the decision
+    is memoized per distinct URI. When several suffixes match, the earliest
+    rule wins (PRED_KEYS order, then the rdf:type suffixes).
+    """
+
+    def __init__(self, keys: Sequence[str] = PRED_KEYS,
+                 extra: Iterable[Tuple[str, str]] = TYPE_SUFFIXES):
+        self.rules = [(k.lower(), k) for k in keys] + [(suffix.lower(), key) for suffix, key in extra]
+        self.keys = list(dict.fromkeys(key for _, key in self.rules))
+        self._trie: dict = {}
+        for prio, (suffix, _) in enumerate(self.rules):
+            node = self._trie
+            for ch in reversed(suffix):
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, prio)
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def _match(self, low: str) -> Optional[str]:
+        node, best = self._trie, None
+        for ch in reversed(low):
+            node = node.get(ch)
+            if node is None:
+                break
+            prio = node.get(_END)
+            if prio is not None and (best is None or prio < best):
+                best = prio
+        return None if best is None else self.rules[best][1]
+
+    def classify(self, uri: str) -> Optional[str]:
+        try:
+            return self._memo[uri]
+        except KeyError:
+            key = self._memo[uri] = self._match(uri.lower())
+            return key
+
+    __call__ = classify
+
+    def aggregate(self, predicate_counts: Mapping[str, int]) -> dict:
+        """Fold per-predicate counts into per-key counts"""
+        counts = {k: 0 for k in self.keys}
+        for uri, n in predicate_counts.items():
+            key = self.classify(uri)
+            if key is not None:
+                counts[key] += n
+        return counts
+
+DEFAULT_CLASSIFIER = PredicateClassifier()
+
+def pred_key_from_uri(uri: str) -> Optional[str]:
+    return DEFAULT_CLASSIFIER.classify(uri)
+
+def predicate_histogram(g: Graph) -> Counter:
+    """Triple count per distinct predicate URI of a parsed graph"""
+    raw = Counter(g.predicates(unique=False))
+    return Counter({str(p): n for p, n in raw.items()})
+
+def graph_predicate_counts(g: Graph, classifier: Optional[PredicateClassifier] = None) -> dict:
+    """Raw predicate-key histogram (PRED_KEYS + rdf_type by default) of a parsed graph"""
+    return (classifier or DEFAULT_CLASSIFIER).aggregate(predicate_histogram(g))
@@ -0,0 +1,201 @@
+# design_graph/profiling.py — per-stage wall time, memory and cache statistics
+#
+#   PROFILER = StageProfiler()
+#   with PROFILER.stage("parse"): ...                  # context manager
+#   @PROFILER.timed("load_csv", cached=True)            # every call, hit or miss
+#   @st.cache_data
+#   @PROFILER.cache_miss                                # runs only when the cache misses
+#   def load_csv_safe(path): ...
+#
+# Each stage records calls, total / max / last wall time, the rise of the
+# process peak RSS (getrusage) and, while tracemalloc is tracing, the stage's
+# peak traced allocation above its starting point. Nested stages hand their
+# peak to the enclosing one, so tracemalloc.reset_peak() inside a child never
+# hides the parent's peak. tracemalloc is process-wide: with several threads
+# in stages at once the allocation peaks overlap. snapshot() is a DataFrame
+# and prometheus_text() the Prometheus text exposition format.
+
+from __future__ import annotations
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+METRIC_PREFIX = "design_graph"
+_STAT_FIELDS = ["calls", "hits", "misses", "total_s", "max_s", "last_s", "alloc_peak_bytes", "rss_peak_delta_bytes"]
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water mark of this process's resident set size"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux /proc), None elsewhere"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class _Frame:
+    __slots__ = ("name", "t0", "rss0", "alloc0", "alloc_peak", "cache")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cache: Optional[str] = None
+        self.t0 = time.perf_counter()
+        self.rss0 = peak_rss_bytes()
+        self.alloc0: Optional[int] = None
+        self.alloc_peak = 0
+
+class StageProfiler:
+    """Thread-safe per-stage timing, memory and cache hit/miss recorder"""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self.stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[_Frame]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @staticmethod
+    def tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    @staticmethod
+    def set_tracing(enabled: bool) -> None:
+        """Start or stop tracemalloc (allocation peaks cost time, so they are opt-in)"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[_Frame]:
+        stack = self._stack()
+        frame = _Frame(name)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].alloc_peak = max(stack[-1].alloc_peak, peak)
+            tracemalloc.reset_peak()
+            frame.alloc0 = frame.alloc_peak = current
+        stack.append(frame)
+        try:
+            yield frame
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - frame.t0
+            alloc = None
+            if tracemalloc.is_tracing() and frame.alloc0 is not None:
+                frame.alloc_peak = max(frame.alloc_peak, tracemalloc.get_traced_memory()[1])
+                alloc = frame.alloc_peak - frame.alloc0
+                if stack:
+                    stack[-1].alloc_peak = max(stack[-1].alloc_peak, frame.alloc_peak)
+            rss1 = peak_rss_bytes()
+            self._record(name, elapsed, frame.cache, alloc,
+                         rss1 - frame.rss0 if rss1 is not None and frame.rss0 is not None else None)
+
+    def _record(self, name: str, elapsed: float, cache: Optional[str], alloc: Optional[int],
+                rss_delta: Optional[int]) -> None:
+        with self._lock:
+            s = self.stats.setdefault(name, {k: 0 for k in _STAT_FIELDS})
+            s["calls"] += 1
+            s["total_s"] += elapsed
+            s["max_s"] = max(s["max_s"], elapsed)
+            s["last_s"] = elapsed
+            if cache is not None:
+                s["hits" if cache == "hit" else "misses"] += 1
+            if alloc is not None:
+                s["alloc_peak_bytes"] = max(s["alloc_peak_bytes"], alloc)
+            if rss_delta is not None:
+                s["rss_peak_delta_bytes"] = max(s["rss_peak_delta_bytes"], rss_delta)
+
+    def timed(self, name: Optional[str] = None, cached: bool = False) -> Callable:
+        """Decorator recording every call of a function as stage `name` (default: its name).
+
+        With cached=True it wraps a cache whose inner function carries
+        `cache_miss`: a call counts as a hit unless the inner body ran.
+        """
+        def decorate(fn: Callable) -> Callable:
+            stage_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name) as frame:
+                    frame.cache = "hit" if cached else None
+                    return fn(*args, **kwargs)
+            if hasattr(fn, "clear"):
+                wrapper.clear = fn.clear  # keep st.cache_* invalidation reachable
+            return wrapper
+        return decorate
+
+    def cache_miss(self, fn: Callable) -> Callable:
+        """Marks the enclosing `timed` stage as a cache miss whenever the function body runs"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            if stack:
+                stack[-1].cache = "miss"
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def snapshot(self) -> pd.DataFrame:
+        """One row per stage, slowest total first"""
+        with self._lock:
+            rows = [{"stage": k, **v} for k, v in self.stats.items()]
+        df = pd.DataFrame(rows, columns=["stage"] + _STAT_FIELDS)
+        df["mean_s"] = df["total_s"] / df["calls"].where(df["calls"] > 0)
+        return df.sort_values("total_s", ascending=False, kind="stable").reset_index(drop=True)
+
+    def prometheus_text(self) -> str:
+        """All stage statistics plus process RSS in the Prometheus text exposition format"""
+        p = self.prefix
+        metrics = [
+            ("stage_calls_total", "counter", "Calls of each instrumented stage", "calls"),
+            ("stage_cache_hits_total", "counter", "Calls answered from a cache", "hits"),
+            ("stage_cache_misses_total", "counter", "Calls that missed the cache and ran", "misses"),
+            ("stage_seconds_total", "counter", "Wall time spent in each stage", "total_s"),
+            ("stage_seconds_max", "gauge", "Slowest single call of each stage", "max_s"),
+            ("stage_seconds_last", "gauge", "Wall time of the latest call of each stage", "last_s"),
+            ("stage_alloc_peak_bytes", "gauge", "Largest tracemalloc peak above a call's start", "alloc_peak_bytes"),
+            ("stage_rss_peak_delta_bytes", "gauge", "Largest rise of the process peak RSS during a call",
+             "rss_peak_delta_bytes"),
+        ]
+        with self._lock:
+            stats = {k: dict(v) for k, v in self.stats.items()}
+        lines = []
+        for metric, kind, help_text, field in metrics:
+            lines += [f"# HELP {p}_{metric} {help_text}", f"# TYPE {p}_{metric} {kind}"]
+            for stage_name, s in sorted(stats.items()):
+                label = stage_name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                lines.append(f'{p}_{metric}{{stage="{label}"}} {s[field]:.6g}')
+        for metric, help_text, value in (("process_resident_memory_bytes", "Current resident set size",
+                                          current_rss_bytes()),
+                                         ("process_peak_resident_memory_bytes", "Peak resident set size",
+                                          peak_rss_bytes())):
+            if value is not None:
+                lines += [f"# HELP {p}_{metric} {help_text}", f"# TYPE {p}_{metric} gauge", f"{p}_{metric} {value}"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,174 @@
+# design_graph/query.py — similarity queries shared by the Streamlit app and the HTTP API
+#
+# QueryService keeps a MatrixStore resident (condensed blocks, fusion tensor,
+# neighbour indexes, the reference features and their content index) and
+# answers the app's three questions: top-N by model, pair breakdown by
+# channel, and upload-and-compare on every channel. It is safe to call from
+# several threads at once.
+
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .channels import load_weights
+from .condensed import CondensedMatrix
+from .content import ANN_MIN_MODELS, ContentIndex
+from .features import extract_model_features
+from .fusion import FusionEngine
+from .neighbors import NeighborIndex, store_neighbor_index
+from .online import SCORE_COLUMNS, ReferenceFeatures, score_upload
+from .rdfio import parse_graph, sniff_rdf_format
+from .store import MatrixStore
+from .structural import load_struct_meta
+
+REF_FEATURES_PATH = Path(".cache") / "model_features.json"
+
+# (display name, store key) of every channel in a pair breakdown
+PAIR_CHANNELS = [
+    ("Total", "total"), ("Content", "content"), ("Typed-Edge", "typed_edge"), ("Edge-Sets", "edge_sets"),
+    ("Structural", "structural"), ("S1_Adjacency", "S1_adjacency"), ("S2_Motif", "S2_motif"),
+    ("S3_System", "S3_system"), ("S4_Functional", "S4_functional"),
+]
+
+def build_topn_from_matrix(matrix_df: pd.DataFrame, model_name: str, n: int = 5) -> pd.DataFrame:
+    """Extract top-N similar models from matrix"""
+    if matrix_df.empty or model_name not in matrix_df.index:
+        return pd.DataFrame()
+
+    s = matrix_df.loc[model_name].drop(labels=[model_name]).sort_values(ascending=False).head(n)
+    df = s.reset_index()
+    df.columns = ["Model", "Similarity"]
+    return df
+
+def pair_breakdown(lookup: Callable[[str], Optional[float]], model_a: str, model_b: str,
+                   neighbors: Optional[Callable[[str], Optional[NeighborIndex]]] = None) -> pd.DataFrame:
+    """Channel, Similarity and "Rank of B for A" rows for every channel `lookup` has a score for"""
+    rows = []
+    for channel, key in PAIR_CHANNELS:
+        sim = lookup(key)
+        if sim is None:
+            continue
+        nn = neighbors(key) if neighbors is not None else None
+        if nn is None or model_a not in nn or model_b not in nn:
+            rank = "—"
+        else:
+            r = nn.rank(model_a, model_b)
+            rank = f"#{r}" if r is not None else f">{nn.k}"
+        rows.append((channel, round(float(sim), 4), rank))
+    return pd.DataFrame(rows, columns=["Channel", "Similarity", "Rank of B for A"])
+
+class UnknownModel(KeyError):
+    """A queried model is not in the matrix store"""
+
+def _check_n(n: int) -> None:
+    if n < 1:
+        raise ValueError(f"n must be at least 1 (got {n})")
+
+class QueryService:
+    """Resident similarity data of one matrix store, answering top-N / pair / upload queries"""
+
+    def __init__(self, store: MatrixStore, refs: Sequence[Path] = (),
+                 weights: Optional[Dict[str, float]] = None, meta: Optional[dict] = None,
+                 features_cache: Path = REF_FEATURES_PATH):
+        self.store = store
+        self.models = list(store.models)
+        self.blocks: Dict[str, CondensedMatrix] = {k: store.condensed(k, mmap=False) for k in store.keys()}
+        self.fusion = FusionEngine.from_store(store)
+        self.weights = weights or load_weights()
+        self.meta = meta or load_struct_meta()
+        d = self.meta["DEFAULTS"]
+        self.w_motif, self.w_system = float(d["w_motif"]), float(d["w_system"])
+        self.refs = [Path(p) for p in refs]
+        self.features_cache = Path(features_cache)
+        self._neighbors: Dict[str, NeighborIndex] = {}
+        self._ref_features: Optional[List[dict]] = None
+        self._content: Optional[ContentIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dir(cls, store_dir: Path, refs: Sequence[Path] = (), **kwargs) -> "QueryService":
+        store = MatrixStore(store_dir)
+        if not store.exists():
+            raise FileNotFoundError(f"No matrix store in {store_dir}")
+        return cls(store, refs, **kwargs)
+
+    def _check(self, model: str) -> None:
+        if model not in self.fusion.models:
+            raise UnknownModel(f"Unknown model '{model}'")
+
+    def neighbors(self, key: str) -> Optional[NeighborIndex]:
+        if key not in self.blocks:
+            return None
+        with self._lock:
+            if key not in self._neighbors:
+                self._neighbors[key] = store_neighbor_index(self.store, key)
+            return self._neighbors[key]
+
+    def topn(self, model: str, n: int = 5, weights: Optional[Dict[str, float]] = None,
+             w_motif: Optional[float] = None, w_system: Optional[float] = None) -> pd.DataFrame:
+        """Top-n neighbours of `model` with the per-channel breakdown, under thesis or given weights"""
+        self._check(model)
+        _check_n(n)
+        w = dict(self.weights, **(weights or {}))
+        wm = self.w_motif if w_motif is None else w_motif
+        ws = self.w_system if w_system is None else w_system
+        default = w == self.weights and (wm, ws) == (self.w_motif, self.w_system)
+        nn = self.neighbors("total") if default else None
+        if nn is not None and model in nn and n <= nn.k:
+            top = [m for m, _ in nn.topn(model, n)]
+            return self.fusion.breakdown(model, w, wm, ws).loc[top].reset_index()
+        return self.fusion.topn(model, n, w, wm, ws)
+
+    def pair(self, model_a: str, model_b: str) -> pd.DataFrame:
+        """Similarity of two models in every stored channel, with B's neighbour rank for A"""
+        self._check(model_a)
+        self._check(model_b)
+        return pair_breakdown(lambda key: self.blocks[key][(model_a, model_b)] if key in self.blocks else None,
+                              model_a, model_b, self.neighbors)
+
+    def reference_features(self) -> List[dict]:
+        """Channel features of the reference RDF files (persisted cache), loaded on first use"""
+        with self._lock:
+            if self._ref_features is None:
+                self._ref_features = ReferenceFeatures(self.features_cache, self.meta).features(self.refs)
+            return self._ref_features
+
+    def content_index(self) -> ContentIndex:
+        """Content index of the reference features, built on first use"""
+        refs = self.reference_features()
+        with self._lock:
+            if self._content is None:
+                index = ContentIndex.from_counts([f["model"] for f in refs], [f["content"] for f in refs])
+                if len(index) >= ANN_MIN_MODELS:
+                    index.build_ann()
+                self._content = index
+            return self._content
+
+    def compare_upload(self, data: bytes, name: str = "upload.rdf", n: int = 5,
+                       nprobe: Optional[int] = None, weights: Optional[Dict[str, float]] = None,
+                       w_motif: Optional[float] = None, w_system: Optional[float] = None) -> pd.DataFrame:
+        """Top-n reference models for raw RDF bytes, scored on every channel like the app's Quick Compare.
+
+        From ANN_MIN_MODELS references on, the content index preselects 10·n
+        candidates (scanning `nprobe` cells) and only those are scored.
+        """
+        _check_n(n)
+        g = parse_graph(data, fmt=sniff_rdf_format(name, data[:512]))
+        upload = extract_model_features(g, name=name, meta=self.meta)
+        refs = self.reference_features()
+        if len(refs) >= ANN_MIN_MODELS:
+            keep = {m for m, _ in self.content_index().topn(upload["content"], 10 * n, nprobe=nprobe)}
+            refs = [f for f in refs if f["model"] in keep]
+        scores = score_upload(upload, refs, dict(self.weights, **(weights or {})), self.meta,
+                              self.w_motif if w_motif is None else w_motif,
+                              self.w_system if w_system is None else w_system)
+        return scores.head(n)[["Model", *SCORE_COLUMNS]]
+
+def records(df: pd.DataFrame) -> List[dict]:
+    """JSON-ready rows of a result table"""
+    return [{k: (v.item() if isinstance(v, np.generic) else v) for k, v in row.items()}
+            for row in df.to_dict(orient="records")]
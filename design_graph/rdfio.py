@@ -0,0 +1,69 @@
+# design_graph/rdfio.py — RDF input handling shared by the app and the compute engine
+
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import Optional
+
+from rdflib import Graph
+
+RDF_FORMAT_BY_EXT = {".rdf": "xml", ".owl": "xml", ".xml": "xml", ".ttl": "turtle", ".nt": "nt"}
+NT_LINE_RX = re.compile(rb"^\s*(<[^>]*>|_:\S+)\s+<[^>]*>\s+\S")
+
+def sniff_rdf_format(name: Optional[str], head: bytes) -> str:
+    """Guess the rdflib format from the file extension, else from its first bytes"""
+    ext = Path(name).suffix.lower() if name else ""
+    if ext in RDF_FORMAT_BY_EXT:
+        return RDF_FORMAT_BY_EXT[ext]
+    text = head.lstrip(b"\xef\xbb\xbf").lstrip()
+    if text.startswith((b"<?xml", b"<!DOCTYPE", b"<rdf:RDF")):
+        return "xml"
+    if NT_LINE_RX.match(text.split(b"\n", 1)[0]):
+        return "nt"
+    return "turtle"
+
+def read_head(file_or_path, size: int = 512) -> bytes:
+    """First `size` bytes of raw bytes, a path or a seekable file (rewound afterwards)"""
+    if isinstance(file_or_path, bytes):
+        return file_or_path[:size]
+    if isinstance(file_or_path, (str, Path)):
+        with open(file_or_path, "rb") as f:
+            return f.read(size)
+    head = file_or_path.read(size)
+    file_or_path.seek(0)
+    return head if isinstance(head, bytes) else head.encode("utf-8")
+
+def source_kwargs(file_or_path) -> dict:
+    """rdflib input arguments: raw bytes via `data=`, paths via `source=`, file objects via `file=`"""
+    if isinstance(file_or_path, bytes):
+        return {"data": file_or_path}
+    if isinstance(file_or_path, (str, Path)):
+        return {"source": str(file_or_path)}
+    return {"file": file_or_path}
+
+def detect_format(file_or_path) -> str:
+    """Sniff the RDF serialization of bytes, a path or a file object"""
+    name = str(file_or_path) if isinstance(file_or_path, (str, Path)) else getattr(file_or_path, "name", None)
+    return sniff_rdf_format(name, read_head(file_or_path))
+
+def parse_graph(file_or_path, fmt: Optional[str] = None) -> Graph:
+    """Parse RDF once with the sniffed format; other formats are tried only on failure"""
+    src = source_kwargs(file_or_path)
+    if fmt is None:
+        fmt = detect_format(file_or_path)
+    g = Graph()
+    try:
+        g.parse(format=fmt, **src)
+        return g
+    except Exception:
+        # Mislabelled file: only then fall back to the remaining formats
+        for alt in [f for f in ("xml", "turtle") if f != fmt]:
+            if hasattr(file_or_path, "seek"):
+                file_or_path.seek(0)
+            g = Graph()
+            try:
+                g.parse(format=alt, **src)
+                return g
+            except Exception:
+                pass
+        raise
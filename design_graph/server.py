@@ -0,0 +1,180 @@
+# design_graph/server.py — headless async HTTP API over QueryService
+#
+#   GET  /health                                  {"status": "ok", "models": N}
+#   GET  /models                                  model list
+#   GET  /topn?model=M&n=5[&content=..&typed_edge=..&edge_sets=..&structural=..&w_motif=..&w_system=..]
+#   GET  /pair?a=A&b=B                            per-channel similarity and neighbour rank
+#   POST /compare?name=file.rdf&n=5[&nprobe=8][&<channel weights>]
+#                                                 body: raw RDF bytes → all-channel top-n (Quick Compare)
+#   GET  /metrics                                 per-route timings, Prometheus text format
+#
+# asyncio streams with HTTP/1.1 keep-alive, no third-party web framework. The
+# service (matrices, tensor, indexes) is loaded once and stays resident; each
+# query runs in a worker thread so slow uploads never block other clients.
+# Request bodies need a valid Content-Length of at most MAX_BODY bytes; n and
+# nprobe must be at least 1 (else 400) and unknown models answer 404.
+
+from __future__ import annotations
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .channels import CHANNELS
+from .profiling import StageProfiler
+from .query import QueryService, UnknownModel, records
+
+MAX_BODY = 64 << 20
+ROUTES = ("/health", "/models", "/topn", "/pair", "/compare", "/metrics")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _arg(query: Dict[str, list], name: str, cast: Callable = str, default=None, minimum=None):
+    if name not in query:
+        if default is None:
+            raise HTTPError(400, f"missing parameter '{name}'")
+        return default
+    try:
+        value = cast(query[name][0])
+    except ValueError:
+        raise HTTPError(400, f"invalid value for '{name}'")
+    if minimum is not None and value < minimum:
+        raise HTTPError(400, f"'{name}' must be at least {minimum}")
+    return value
+
+class SimilarityAPI:
+    """Request routing for a QueryService"""
+
+    def __init__(self, service: QueryService, profiler: Optional[StageProfiler] = None):
+        self.service = service
+        self.profiler = profiler or StageProfiler()
+
+    def handle(self, method: str, path: str, query: Dict[str, list], body: bytes):
+        if path not in ROUTES:
+            raise HTTPError(404, f"no route {path}")
+        if path == "/metrics":
+            return self.profiler.prometheus_text()
+        with self.profiler.stage(f"api:{path}"):
+            return self._route(method, path, query, body)
+
+    def _route(self, method: str, path: str, query: Dict[str, list], body: bytes):
+        s = self.service
+        weights = {c: _arg(query, c, float) for c in CHANNELS if c in query}
+        wm = _arg(query, "w_motif", float) if "w_motif" in query else None
+        ws = _arg(query, "w_system", float) if "w_system" in query else None
+        if path == "/health":
+            return {"status": "ok", "models": len(s.models)}
+        if path == "/models":
+            return {"models": s.models}
+        if path == "/topn":
+            model, n = _arg(query, "model"), _arg(query, "n", int, 5, minimum=1)
+            return {"model": model, "results": records(s.topn(model, n, weights, wm, ws))}
+        if path == "/pair":
+            a, b = _arg(query, "a"), _arg(query, "b")
+            return {"a": a, "b": b, "channels": records(s.pair(a, b))}
+        if path == "/compare":
+            if method != "POST":
+                raise HTTPError(405, "POST the RDF file as the request body")
+            if not body:
+                raise HTTPError(400, "empty request body")
+            name, n = _arg(query, "name", str, "upload.rdf"), _arg(query, "n", int, 5, minimum=1)
+            nprobe = _arg(query, "nprobe", int, minimum=1) if "nprobe" in query else None
+            return {"name": name,
+                    "results": records(s.compare_upload(body, name, n, nprobe, weights, wm, ws))}
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    if isinstance(payload, str):
+        body, ctype = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, ctype = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+class SimilarityServer:
+    """asyncio HTTP server answering API requests from a thread pool"""
+
+    def __init__(self, service: QueryService, max_workers: int = 8):
+        self.api = SimilarityAPI(service)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    writer.write(_response(e.status, {"error": str(e)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                url = urlsplit(target)
+                try:
+                    payload = await loop.run_in_executor(
+                        self.executor, self.api.handle, method, url.path.rstrip("/") or "/", parse_qs(url.query), body)
+                    status = 200
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except UnknownModel as e:
+                    status, payload = 404, {"error": str(e.args[0]) if e.args else "not found"}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765,
+                    ready: Optional[Callable[[asyncio.AbstractServer], None]] = None) -> None:
+        server = await asyncio.start_server(self._handle_client, host, port)
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+
+def run_server(service: QueryService, host: str = "127.0.0.1", port: int = 8765, max_workers: int = 8) -> None:
+    """Serve the API until interrupted"""
+    try:
+        asyncio.run(SimilarityServer(service, max_workers).serve(host, port))
+    except KeyboardInterrupt:
+        pass
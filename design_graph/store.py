@@ -0,0 +1,142 @@
+# design_graph/store.py — binary similarity matrix store
+#
+# Layout of a store directory:
+#   models.json        shared model index (row/column order of every matrix)
+#   <key>.npy          one float32 condensed upper triangle per matrix (total, content, …,
+#                      S4_functional), N(N-1)/2 values in squareform order
+#
+# Blocks open with np.load(mmap_mode="r"), so a single row of a 10k×10k matrix
+# is read without touching the rest. The *_similarity_matrix.csv files are an
+# export format only.
+
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .channels import CHANNEL_FILES, STRUCT_FILES
+from .condensed import CondensedMatrix
+
+STORE_VERSION = 2
+INDEX_FILE = "models.json"
+STORE_DTYPE = np.float32
+
+class MatrixStore:
+    """Directory of memory-mappable condensed float32 similarity matrices sharing one model index"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._models: Optional[List[str]] = None
+        self._pos: Optional[Dict[str, int]] = None
+
+    def exists(self) -> bool:
+        return (self.root / INDEX_FILE).exists()
+
+    @property
+    def models(self) -> List[str]:
+        if self._models is None:
+            with open(self.root / INDEX_FILE, "r") as f:
+                payload = json.load(f)
+            if payload.get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported matrix store version in {self.root}")
+            self._models = list(payload["models"])
+        return self._models
+
+    def position(self, model: str) -> int:
+        if self._pos is None:
+            self._pos = {m: i for i, m in enumerate(self.models)}
+        return self._pos[model]
+
+    def keys(self) -> List[str]:
+        return sorted(p.stem for p in self.root.glob("*.npy"))
+
+    def __contains__(self, key: str) -> bool:
+        return (self.root / f"{key}.npy").exists()
+
+    def array(self, key: str, mmap: bool = True) -> np.ndarray:
+        """The condensed block for `key`; memory-mapped read-only unless mmap=False"""
+        return np.load(self.root / f"{key}.npy", mmap_mode="r" if mmap else None)
+
+    def condensed(self, key: str, mmap: bool = True) -> CondensedMatrix:
+        return CondensedMatrix(self.array(key, mmap), self.models)
+
+    def frame(self, key: str) -> pd.DataFrame:
+        """The square matrix for `key` labelled with the shared model index"""
+        return self.condensed(key).to_frame()
+
+    def row(self, key: str, model: str) -> pd.Series:
+        """One model's similarities, read from the mapped file without loading the matrix"""
+        return self.condensed(key).row_series(model)
+
+    def write(self, matrices: Dict[str, pd.DataFrame]) -> List[Path]:
+        """Replace the store with `matrices`, all aligned to the first matrix's model order"""
+        if not matrices:
+            return []
+        models = list(next(iter(matrices.values())).index)
+        blocks = {}
+        for key, df in matrices.items():
+            if set(df.index) != set(models) or set(df.columns) != set(models):
+                raise ValueError(f"Matrix '{key}' does not share the model index of the store")
+            A = df.loc[models, models].to_numpy(dtype=float)
+            if not np.allclose(A, A.T, atol=1e-6):
+                raise ValueError(f"Matrix '{key}' is not symmetric")
+            blocks[key] = CondensedMatrix.from_square(A, models, dtype=STORE_DTYPE).data
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            reindexed = self.exists() and self.models != models
+        except ValueError:  # store written by an older layout
+            reindexed = True
+        if reindexed:
+            for stale in self.root.glob("*.npy"):
+                stale.unlink()
+        written = []
+        for key, block in blocks.items():
+            path = self.root / f"{key}.npy"
+            tmp = path.with_suffix(".tmp.npy")
+            np.save(tmp, block)
+            os.replace(tmp, path)
+            written.append(path)
+        path = self.root / INDEX_FILE
+        with open(path, "w") as f:
+            json.dump({"version": STORE_VERSION, "dtype": np.dtype(STORE_DTYPE).name, "models": models}, f, indent=1)
+        written.append(path)
+        self._models, self._pos = models, None
+        return written
+
+    def export_csv(self, out_dir: Path, struct_dir: Optional[Path] = None) -> List[Path]:
+        """Write the stored blocks back out as the bundle's CSV matrices"""
+        written = []
+        for key in self.keys():
+            if key in CHANNEL_FILES:
+                path = Path(out_dir) / CHANNEL_FILES[key]
+            elif key in STRUCT_FILES:
+                path = Path(struct_dir or out_dir) / STRUCT_FILES[key]
+            else:
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.frame(key).astype(float).to_csv(path)
+            written.append(path)
+        return written
+
+def read_csv_matrices(out_dir: Path, struct_dir: Optional[Path] = None) -> Dict[str, pd.DataFrame]:
+    """The CSV matrices present in a CHANNEL_MATRICES (and data/) directory"""
+    files = {k: Path(out_dir) / f for k, f in CHANNEL_FILES.items()}
+    if struct_dir is not None:
+        files.update({k: Path(struct_dir) / f for k, f in STRUCT_FILES.items()})
+    return {k: pd.read_csv(p, index_col=0) for k, p in files.items() if p.exists()}
+
+def pack_csv_matrices(out_dir: Path, store_dir: Path, struct_dir: Optional[Path] = None) -> MatrixStore:
+    """Convert existing CSV matrices into a binary store"""
+    matrices = read_csv_matrices(out_dir, struct_dir)
+    if not matrices:
+        raise FileNotFoundError(f"No similarity matrix CSVs found in {out_dir}")
+    # total first so its row order becomes the shared index
+    ordered = dict(sorted(matrices.items(), key=lambda kv: kv[0] != "total"))
+    store = MatrixStore(store_dir)
+    store.write(ordered)
+    return store
@@ -0,0 +1,112 @@
+# design_graph/stream.py — predicate histograms without building an rdflib Graph
+#
+# The RDF/XML and N-Triples readers are rdflib's own (a SAX content handler
+# fed incrementally by expat, and the line-based N-Triples parser), so the
+# triples seen here are exactly the ones Graph.parse would store. Only the
+# sink differs: instead of a triple store it keeps the predicate-key counts.
+
+from __future__ import annotations
+import codecs
+from collections import Counter
+from typing import Optional
+
+from rdflib import Graph
+from rdflib.parser import create_input_source
+from rdflib.plugins.parsers.notation3 import RDFSink, SinkParser
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.plugins.parsers.rdfxml import create_parser
+
+from .predicates import DEFAULT_CLASSIFIER, PredicateClassifier
+from .rdfio import detect_format, source_kwargs
+
+class PredicateCountingSink:
+    """Triple sink that tallies matched predicates instead of storing triples.
+
+    A Graph is a set, so repeated statements count once. With `dedupe` the
+    sink reproduces that by keeping every distinct *matched* triple, so its
+    memory grows with those (still far below a Graph: unmatched triples are
+    never retained and there are no indexes). `dedupe=False` keeps only the
+    per-predicate counts at the cost of counting duplicate statements.
+    """
+
+    def __init__(self, classifier: Optional[PredicateClassifier] = None, dedupe: bool = True):
+        self.classifier = classifier or DEFAULT_CLASSIFIER
+        self.per_predicate: Counter = Counter()
+        self.statements = 0
+        self._seen = set() if dedupe else None
+
+    def add(self, triple) -> None:
+        self.statements += 1
+        p = str(triple[1])
+        if self.classifier.classify(p) is None:
+            return
+        if self._seen is not None:
+            if triple in self._seen:
+                return
+            self._seen.add(triple)
+        self.per_predicate[p] += 1
+
+    @property
+    def counts(self) -> dict:
+        return self.classifier.aggregate(self.per_predicate)
+
+    # N-Triples sink protocol
+    def triple(self, s, p, o) -> None:
+        self.add((s, p, o))
+
+    # RDF/XML handler registers prefixes on its store; nothing to keep here
+    def bind(self, *args, **kwargs) -> None:
+        pass
+
+class _CountingN3Sink(RDFSink):
+    """notation3 sink forwarding root-formula statements to a counting sink"""
+
+    def __init__(self, counter: PredicateCountingSink):
+        super().__init__(Graph())
+        self.counting_sink = counter
+
+    def makeStatement(self, quadruple, why=None) -> None:
+        f, p, s, o = quadruple
+        self.counting_sink.add((self.normalise(f, s), self.normalise(f, p), self.normalise(f, o)))
+
+def _stream_xml(source, sink: PredicateCountingSink) -> None:
+    parser = create_parser(source, sink)
+    parser.parse(source)
+
+def _stream_nt(source, sink: PredicateCountingSink) -> None:
+    stream = source.getCharacterStream() or codecs.getreader("utf-8")(source.getByteStream())
+    W3CNTriplesParser(sink).parse(stream)
+
+def _stream_turtle(source, sink: PredicateCountingSink) -> None:
+    # rdflib's Turtle grammar needs the whole text buffer, but no store is built
+    base = Graph().absolutize(source.getPublicId() or source.getSystemId() or "")
+    parser = SinkParser(_CountingN3Sink(sink), baseURI=base, turtle=True)
+    parser.loadStream(source.getCharacterStream() or source.getByteStream())
+
+_STREAMERS = {"xml": _stream_xml, "nt": _stream_nt, "turtle": _stream_turtle}
+
+def stream_predicate_histogram(file_or_path, fmt: Optional[str] = None,
+                               classifier: Optional[PredicateClassifier] = None,
+                               dedupe: bool = True) -> Counter:
+    """Triple count per distinct predicate URI accepted by `classifier`, streamed.
+
+    RDF/XML and N-Triples are read incrementally; Turtle is tokenized from one
+    text buffer. In every case only the per-predicate counts (plus the
+    distinct matched triples when `dedupe`) are held in memory.
+    """
+    if fmt is None:
+        fmt = detect_format(file_or_path)
+    sink = PredicateCountingSink(classifier=classifier, dedupe=dedupe)
+    source = create_input_source(format=fmt, **source_kwargs(file_or_path))
+    try:
+        _STREAMERS.get(fmt, _stream_turtle)(source, sink)
+    finally:
+        source.close()
+    return sink.per_predicate
+
+def stream_predicate_counts(file_or_path, fmt: Optional[str] = None,
+                            classifier: Optional[PredicateClassifier] = None,
+                            dedupe: bool = True) -> dict:
+    """Predicate-key histogram of an RDF file, identical to parsing it into a Graph"""
+    classifier = classifier or DEFAULT_CLASSIFIER
+    return classifier.aggregate(stream_predicate_histogram(file_or_path, fmt, classifier, dedupe))
@@ -0,0 +1,173 @@
+# design_graph/structural.py — S1→S4 structural channel inputs
+#
+# Element and functional-role patterns come from the structural pipeline's
+# s1s4_meta.json (ELEMENT_RX, FUNC_RX, STRONG_TOPO, WEAK_TOPO, DEFAULTS).
+# Derived quantities follow the bundle's tables:
+#   s1_inventory      element counts per class
+#   s2_motifs         motif counts (M2 frame node, M3 wall-slab, M4 core,
+#                     M2b brace node) and densities over the element count
+#   s3_system_scores  Frame / Wall / Dual / Braced family scores
+#   s4_motif_share    motif densities + functional-role shares
+
+from __future__ import annotations
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ELEMENT_CLASSES = ["Beam", "Column", "Slab", "Wall", "Brace", "Core"]
+FUNC_ROLES = ["LB", "Shear", "Moment", "Bracing"]
+MOTIFS = ["M2", "M3", "M4", "M2b"]
+SYSTEM_FAMILIES = ["Frame", "Wall", "Dual", "Braced"]
+ADJACENCY_KEYS = ["adjacentElement", "adjacentZone", "intersectingElement", "BFO_0000178"]
+
+DEFAULT_STRUCT_META = {
+    "DEFAULTS": {
+        "dual_thresh": 0.25,
+        "w_motif": 0.5,
+        "w_system": 0.5,
+        "alpha_m5": 0.4,
+        "proxy_penalty": 0.7,
+        "weak_topo_penalty": 0.5,
+    },
+    "ELEMENT_RX": {
+        "Beam": r"(?:\b|_)(beam|ifcbeam)(?:\b|_)",
+        "Column": r"(?:\b|_)(column|ifccolumn)(?:\b|_)",
+        "Slab": r"(?:\b|_)(slab|deck|floor|plate|ifcslab|ifcfloor|ifcplate|ifccovering)(?:\b|_)",
+        "Wall": r"(?:\b|_)(wall|shear[- ]?wall|ifcwall|ifcwallstandardcase)(?:\b|_)",
+        "Brace": r"(?:\b|_)(brace|bracing|tie|strut|ifcstructuralcurvemember|ifcmember)(?:\b|_)",
+        "Core": r"(?:\b|_)(core|shearcore|liftcore)(?:\b|_)",
+    },
+    "FUNC_RX": {
+        "LB": r"(?:\b|_)(load\s*bearing|bearing)(?:\b|_)",
+        "Shear": r"(?:\b|_)(shear)(?:\b|_)",
+        "Moment": r"(?:\b|_)(moment|bending)(?:\b|_)",
+        "Bracing": r"(?:\b|_)(brace|bracing|tie|strut|diaphragm|stiffener)(?:\b|_)",
+    },
+    "STRONG_TOPO": [
+        "relateselement", "isconnectedto", "hasstructuralmember", "adjacentelement",
+        "intersectingelement", "connectedto", "relatedelements", "relconnectselements",
+    ],
+    "WEAK_TOPO": ["adjacentzone"],
+}
+
+def load_struct_meta(path: Optional[Path] = None) -> dict:
+    """Structural pipeline settings, overlaid from an s1s4_meta.json when given"""
+    meta = json.loads(json.dumps(DEFAULT_STRUCT_META))
+    if path is not None and Path(path).exists():
+        with open(path, "r") as f:
+            loaded = json.load(f)
+        for key, value in loaded.items():
+            if isinstance(value, dict) and isinstance(meta.get(key), dict):
+                meta[key].update(value)
+            else:
+                meta[key] = value
+    return meta
+
+_CAMEL_RX = re.compile(r"([a-z0-9])([A-Z])")
+
+def label_text(s: str) -> str:
+    """Lower-case a type name or label with camelCase split into words"""
+    return _CAMEL_RX.sub(r"\1 \2", s).lower()
+
+def _combined_rx(patterns: Dict[str, str]) -> re.Pattern:
+    # A leading lookahead finds any start position where some pattern matches;
+    # one optional lookahead per pattern then records every class matching
+    # there. Lookaheads consume nothing, so overlapping matches (e.g. "beam_column")
+    # are all seen, exactly as with a separate search per pattern.
+    any_rx = "|".join(f"(?:{rx})" for rx in patterns.values())
+    groups = "".join(f"(?=(?P<g{i}>{rx}))?" for i, rx in enumerate(patterns.values()))
+    return re.compile(f"(?=(?:{any_rx})){groups}", re.I)
+
+class ElementClassifier:
+    """ELEMENT_RX / FUNC_RX matching with one combined regex each, memoized per distinct string.
+
+    element_class is the first ELEMENT_RX class (in meta order) matching the
+    text; func_roles are all matching FUNC_RX roles, in meta order.
+    """
+
+    def __init__(self, meta: dict):
+        self.element_names = list(meta["ELEMENT_RX"])
+        self.func_names = list(meta["FUNC_RX"])
+        self.element_rx = _combined_rx(meta["ELEMENT_RX"])
+        self.func_rx = _combined_rx(meta["FUNC_RX"])
+        self._memo: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _hits(rx: re.Pattern, names: List[str], low: str) -> tuple:
+        found = set()
+        for m in rx.finditer(low):
+            found.update(i for i in range(len(names)) if m.start(f"g{i}") >= 0)
+        return tuple(names[i] for i in sorted(found))
+
+    def classify(self, text: str) -> tuple:
+        """(element class or None, functional roles) of one IRI local name or label"""
+        hit = self._memo.get(text)
+        if hit is None:
+            low = label_text(text)
+            elements = self._hits(self.element_rx, self.element_names, low)
+            hit = self._memo[text] = (elements[0] if elements else None,
+                                      self._hits(self.func_rx, self.func_names, low))
+        return hit
+
+    def element_class(self, text: str) -> Optional[str]:
+        return self.classify(text)[0]
+
+    def func_roles(self, text: str) -> tuple:
+        return self.classify(text)[1]
+
+    def classify_many(self, texts: Iterable[str]) -> Dict[str, tuple]:
+        """classify() for each distinct string of `texts`"""
+        return {t: self.classify(t) for t in dict.fromkeys(texts)}
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+def structural_tables(features: List[dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Element inventory (s1_inventory.csv layout) and functional-role counts of every model"""
+    models = [f["model"] for f in features]
+    inventory = pd.DataFrame([[f["inventory"].get(k, 0) for k in ELEMENT_CLASSES] for f in features],
+                             index=models, columns=ELEMENT_CLASSES)
+    functional = pd.DataFrame([[f["functional"].get(r, 0) for r in FUNC_ROLES] for f in features],
+                              index=models, columns=FUNC_ROLES)
+    inventory.index.name = functional.index.name = "model"
+    return inventory, functional
+
+def proxy_motifs(inventory: Dict[str, int]) -> Dict[str, int]:
+    """Motif counts estimated from the element inventory (no topology)"""
+    beam, column = inventory.get("Beam", 0), inventory.get("Column", 0)
+    slab, wall = inventory.get("Slab", 0), inventory.get("Wall", 0)
+    return {
+        "M2": min(beam, column),
+        "M3": min(wall, slab),
+        "M4": inventory.get("Core", 0) if slab > 0 else 0,
+        "M2b": min(inventory.get("Brace", 0), beam + column),
+    }
+
+def motif_penalty(source: str, meta: dict) -> float:
+    """Down-weighting of motif evidence by how it was obtained"""
+    d = meta["DEFAULTS"]
+    return {"strong": 1.0, "weak": d["weak_topo_penalty"], "proxy": d["proxy_penalty"]}.get(source, 1.0)
+
+def structural_vectors(feats: dict, meta: dict) -> dict:
+    """Per-model S1-S4 vectors derived from extracted features"""
+    inv = feats["inventory"]
+    den = float(sum(inv.get(k, 0) for k in ELEMENT_CLASSES)) or 1.0
+    motifs = feats["motifs"]
+    sources = feats.get("motif_source", {})
+    dens = np.array([motifs.get(m, 0) * motif_penalty(sources.get(m, "proxy"), meta) / den for m in MOTIFS])
+    func = np.array([feats["functional"].get(r, 0) / den for r in FUNC_ROLES])
+    frame = dens[0] + func[2]
+    wall = dens[1] + dens[2] + func[1]
+    braced = dens[3] + func[3]
+    hi = max(frame, wall)
+    dual = min(frame, wall) if hi > 0 and min(frame, wall) >= meta["DEFAULTS"]["dual_thresh"] * hi else 0.0
+    return {
+        "adjacency": np.array([feats["adjacency"].get(k, 0) for k in ADJACENCY_KEYS], dtype=float),
+        "motif_share": np.concatenate([dens, func]),
+        "system": np.array([frame, wall, dual, braced]),
+        "functional": func,
+    }
@@ -0,0 +1,284 @@
+# design_graph/synth.py — synthetic design graphs for scale testing
+#
+# A profile learned from real models holds what the channels look at: the
+# predicate distribution (with each predicate's literal-object share), the
+# rdf:type distribution of non-element nodes, the type IRIs of each element
+# class, and per model the S1 inventory, the S2 motif densities (motif count
+# over element count) and the functional-role shares. Inventory and motif rows
+# can also come from the bundle's s1_inventory.csv / s2_motifs.csv. Topology
+# and hasFunction predicates are kept out of the predicate distribution: the
+# generator emits them itself, at the learned motif densities and role shares.
+#
+# A synthetic model is written triple by triple (N-Triples or RDF/XML), so its
+# size is only bounded by disk. Similarity structure is controlled by families:
+# every model of a family is drawn from the same seeded prototype (node types,
+# inventory row, body triples, structural edges, node IRIs) and then a
+# `mutation` share of its triples is redrawn from the model's own seed. Same-
+# family models therefore share about (1 - mutation) of their edges, while
+# different families only share the profile's distributions.
+
+from __future__ import annotations
+import csv
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, IO, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+from rdflib import Literal, RDF
+
+from .features import extract_model_features, local_name
+from .motifs import MOTIF_CLASSES
+from .parallel import _pool_map, resolve_workers
+from .rdfio import parse_graph
+from .structural import ELEMENT_CLASSES, FUNC_ROLES, ElementClassifier, load_struct_meta
+
+SYNTH_PROFILE_VERSION = 1
+SYNTH_NS = "http://example.org/synthetic/"
+SYNTH_FORMATS = {"nt": ".nt", "xml": ".rdf"}
+# Type local names that FUNC_RX classifies as each role (and ELEMENT_RX as no element class)
+FUNCTION_TYPES = {"LB": "LoadBearing", "Shear": "ShearResisting", "Moment": "MomentResisting", "Bracing": "Diaphragm"}
+_CHUNK = 1 << 16
+_LITERALS = 1000
+
+def _most_common(counter: Counter, default: str) -> str:
+    return counter.most_common(1)[0][0] if counter else default
+
+def learn_profile(paths: Sequence[Path], meta: Optional[dict] = None) -> dict:
+    """Generator profile of real RDF models (each parsed once)"""
+    meta = meta or load_struct_meta()
+    ecls = ElementClassifier(meta)
+    strong = {k.lower() for k in meta["STRONG_TOPO"]}
+    weak = {k.lower() for k in meta["WEAK_TOPO"]}
+    type_uri = str(RDF.type)
+
+    predicates, literal_objects = Counter(), Counter()
+    types, element_types = Counter(), defaultdict(Counter)
+    topo = {"strong": Counter(), "weak": Counter(), "function": Counter()}
+    models = []
+    for path in paths:
+        path = Path(path)
+        g = parse_graph(path)
+        for s, p, o in g:
+            p = str(p)
+            if p == type_uri:
+                cls = ecls.element_class(local_name(str(o)))
+                (element_types[cls] if cls else types)[str(o)] += 1
+                continue
+            pl = local_name(p).lower()
+            if pl in strong:
+                topo["strong"][p] += 1
+            elif pl in weak:
+                topo["weak"][p] += 1
+            elif pl == "hasfunction":
+                topo["function"][p] += 1
+            else:
+                predicates[p] += 1
+                literal_objects[p] += isinstance(o, Literal)
+        f = extract_model_features(g, name=path.name, meta=meta, element_classifier=ecls)
+        n_elements = sum(f["inventory"].values())
+        models.append({
+            "model": f["model"], "triples": f["n_triples"], "subjects": f["n_subjects"],
+            "inventory": f["inventory"],
+            "motif_density": {m: f["motifs"][m] / n_elements if n_elements else 0.0 for m in MOTIF_CLASSES},
+            "functional_share": {r: f["functional"][r] / n_elements if n_elements else 0.0 for r in FUNC_ROLES},
+            "weak_share": f["adjacency"]["weak"] / max(f["n_triples"], 1),
+        })
+
+    total = sum(predicates.values()) or 1
+    n_types = sum(types.values()) or 1
+    return {
+        "version": SYNTH_PROFILE_VERSION,
+        "predicates": {p: c / total for p, c in predicates.most_common()},
+        "literal_share": {p: literal_objects[p] / c for p, c in predicates.items()},
+        "types": {t: c / n_types for t, c in types.most_common()},
+        "element_types": {c: _most_common(element_types[c], f"{SYNTH_NS}Ifc{c}") for c in ELEMENT_CLASSES},
+        "strong_predicate": _most_common(topo["strong"], f"{SYNTH_NS}connectedTo"),
+        "weak_predicate": _most_common(topo["weak"], f"{SYNTH_NS}adjacentZone"),
+        "function_predicate": _most_common(topo["function"], f"{SYNTH_NS}hasFunction"),
+        "models": models,
+    }
+
+def overlay_struct_tables(profile: dict, inventory_csv: Optional[Path] = None,
+                          motifs_csv: Optional[Path] = None) -> dict:
+    """Replace the learned inventory / motif-density rows with s1_inventory.csv / s2_motifs.csv rows"""
+    rows = {m["model"]: m for m in profile["models"]}
+    mean_triples = float(np.mean([m["triples"] for m in profile["models"]])) if rows else 20000.0
+    mean_subjects = float(np.mean([m["subjects"] for m in profile["models"]])) if rows else 5000.0
+
+    def row(model: str) -> dict:
+        if model not in rows:
+            rows[model] = {"model": model, "triples": mean_triples, "subjects": mean_subjects,
+                           "inventory": {c: 0 for c in ELEMENT_CLASSES},
+                           "motif_density": {m: 0.0 for m in MOTIF_CLASSES},
+                           "functional_share": {r: 0.0 for r in FUNC_ROLES}, "weak_share": 0.0}
+        return rows[model]
+
+    if inventory_csv is not None and Path(inventory_csv).exists():
+        with open(inventory_csv, newline="") as f:
+            for r in csv.DictReader(f):
+                row(r["model"])["inventory"] = {c: int(float(r.get(c) or 0)) for c in ELEMENT_CLASSES}
+    if motifs_csv is not None and Path(motifs_csv).exists():
+        with open(motifs_csv, newline="") as f:
+            for r in csv.DictReader(f):
+                den = float(r.get("cnt__den") or 0)
+                row(r["model"])["motif_density"] = {
+                    m: float(r.get(f"cnt_cnt_{m}") or 0) / den if den else 0.0 for m in MOTIF_CLASSES}
+    return {**profile, "models": list(rows.values())}
+
+def save_profile(profile: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=1)
+
+def load_profile(path: Path) -> dict:
+    with open(path, "r") as f:
+        profile = json.load(f)
+    if profile.get("version") != SYNTH_PROFILE_VERSION:
+        raise ValueError(f"Unsupported synthetic profile version in {path}")
+    return profile
+
+class _Writer:
+    """Streaming N-Triples / RDF-XML serializer for IRI and plain-literal triples"""
+
+    def __init__(self, fh: IO[str], fmt: str):
+        if fmt not in SYNTH_FORMATS:
+            raise ValueError(f"Unknown synthetic format '{fmt}' (expected one of {sorted(SYNTH_FORMATS)})")
+        self.fh, self.fmt, self.count = fh, fmt, 0
+        if fmt == "xml":
+            fh.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                     '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n')
+
+    def write(self, subjects: Sequence[str], predicates: Sequence[str], objects: Sequence[str],
+              literal: Sequence[bool]) -> None:
+        if self.fmt == "nt":
+            self.fh.writelines(f'<{s}> <{p}> "{o}" .\n' if lit else f"<{s}> <{p}> <{o}> .\n"
+                               for s, p, o, lit in zip(subjects, predicates, objects, literal))
+        else:
+            out = []
+            for s, p, o, lit in zip(subjects, predicates, objects, literal):
+                ns, name = _split_iri(p)
+                obj = f">{escape(o)}</p:{name}>" if lit else f" rdf:resource={quoteattr(o)}/>"
+                out.append(f"<rdf:Description rdf:about={quoteattr(s)}>"
+                           f"<p:{name} xmlns:p={quoteattr(ns)}{obj}</rdf:Description>\n")
+            self.fh.writelines(out)
+        self.count += len(subjects)
+
+    def close(self) -> None:
+        if self.fmt == "xml":
+            self.fh.write("</rdf:RDF>\n")
+
+def _split_iri(iri: str):
+    # RDF/XML needs the predicate as namespace + an XML-name local part
+    i = len(iri)
+    while i > 0 and (iri[i - 1].isalnum() or iri[i - 1] in "_-."):
+        i -= 1
+    while i < len(iri) and not (iri[i].isalpha() or iri[i] == "_"):
+        i += 1
+    return iri[:i], iri[i:]
+
+def write_synthetic_graph(profile: dict, fh: IO[str], n_triples: int, family: int = 0, variant: int = 0,
+                          mutation: float = 0.1, fmt: str = "nt", seed: int = 0) -> int:
+    """Write one synthetic model of about n_triples triples; returns the number written.
+
+    Models with the same (seed, family) share their prototype; `mutation` is the
+    share of triples each (family, variant) redraws on its own.
+    """
+    frng = np.random.default_rng([seed, family])
+    row = profile["models"][int(frng.integers(len(profile["models"])))]
+    scale = n_triples / max(row["triples"], 1)
+    n_nodes = max(1, int(round(n_triples * row["subjects"] / max(row["triples"], 1))))
+    ns = f"{SYNTH_NS}f{family}/"
+    node = np.array([f"{ns}n{i}" for i in range(n_nodes)], dtype=object)
+
+    # Elements first (their inventory scaled to the model size), then typed non-element nodes
+    counts = [int(round(row["inventory"][c] * scale)) for c in ELEMENT_CLASSES]
+    if sum(counts) > n_nodes:
+        counts = [int(c * n_nodes / sum(counts)) for c in counts]
+    elem_cls = np.repeat(np.arange(len(ELEMENT_CLASSES)), counts)
+    n_elem = len(elem_cls)
+    type_iris = list(profile["types"]) or [f"{SYNTH_NS}Thing"]
+    type_p = np.array(list(profile["types"].values()) or [1.0])
+    node_type = np.empty(n_nodes, dtype=object)
+    node_type[:n_elem] = np.array([profile["element_types"][c] for c in ELEMENT_CLASSES], dtype=object)[elem_cls]
+    node_type[n_elem:] = np.array(type_iris, dtype=object)[frng.choice(len(type_iris), n_nodes - n_elem, p=type_p / type_p.sum())]
+
+    w = _Writer(fh, fmt)
+    type_uri = str(RDF.type)
+    w.write(node, [type_uri] * n_nodes, node_type, [False] * n_nodes)
+
+    # Structural edges: per motif, density × elements links between its classes
+    members = {c: np.flatnonzero(elem_cls == i) for i, c in enumerate(ELEMENT_CLASSES)}
+    mrng = np.random.default_rng([seed, family, variant])
+    s_idx, o_idx = [], []
+    for m, classes in MOTIF_CLASSES.items():
+        left, right = members[classes[0]], np.concatenate([members[c] for c in classes[1:]])
+        k = int(round(row["motif_density"][m] * n_elem))
+        if k and len(left) and len(right):
+            s_idx.append(frng.choice(left, k))
+            o_idx.append(frng.choice(right, k))
+    if s_idx:
+        s_idx, o_idx = np.concatenate(s_idx), np.concatenate(o_idx)
+        redraw = mrng.random(len(s_idx)) < mutation
+        o_idx[redraw] = mrng.integers(n_elem, size=int(redraw.sum()))
+        w.write(node[s_idx], [profile["strong_predicate"]] * len(s_idx), node[o_idx], [False] * len(s_idx))
+    n_weak = int(round(row.get("weak_share", 0.0) * n_triples)) if n_elem else 0
+    if n_weak:
+        a, b = frng.integers(n_elem, size=n_weak), frng.integers(n_elem, size=n_weak)
+        w.write(node[a], [profile["weak_predicate"]] * n_weak, node[b], [False] * n_weak)
+
+    # Functional roles: role-share × elements hasFunction links to typed function nodes
+    for r in FUNC_ROLES:
+        k = min(n_elem, int(round(row["functional_share"][r] * n_elem)))
+        if not k:
+            continue
+        elems = frng.choice(n_elem, k, replace=False)
+        funcs = [f"{ns}{r.lower()}{i}" for i in range(k)]
+        w.write(node[elems], [profile["function_predicate"]] * k, funcs, [False] * k)
+        w.write(funcs, [type_uri] * k, [f"{SYNTH_NS}{FUNCTION_TYPES[r]}"] * k, [False] * k)
+
+    # Body: the rest of the budget from the predicate distribution, in seeded chunks
+    preds = np.array(list(profile["predicates"]), dtype=object)
+    cum = np.cumsum(list(profile["predicates"].values()))
+    lit_share = np.array([profile["literal_share"][p] for p in preds])
+    remaining = max(0, n_triples - w.count)
+    for chunk, start in enumerate(range(0, remaining, _CHUNK)):
+        size = min(_CHUNK, remaining - start)
+        drawn = []
+        for rng in (np.random.default_rng([seed, family, chunk, 1 << 20]),
+                    np.random.default_rng([seed, family, variant, chunk, 1 << 21])):
+            p = np.minimum(np.searchsorted(cum, rng.random(size) * cum[-1], side="right"), len(preds) - 1)
+            drawn.append((rng.integers(n_nodes, size=size), p, rng.random(size) < lit_share[p],
+                          rng.integers(n_nodes, size=size), rng.integers(_LITERALS, size=size)))
+        redraw = np.random.default_rng([seed, family, variant, chunk]).random(size) < mutation
+        s, p, lit, o, v = (np.where(redraw, mine, proto) for proto, mine in zip(*drawn))
+        objects = np.where(lit, v.astype(str).astype(object), node[o])
+        w.write(node[s], preds[p], objects, lit)
+    w.close()
+    return w.count
+
+def _synth_payload(item: tuple) -> int:
+    profile, path, n_triples, family, variant, mutation, fmt, seed = item
+    with open(path, "w", encoding="utf-8") as fh:
+        return write_synthetic_graph(profile, fh, n_triples, family, variant, mutation, fmt, seed)
+
+def generate_corpus(profile: dict, out_dir: Path, n_models: int, n_triples: Optional[int] = None,
+                    families: int = 10, mutation: float = 0.1, fmt: str = "nt", seed: int = 0,
+                    workers: Optional[int] = 1) -> List[Path]:
+    """Write n_models synthetic models (model i in family i % families) plus synthetic_manifest.csv"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n_triples = n_triples or int(np.mean([m["triples"] for m in profile["models"]]))
+    families = max(1, min(families, n_models))
+    width = len(str(max(n_models - 1, 0)))
+    items = [(profile, str(out_dir / f"synth_f{i % families}_{i:0{width}d}{SYNTH_FORMATS[fmt]}"),
+              n_triples, i % families, i // families, mutation, fmt, seed) for i in range(n_models)]
+    written = _pool_map(_synth_payload, items, resolve_workers(workers, len(items)), 1)
+    with open(out_dir / "synthetic_manifest.csv", "w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["model", "family", "variant", "triples", "mutation", "seed"])
+        for item, n in zip(items, written):
+            out.writerow([Path(item[1]).name, item[3], item[4], n, mutation, seed])
+    return [Path(item[1]) for item in items]
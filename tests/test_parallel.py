@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from rdflib import BNode
+
+from design_graph import (
+    extract_features_parallel, extract_model_features, extract_uploads_parallel, load_struct_meta, parse_graph,
+)
+
+EX = "http://example.org/design#"
+
+def _write_models(tmp_path: Path) -> list:
+    # Blank nodes in several shapes: nested restrictions, a list, and two look-alike siblings
+    body = f"""
+@prefix ex: <{EX}> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix bot: <https://w3id.org/bot#> .
+ex:Wall rdfs:subClassOf [ a owl:Restriction ; owl:onProperty ex:hasFunction ; owl:someValuesFrom ex:LoadBearing ] ,
+                        [ a owl:Restriction ; owl:onProperty ex:hasQuality ; owl:someValuesFrom [ a ex:Thickness ] ] .
+ex:w1 a ex:Wall ; rdfs:label "Wall 1" ; bot:adjacentElement ex:s1 ; ex:hasFunction [ a ex:LoadBearing ] .
+ex:w2 a ex:Wall ; rdfs:label "Wall 2" ; bot:adjacentElement ex:s1 ; ex:hasFunction [ a ex:LoadBearing ] .
+ex:s1 a ex:Slab ; ex:layers ( ex:l1 ex:l2 ex:l3 ) .
+"""
+    paths = []
+    for i, extra in enumerate(["", "ex:c1 a ex:Column ; bot:adjacentElement ex:s1 .", "ex:w3 a ex:Wall ."]):
+        path = tmp_path / f"model_{i}.ttl"
+        path.write_text(body + extra, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+def test_parallel_features_equal_serial(tmp_path):
+    paths = _write_models(tmp_path)
+    meta = load_struct_meta()
+    serial = [extract_model_features(p, name=p.name, meta=meta) for p in paths]
+    assert extract_features_parallel(paths, meta, workers=2) == serial
+    assert extract_features_parallel(paths, meta, workers=1) == serial
+
+def test_upload_features_equal_file_features(tmp_path):
+    paths = _write_models(tmp_path)
+    meta = load_struct_meta()
+    uploads = extract_uploads_parallel([(p.name, p.read_bytes()) for p in paths], meta, workers=2)
+    assert uploads == [extract_model_features(p, name=p.name, meta=meta) for p in paths]
+
+def test_blank_node_edges_stable_across_parses_and_unique_per_model(tmp_path):
+    paths = _write_models(tmp_path)
+    meta = load_struct_meta()
+    a = extract_model_features(paths[0], name="a.ttl", meta=meta)
+    b = extract_model_features(paths[0], name="copy.ttl", meta=meta)
+    assert a["edges"] == b["edges"] and a["minhash"] == b["minhash"]
+    c = extract_model_features(paths[1], name=paths[1].name, meta=meta)
+    # model_1 extends model_0: exactly the blank-node-free edges are shared
+    n_blank = sum(isinstance(s, BNode) or isinstance(o, BNode) for s, _, o in parse_graph(paths[0]))
+    assert n_blank > 0
+    assert len(set(a["edges"]) & set(c["edges"])) == len(a["edges"]) - n_blank